@@ -5,6 +5,7 @@ from Api.config import config
 from Api.database import db
 from Api.logging_config import setup_logging
 from Api.error_handlers import register_error_handlers
+from Api.query_instrumentation import register_query_instrumentation
 from dotenv import load_dotenv
 from flask_migrate import Migrate
 
@@ -22,7 +23,14 @@ from Resources.item_resource import item_api
 from Resources.log_resource import log_api
 
 from Resources.authentication_resource import api as authApi
-from Services.Utils.json_encoder import CustomJSONProvider
+from Services.Utils.json_encoder import json_provider_class
+from Services.OpenMeteoApi.forecast_cache import forecast_cache
+from Services.OpenMeteoApi.forecast_scheduler import register_forecast_scheduler
+from Services.forecast_series_service import register_forecast_storage_commands
+from Services.point_service import poi_tile_cache
+from Services.route_service import route_cache
+from Services.trip_service import trip_access_cache
+from Services.user_service import user_status_cache
 
 
 def createApp(config_mode:str):
@@ -60,7 +68,22 @@ def createApp(config_mode:str):
     # Register error handlers
     register_error_handlers(app)
 
-    app.json_provider_class = CustomJSONProvider
+    # Count SQL statements per request
+    register_query_instrumentation(app)
+
+    poi_tile_cache.configure(maxsize=app.config["POI_CACHE_SIZE"], ttl=app.config["POI_CACHE_TTL"])
+    trip_access_cache.configure(ttl=app.config["ACCESS_CACHE_TTL"])
+    user_status_cache.configure(ttl=app.config["USER_CACHE_TTL"])
+    route_cache.configure(ttl=app.config["ROUTE_CACHE_TTL"])
+    forecast_cache.configure(maxsize=app.config["FORECAST_CACHE_SIZE"])
+
+    # Keep the forecasts of upcoming trip days fresh
+    register_forecast_scheduler(app)
+    register_forecast_storage_commands(app)
+
+    # The provider class only applies to apps created after it is set, so replace the instance too
+    app.json_provider_class = json_provider_class(app.config["JSON_PROVIDER"])
+    app.json = app.json_provider_class(app)
     return app
 
 
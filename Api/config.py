@@ -4,6 +4,51 @@ load_dotenv()
 
 class Config:
      SQLALCHEMY_TRACK_MODIFICATIONS = True
+     # Response encoder: 'orjson' (falls back to 'stdlib' when orjson isn't installed) or 'stdlib'
+     JSON_PROVIDER = os.getenv("JSON_PROVIDER", "orjson")
+     # Keyset-paginated listings, see Services/Utils/pagination.py
+     PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", 50))
+     PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", 200))
+     # Rows fetched per round trip when a listing is streamed with ?stream=true
+     STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", 500))
+     # Nearby POI tile cache: number of tiles kept and their lifetime in seconds
+     POI_CACHE_SIZE = int(os.getenv("POI_CACHE_SIZE", 2048))
+     POI_CACHE_TTL = int(os.getenv("POI_CACHE_TTL", 300))
+     # Uploaded GPX/GeoJSON tracks, see PointService.import_track
+     TRACK_IMPORT_BATCH_SIZE = int(os.getenv("TRACK_IMPORT_BATCH_SIZE", 1000))
+     TRACK_IMPORT_MAX_POINTS = int(os.getenv("TRACK_IMPORT_MAX_POINTS", 50000))
+     # Points a day may hold once a track is imported into it. Days sent through DaySchema keep
+     # its limit of 100 points, so days holding imported tracks are edited through the point endpoints
+     TRACK_IMPORT_DAY_MAX_POINTS = int(os.getenv("TRACK_IMPORT_DAY_MAX_POINTS", 5000))
+     # Metres a dropped position may lie from the simplified track, 0 keeps every position
+     TRACK_SIMPLIFY_TOLERANCE = float(os.getenv("TRACK_SIMPLIFY_TOLERANCE", 5))
+     # Lifetime in seconds of the cached trip membership used by the access checks. The cache is
+     # per process, so other workers may keep a traveller's removed access for up to this long
+     ACCESS_CACHE_TTL = int(os.getenv("ACCESS_CACHE_TTL", 30))
+     # Lifetime in seconds of the cached legs of each day, see Services/route_service.py. The cache is
+     # per process, so other workers may report a day's distance from moved points for up to this long
+     ROUTE_CACHE_TTL = int(os.getenv("ROUTE_CACHE_TTL", 300))
+     # Lifetime in seconds of the cached user status checked on every authenticated request
+     USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 60))
+     # Per-request SQL statement counting, see Api/query_instrumentation.py
+     QUERY_INSTRUMENTATION = os.getenv("QUERY_INSTRUMENTATION", "true").lower() == "true"
+     QUERY_COUNT_WARNING_THRESHOLD = int(os.getenv("QUERY_COUNT_WARNING_THRESHOLD", 30))
+     QUERY_STATS_HEADERS = True
+     # Open-Meteo endpoints used by the forecast services
+     OPEN_METEO_FORECAST_URL = os.getenv("OPEN_METEO_FORECAST_URL", "https://api.open-meteo.com/v1/forecast")
+     OPEN_METEO_MARINE_URL = os.getenv("OPEN_METEO_MARINE_URL", "https://marine-api.open-meteo.com/v1/marine")
+     # Days ahead the marine endpoint forecasts, later days are skipped by SeaService.refresh_days
+     OPEN_METEO_MARINE_FORECAST_DAYS = int(os.getenv("OPEN_METEO_MARINE_FORECAST_DAYS", 8))
+     # Forecasts kept by grid cell, see Services/OpenMeteoApi/forecast_cache.py
+     FORECAST_CACHE_SIZE = int(os.getenv("FORECAST_CACHE_SIZE", 4096))
+     # Background refresh of upcoming days' forecasts, see Services/OpenMeteoApi/forecast_scheduler.py
+     FORECAST_REFRESH_ENABLED = os.getenv("FORECAST_REFRESH_ENABLED", "false").lower() == "true"
+     FORECAST_REFRESH_INTERVAL = int(os.getenv("FORECAST_REFRESH_INTERVAL", 3600))
+     FORECAST_REFRESH_DAYS_AHEAD = int(os.getenv("FORECAST_REFRESH_DAYS_AHEAD", 7))
+     FORECAST_REFRESH_WORKERS = int(os.getenv("FORECAST_REFRESH_WORKERS", 4))
+     FORECAST_REQUESTS_PER_MINUTE = int(os.getenv("FORECAST_REQUESTS_PER_MINUTE", 120))
+     # 'rows' (a WeatherState/SeaState row per hour) or 'series', see Services/forecast_series_service.py
+     FORECAST_STORAGE = os.getenv("FORECAST_STORAGE", "rows")
 class DevelopmentConfig(Config):
     DEVELOPMENT = True
     DEBUG = True
@@ -18,6 +63,7 @@ class TestingConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.getenv("TEST_DATABASE_URL")
     SECRET_KEY = os.getenv("TEST_SECRET_KEY", "test-secret-key")
     JWT_SECRET_KEY = os.getenv("TEST_JWT_SECRET_KEY", "test-jwt-secret-key")
+    FORECAST_REFRESH_ENABLED = False
     
 class StagingConfig(Config):
     DEVELOPMENT = True
@@ -28,6 +74,8 @@ class StagingConfig(Config):
     
 class ProductionConfig(Config):
     DEBUG = False
+    QUERY_INSTRUMENTATION = os.getenv("QUERY_INSTRUMENTATION", "false").lower() == "true"
+    QUERY_STATS_HEADERS = False
     SQLALCHEMY_DATABASE_URI = os.getenv("PRODUCTION_DATABASE_URL")
     SECRET_KEY = os.getenv("PRODUCTION_SECRET_KEY")
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
@@ -74,5 +74,8 @@ def setup_logging(app):
     else:
         logging.getLogger('sqlalchemy.engine').setLevel(logging.WARNING)
     
+    # Requests issuing too many SQL statements are reported as warnings
+    logging.getLogger('Api.query_instrumentation').setLevel(logging.INFO if app.config.get('DEBUG') else logging.WARNING)
+    
     app.logger.info(f"Logging configured at {log_level} level")
     app.logger.info(f"Log file: {os.path.join(log_dir, 'kayak-trip-planner.log')}")
@@ -0,0 +1,119 @@
+"""
+Per-request SQL instrumentation.
+
+Counts the statements each request issues, the time spent in the database and the
+statements repeated with the same shape (the usual sign of an N+1 access pattern).
+Requests issuing more statements than QUERY_COUNT_WARNING_THRESHOLD are logged as
+warnings, and when QUERY_STATS_HEADERS is set the figures are returned in X-DB-*
+response headers. Streamed responses are reported when they are closed, their
+body being generated after the headers are sent, and carry no X-DB-* headers.
+Register it in the app factory.
+"""
+from collections import Counter
+import logging
+import re
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+from Api.database import db
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryStats:
+    """Statements issued while handling one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        self.shapes[_WHITESPACE.sub(" ", statement).strip()] += 1
+
+    @property
+    def duplicates(self) -> int:
+        """Number of statements that repeated the shape of an earlier one."""
+        return sum(count - 1 for count in self.shapes.values() if count > 1)
+
+    def most_repeated(self, limit: int = 3):
+        return [(shape, count) for shape, count in self.shapes.most_common(limit) if count > 1]
+
+
+def register_query_instrumentation(app):
+    """
+    Attach the statement counters to the app's engine and request lifecycle.
+
+    Does nothing unless QUERY_INSTRUMENTATION is enabled in the app config.
+
+    Args:
+        app: Flask application instance
+    """
+    if not app.config.get("QUERY_INSTRUMENTATION"):
+        return
+
+    expose_headers = app.config.get("QUERY_STATS_HEADERS", False)
+
+    with app.app_context():
+        engine = db.engine
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    @app.before_request
+    def start_query_stats():
+        g.query_stats = QueryStats()
+
+    @app.after_request
+    def report_query_stats(response):
+        stats = g.get("query_stats")
+        if stats is None:
+            return response
+
+        threshold = app.config.get("QUERY_COUNT_WARNING_THRESHOLD", 30)
+        if response.is_streamed:
+            # The body, and the statements reading it, only run once the response
+            # is sent: keep counting into g and report when it is closed
+            method, path = request.method, request.path
+            response.call_on_close(lambda: _report(stats, method, path, threshold))
+            return response
+
+        g.pop("query_stats", None)
+        _report(stats, request.method, request.path, threshold)
+        if expose_headers:
+            response.headers["X-DB-Query-Count"] = str(stats.count)
+            response.headers["X-DB-Query-Time-Ms"] = f"{stats.total_time * 1000:.2f}"
+            response.headers["X-DB-Duplicate-Queries"] = str(stats.duplicates)
+        return response
+
+
+def _report(stats: QueryStats, method: str, path: str, threshold: int) -> None:
+    """Log the requests issuing more statements than the threshold."""
+    if stats.count > threshold:
+        repeated = "; ".join(f"{count}x {shape[:120]}" for shape, count in stats.most_repeated())
+        logger.warning(
+            f"{method} {path} issued {stats.count} SQL statements "
+            f"in {stats.total_time * 1000:.1f}ms ({stats.duplicates} repeated): {repeated}"
+        )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the statement's own context, which a failed statement simply drops
+    if context is not None:
+        context._query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_start_time", None)
+    if started is None:
+        return
+    if has_request_context():
+        stats = g.get("query_stats")
+        if stats is not None:
+            stats.record(statement, time.perf_counter() - started)
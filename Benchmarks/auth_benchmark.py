@@ -0,0 +1,66 @@
+"""
+Benchmark of the per-request token verification cost.
+
+Compares JWTService.verify_token with an empty decoded-token cache (every call
+checks the HMAC signature and decodes the claims) against a warm cache (the
+payload is served by digest lookup).
+
+Usage:
+    python -m Benchmarks.auth_benchmark [--requests N] [--tokens N]
+"""
+import argparse
+import random
+import timeit
+
+from flask import Flask
+
+from Services.Middleware.auth_middleware import JWTService, token_cache
+
+
+def _make_tokens(count: int):
+    return [
+        JWTService.generate_access_token(f"user-{index}", f"user{index}@example.com", False)
+        for index in range(count)
+    ]
+
+
+def _verify_cold(tokens, requests: int) -> None:
+    for _ in range(requests):
+        token_cache.clear()
+        JWTService.verify_token(random.choice(tokens))
+
+
+def _verify_warm(tokens, requests: int) -> None:
+    for _ in range(requests):
+        JWTService.verify_token(random.choice(tokens))
+
+
+def run(requests: int, tokens: int) -> None:
+    app = Flask(__name__)
+    app.config["JWT_SECRET_KEY"] = "benchmark-jwt-secret-key-of-32-bytes"
+
+    with app.app_context():
+        pool = _make_tokens(tokens)
+
+        cold = min(timeit.repeat(lambda: _verify_cold(pool, requests), number=1, repeat=5))
+        token_cache.clear()
+        before = JWTService.get_token_cache_stats()
+        warm = min(timeit.repeat(lambda: _verify_warm(pool, requests), number=1, repeat=5))
+        after = JWTService.get_token_cache_stats()
+
+    hits = after["hits"] - before["hits"]
+    lookups = hits + after["misses"] - before["misses"]
+
+    print(f"{requests} verifications over {tokens} distinct tokens")
+    print(f"  uncached: {cold / requests * 1e6:8.2f} us/request")
+    print(f"  cached:   {warm / requests * 1e6:8.2f} us/request")
+    print(f"  speedup:  {cold / warm:8.1f}x")
+    print(f"  cache hit rate (cached runs): {hits / lookups:.2%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000, help="Verifications per run")
+    parser.add_argument("--tokens", type=int, default=50, help="Distinct bearer tokens in use")
+    args = parser.parse_args()
+    run(args.requests, args.tokens)
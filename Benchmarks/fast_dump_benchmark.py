@@ -0,0 +1,73 @@
+"""
+Benchmark of the compiled dumpers against marshmallow on list payloads.
+
+Builds points (linked to the next one, with an image every tenth), logs and
+inventories of items in memory, then dumps each collection with the shared
+many=True schema of the registry and with the compiled dumper of get_dumper.
+
+Usage:
+    python -m Benchmarks.fast_dump_benchmark [--rows N] [--runs N]
+"""
+import argparse
+import timeit
+from decimal import Decimal
+
+import Api.app  # noqa: F401 - imports every model the mappers refer to
+from Models.image import Image
+from Models.inventory import Inventory
+from Models.item import Item, ItemCategoryType
+from Models.log import Log
+from Models.point import Point, PointType
+from Schemas.fast_dump import get_dumper
+from Schemas.inventory_schema import InventorySchema
+from Schemas.log_schema import LogSchema
+from Schemas.point_schema import PointSchema
+from Schemas.registry import get_schema
+
+
+def _points(count: int):
+    points = []
+    following = None
+    for index in reversed(range(count)):
+        images = [Image(name=f"{index}.jpg", location=f"/images/{index}.jpg", size=2.0)] if index % 10 == 0 else []
+        following = Point(
+            type=PointType.POSITION,
+            latitude=Decimal("43.7") + Decimal(index) / 10000,
+            longitude=Decimal("10.4") + Decimal(index) / 10000,
+            next=following,
+            images=images,
+        )
+        points.append(following)
+    return points[::-1]
+
+
+def run(rows: int, runs: int) -> None:
+    categories = list(ItemCategoryType)
+    collections = {
+        "points": (PointSchema, _points(rows)),
+        "logs": (LogSchema, [Log(hours=Decimal(index % 24), avg_sea=Decimal(index % 10)) for index in range(rows)]),
+        "inventories of 20 items": (InventorySchema, [
+            Inventory(items=[Item(name=f"item {item}", category=categories[item % len(categories)], checked=False) for item in range(20)])
+            for _ in range(rows // 20)
+        ]),
+    }
+
+    print(f"Dumping {rows} rows per collection, best of 5 runs of {runs}")
+    for label, (schema_class, objs) in collections.items():
+        schema = get_schema(schema_class, many=True)
+        dump = get_dumper(schema_class)
+        assert schema.dump(objs) == [dump(obj) for obj in objs]
+        schema_time = min(timeit.repeat(lambda: schema.dump(objs), number=runs, repeat=5)) / runs
+        compiled_time = min(timeit.repeat(lambda: [dump(obj) for obj in objs], number=runs, repeat=5)) / runs
+        print(f"  {label}:")
+        print(f"    marshmallow: {schema_time * 1000:8.1f} ms")
+        print(f"    compiled:    {compiled_time * 1000:8.1f} ms")
+        print(f"    speedup:     {schema_time / compiled_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000, help="Rows per collection")
+    parser.add_argument("--runs", type=int, default=5, help="Dumps per timing")
+    args = parser.parse_args()
+    run(args.rows, args.runs)
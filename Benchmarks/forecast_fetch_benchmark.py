@@ -0,0 +1,88 @@
+"""
+Benchmark of fetching forecasts for many days.
+
+Serves the Open-Meteo endpoints from a local stub that answers every request
+after a fixed latency, then fetches the weather and marine forecasts of a set of
+upcoming days once with the blocking client (one request per day and source, as
+the services do without a warm cache) and once with AsyncForecastFetcher.prefetch
+(batched multi-location requests running concurrently). A third run issues the
+same fetch from several coroutines at once to show request coalescing.
+
+Usage:
+    python -m Benchmarks.forecast_fetch_benchmark [--days N] [--cells N] [--latency S]
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+
+from Services.OpenMeteoApi.async_client import AsyncForecastFetcher
+from Services.OpenMeteoApi.client import OpenMeteoClient, hourly_params
+from Services.OpenMeteoApi.forecast_cache import forecast_cache
+from Services.OpenMeteoApi.sea_service import HOURLY_VARIABLES as MARINE_VARIABLES, MARINE_MODEL
+from Services.OpenMeteoApi.weather_service import HOURLY_VARIABLES as WEATHER_VARIABLES, WEATHER_MODEL
+from Tests.open_meteo_stub import OpenMeteoStub
+
+
+def _locations(days: int, cells: int):
+    """Days spread over a week and over `cells` spots of a stretch of coast."""
+    random.seed(7)
+    start = date.today()
+    spots = [(43.0 + index * 0.1, 10.0 + index * 0.1) for index in range(cells)]
+    return [(*random.choice(spots), start + timedelta(days=random.randrange(7))) for _ in range(days)]
+
+
+def _sequential(client: OpenMeteoClient, locations) -> None:
+    for location in locations:
+        client.forecast(hourly_params([location], WEATHER_VARIABLES, WEATHER_MODEL))
+        client.marine(hourly_params([location], list(MARINE_VARIABLES.values()), MARINE_MODEL))
+
+
+def run(days: int, cells: int, latency: float) -> None:
+    stub = OpenMeteoStub(latency=latency).start()
+    urls = {"forecast_url": f"{stub.url}/v1/forecast", "marine_url": f"{stub.url}/v1/marine"}
+    locations = _locations(days, cells)
+
+    try:
+        started = time.perf_counter()
+        _sequential(OpenMeteoClient(**urls), locations)
+        sequential_time = time.perf_counter() - started
+        sequential_requests = len(stub.requests)
+
+        stub.requests.clear()
+        forecast_cache.clear()
+        fetcher = AsyncForecastFetcher(**urls)
+        started = time.perf_counter()
+        fetcher.prefetch(locations, locations)
+        async_time = time.perf_counter() - started
+        async_requests = len(stub.requests)
+
+        stub.requests.clear()
+        coalescing = AsyncForecastFetcher(**urls)
+
+        async def concurrent_callers(count: int):
+            async with coalescing:
+                await asyncio.gather(*(
+                    coalescing.fetch("weather", locations, WEATHER_VARIABLES, WEATHER_MODEL) for _ in range(count)
+                ))
+
+        asyncio.run(concurrent_callers(10))
+        coalesced_requests = len(stub.requests)
+    finally:
+        stub.stop()
+
+    print(f"Weather and marine forecasts of {days} days over {cells} spots, {latency * 1000:.0f} ms per response")
+    print(f"  blocking, one request per day: {sequential_time * 1000:8.1f} ms {sequential_requests:5d} requests")
+    print(f"  async batched and concurrent:  {async_time * 1000:8.1f} ms {async_requests:5d} requests")
+    print(f"  speedup:                       {sequential_time / async_time:8.1f}x")
+    print(f"  10 concurrent identical weather fetches: {coalesced_requests} requests")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=200, help="Days to fetch")
+    parser.add_argument("--cells", type=int, default=40, help="Distinct spots the days are at")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub response latency in seconds")
+    args = parser.parse_args()
+    run(args.days, args.cells, args.latency)
@@ -0,0 +1,146 @@
+"""
+Benchmark of ItineraryService.update_itinerary on a long itinerary.
+
+Saves a 60-day itinerary (5 points per day) where a single day changed, once
+with the previous strategy (delete every day and insert them all again) and once
+with the incremental diff, reporting wall time and SQL statements issued.
+
+Needs a database: the testing configuration is used, so TEST_DATABASE_URL must
+point to a scratch database.
+
+Usage:
+    python -m Benchmarks.itinerary_update_benchmark [--days N] [--points N] [--runs N]
+"""
+import argparse
+import copy
+import time
+from datetime import date, timedelta
+from typing import cast
+
+from sqlalchemy import event
+
+from Api.app import createApp
+from Api.database import db
+from Models.itinerary import Itinerary
+from Models.trip import Trip
+from Schemas.itinerary_shema import ItinerarySchema
+from Services.itinerary_service import ItineraryService
+
+
+class _StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+def _itinerary_payload(trip_id, days: int, points: int) -> dict:
+    start = date.today()
+    return {
+        "tripId": str(trip_id),
+        "days": [
+            {
+                "dayNumber": number + 1,
+                "date": (start + timedelta(days=number)).isoformat(),
+                "points": [
+                    {"type": "stop", "latitude": 43.0 + number / 100, "longitude": 10.0 + index / 100}
+                    for index in range(points)
+                ],
+            }
+            for number in range(days)
+        ],
+    }
+
+
+def _strip_ids(payload: dict) -> dict:
+    """The full rewrite reinserts every row, so it can't reuse stored ids."""
+    payload = copy.deepcopy(payload)
+    for day in payload["days"]:
+        day.pop("id", None)
+        day.pop("itineraryId", None)
+        for point in day["points"]:
+            point.pop("id", None)
+            point.pop("dayId", None)
+    return payload
+
+
+def _full_rewrite(itinerary_id: str, payload: dict) -> None:
+    """The update strategy used before the diff: replace every day."""
+    existing = ItineraryService.get_itinerary_by_id(itinerary_id)
+    updated = cast(Itinerary, ItinerarySchema().load(payload))
+    for day in list(existing.days):
+        db.session.delete(day)
+    db.session.flush()
+    for day in updated.days:
+        day.itinerary_id = existing.id
+        existing.days.append(day)
+    db.session.commit()
+
+
+def _measure(prepare, update, runs: int):
+    """Average time and statements of update(payload), payloads built by prepare() outside the measure."""
+    counter = _StatementCounter()
+    elapsed = 0.0
+    for _ in range(runs):
+        payload = prepare()
+        db.session.expire_all()
+        event.listen(db.engine, "before_cursor_execute", counter)
+        started = time.perf_counter()
+        try:
+            update(payload)
+        finally:
+            elapsed += time.perf_counter() - started
+            event.remove(db.engine, "before_cursor_execute", counter)
+    return elapsed / runs, counter.count / runs
+
+
+def run(days: int, points: int, runs: int) -> None:
+    app = createApp("testing")
+    app.logger.disabled = True
+
+    with app.app_context():
+        trip = Trip()
+        db.session.add(trip)
+        db.session.commit()
+
+        itinerary = ItineraryService.create_itinerary(_itinerary_payload(trip.id, days, points))
+        itinerary_id = str(itinerary.id)
+
+        def changed_payload(revision: int) -> dict:
+            payload = ItinerarySchema(exclude=("days.points.next", "days.points.nearby", "days.points.images")).dump(
+                ItineraryService.get_itinerary_by_id(itinerary_id)
+            )
+            payload["days"].sort(key=lambda day: day["dayNumber"])
+            payload["days"][days // 2]["points"][0]["notes"] = f"revision {revision}"
+            return payload
+
+        revisions = iter(range(1, 2 * runs + 1))
+        rewrite_time, rewrite_statements = _measure(
+            lambda: _strip_ids(changed_payload(next(revisions))),
+            lambda payload: _full_rewrite(itinerary_id, payload),
+            runs,
+        )
+        diff_time, diff_statements = _measure(
+            lambda: changed_payload(next(revisions)),
+            lambda payload: ItineraryService.update_itinerary(itinerary_id, payload),
+            runs,
+        )
+
+        ItineraryService.delete_itinerary(itinerary_id)
+        db.session.delete(db.session.get(Trip, trip.id))
+        db.session.commit()
+
+    print(f"Saving a {days}-day itinerary ({points} points/day) with one changed day, {runs} runs")
+    print(f"  full rewrite:     {rewrite_time * 1000:8.1f} ms/save {rewrite_statements:8.0f} statements/save")
+    print(f"  incremental diff: {diff_time * 1000:8.1f} ms/save {diff_statements:8.0f} statements/save")
+    print(f"  speedup:          {rewrite_time / diff_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=60, help="Days in the itinerary")
+    parser.add_argument("--points", type=int, default=5, help="Points per day")
+    parser.add_argument("--runs", type=int, default=5, help="Saves measured per strategy")
+    args = parser.parse_args()
+    run(args.days, args.points, args.runs)
@@ -0,0 +1,123 @@
+"""
+Benchmark of the JSON providers on trip payloads.
+
+Encodes the payload of a full trip (itinerary days with their points, weather and
+sea states, inventory items) as returned by GET /api/trip/<id> with the stdlib
+CustomJSONProvider and the orjson-backed OrjsonProvider, building the response the
+way jsonify does. The payload is encoded twice: as the schemas dump it (strings and
+floats) and with raw UUID, date, time and Decimal values the providers convert.
+
+Usage:
+    python -m Benchmarks.json_provider_benchmark [--days N] [--points N] [--runs N]
+"""
+import argparse
+import timeit
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from uuid import UUID
+
+from flask import Flask
+from uuid_extension import uuid7 as _uuid7
+
+from Services.Utils.json_encoder import CustomJSONProvider, OrjsonProvider
+
+
+def uuid7() -> UUID:
+    # Rows loaded from the database carry plain uuid.UUID ids
+    return UUID(str(_uuid7()))
+
+
+def _trip(days: int, points: int) -> dict:
+    """A trip shaped like TripSchema's dump, with raw values."""
+    start = date(2026, 7, 1)
+    created = datetime(2026, 6, 1, tzinfo=timezone.utc)
+    itinerary_id = uuid7()
+
+    def states(day_id, columns):
+        return [{"day_id": day_id, "time": time(hour), **{column: 1.25 * hour for column in columns}} for hour in range(24)]
+
+    day_list = []
+    for number in range(days):
+        day_id = uuid7()
+        point_ids = [uuid7() for _ in range(points)]
+        day_list.append({
+            "id": day_id,
+            "created": created,
+            "dayNumber": number + 1,
+            "date": start + timedelta(days=number),
+            "itineraryId": itinerary_id,
+            "points": [
+                {
+                    "id": point_id,
+                    "dayId": day_id,
+                    "latitude": Decimal("43.7") + Decimal(index) / 1000,
+                    "longitude": Decimal("10.4") + Decimal(index) / 1000,
+                    "type": "position",
+                    "notes": None,
+                    "images": [],
+                    "next": {"id": point_ids[index + 1]} if index + 1 < points else None,
+                }
+                for index, point_id in enumerate(point_ids)
+            ],
+            "weather": {
+                "day_id": day_id,
+                "model": "best_match",
+                "weather_states": states(day_id, ["temperature", "precipitation", "wind_direction", "wind_force"]),
+            },
+            "sea": {
+                "day_id": day_id,
+                "sea_states": states(day_id, ["wave_height", "wave_direction", "swell_direction", "swell_period"]),
+            },
+        })
+
+    return {
+        "id": uuid7(),
+        "created": created,
+        "itinerary": {"id": itinerary_id, "totalMiles": 123.45, "isPublic": True, "days": day_list},
+        "inventory": {"id": uuid7(), "items": [{"id": uuid7(), "name": f"item {index}", "category": "travel"} for index in range(40)]},
+        "travellers": [{"id": uuid7(), "name": "Paddler", "email": "paddler@example.com"}],
+    }
+
+
+def _dumped(value):
+    """The value as the schemas dump it."""
+    if isinstance(value, dict):
+        return {key: _dumped(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_dumped(item) for item in value]
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def run(days: int, points: int, runs: int) -> None:
+    app = Flask(__name__)
+    raw = _trip(days, points)
+    payloads = {"schema dump": _dumped(raw), "raw values": raw}
+    providers = {"stdlib": CustomJSONProvider(app), "orjson": OrjsonProvider(app)}
+
+    with app.app_context():
+        size = len(providers["stdlib"].response(payloads["schema dump"]).get_data())
+        print(f"Trip of {days} days with {points} points each, {size / 1024:.0f} KiB of JSON")
+        for label, payload in payloads.items():
+            timings = {
+                name: min(timeit.repeat(lambda: provider.response(payload), number=runs, repeat=5)) / runs
+                for name, provider in providers.items()
+            }
+            print(f"  {label}:")
+            for name, seconds in timings.items():
+                print(f"    {name + ':':8s} {seconds * 1000:8.2f} ms/response")
+            print(f"    speedup: {timings['stdlib'] / timings['orjson']:8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=30, help="Days of the itinerary")
+    parser.add_argument("--points", type=int, default=50, help="Points per day")
+    parser.add_argument("--runs", type=int, default=20, help="Responses encoded per timing")
+    args = parser.parse_args()
+    run(args.days, args.points, args.runs)
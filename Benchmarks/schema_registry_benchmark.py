@@ -0,0 +1,86 @@
+"""
+Benchmark of dumping trips with fresh and shared schema instances.
+
+Builds trips in memory (no database), each with its travellers, a few itinerary
+days of points and an inventory, then dumps them as the handlers do: one trip per
+request, and the trips of a user as a list. Each is timed once building the
+schemas for every call, as the handlers used to, and once through get_schema.
+
+Usage:
+    python -m Benchmarks.schema_registry_benchmark [--trips N] [--runs N]
+"""
+import argparse
+import timeit
+from datetime import date, timedelta
+from decimal import Decimal
+
+import Api.app  # noqa: F401 - imports every model the mappers refer to
+from Models.day import Day
+from Models.inventory import Inventory
+from Models.item import Item
+from Models.itinerary import Itinerary
+from Models.point import Point
+from Models.trip import Trip
+from Models.user import User
+from Schemas.registry import get_schema
+from Schemas.trip_schema import TripSchema
+
+
+def _trips(count: int):
+    """Trips of two travellers with a 3-day itinerary of 4 points a day and 5 items."""
+    travellers = [
+        User(name=f"Paddler {index}", surname="Rossi", username=f"paddler{index}", mail=f"p{index}@example.com", phone=str(index))
+        for index in range(2)
+    ]
+    start = date(2026, 7, 1)
+    trips = []
+    for number in range(count):
+        days = [
+            Day(
+                day_number=index + 1,
+                date=start + timedelta(days=index),
+                points=[Point(latitude=Decimal("43.7") + point, longitude=Decimal("10.4") + point) for point in range(4)],
+            )
+            for index in range(3)
+        ]
+        trips.append(Trip(
+            destination=f"Destination {number}",
+            description="Coastal trip",
+            is_draft=False,
+            travellers=list(travellers),
+            itinerary=Itinerary(is_public=True, total_miles=Decimal("42.5"), days=days),
+            inventory=Inventory(items=[Item(name=f"item {index}") for index in range(5)]),
+        ))
+    return trips
+
+
+def run(trips: int, runs: int) -> None:
+    rows = _trips(trips)
+    cases = {
+        "one trip per request": (
+            lambda: [TripSchema().dump(trip) for trip in rows],
+            lambda: [get_schema(TripSchema).dump(trip) for trip in rows],
+        ),
+        "trips as a list": (
+            lambda: [TripSchema().dump(trip) for trip in rows],
+            lambda: get_schema(TripSchema, many=True).dump(rows),
+        ),
+    }
+
+    print(f"Dumping {trips} trips, best of 5 runs of {runs}")
+    for label, (fresh, shared) in cases.items():
+        assert fresh() == shared()
+        fresh_time = min(timeit.repeat(fresh, number=runs, repeat=5)) / runs
+        shared_time = min(timeit.repeat(shared, number=runs, repeat=5)) / runs
+        print(f"  {label}:")
+        print(f"    fresh schemas: {fresh_time * 1000:8.1f} ms {trips / fresh_time:8.0f} trips/s")
+        print(f"    registry:      {shared_time * 1000:8.1f} ms {trips / shared_time:8.0f} trips/s")
+        print(f"    speedup:       {fresh_time / shared_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trips", type=int, default=1000, help="Trips dumped per run")
+    parser.add_argument("--runs", type=int, default=3, help="Dumps per timing")
+    args = parser.parse_args()
+    run(args.trips, args.runs)
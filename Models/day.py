@@ -3,6 +3,7 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import List, Optional, TYPE_CHECKING
 
 from Models.base_model import BaseModel
+from Services.Utils.point_chain import walk_chains
 from uuid import UUID as _UUID
 
 if TYPE_CHECKING:
@@ -10,6 +11,7 @@ if TYPE_CHECKING:
     from Models.weather import Weather
     from Models.sea import Sea
     from Models.itinerary import Itinerary
+    from Models.forecast_series import ForecastSeries
 
 
 class Day(BaseModel):
@@ -27,6 +29,21 @@ class Day(BaseModel):
     sea: Mapped[Optional["Sea"]] = relationship(
         foreign_keys="Sea.day_id", uselist=False, cascade="all, delete,save-update"
     )
+    # Packed forecast series, used instead of the weather and sea states when FORECAST_STORAGE is 'series'
+    forecast_series: Mapped[List["ForecastSeries"]] = relationship(
+        foreign_keys="ForecastSeries.day_id", cascade="all, delete-orphan", passive_deletes=True
+    )
+
+    @property
+    def route_points(self) -> Optional[List["Point"]]:
+        """Points of the day in route order, following their next links."""
+        if not self.points or any(point.id is None for point in self.points):
+            return self.points
+        positions = {
+            point_id: index
+            for index, point_id in enumerate(walk_chains({point.id: point.next_id for point in self.points}).order)
+        }
+        return sorted(self.points, key=lambda point: positions[point.id])
 
     def __repr__(self):
         return f'<Day "{self.day_number}, Date {self.date}, Itinerary {self.itinerary_id}">'
@@ -0,0 +1,78 @@
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Type
+
+import numpy as np
+from Api.database import db
+from sqlalchemy import UUID, DateTime, Integer, LargeBinary, String, Time, ForeignKeyConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from uuid import UUID as _UUID
+
+# Packed values: little-endian float32, NaN where missing
+SERIES_DTYPE = np.dtype("<f4")
+
+
+class ForecastSeries (db.Model):
+    """
+    Compact storage of one forecast variable over a day.
+
+    values packs the series as little-endian float32 (NaN where missing); the time
+    axis is implicit, the i-th value being at start + i * interval_seconds.
+    """
+    __table_args__ = (
+        ForeignKeyConstraint(['day_id'], ['day.id'], name="day_foreign_key_in_forecast_series", ondelete="CASCADE"),
+    )
+
+    day_id: Mapped[_UUID] = mapped_column(UUID, primary_key=True)
+    # 'weather' or 'marine'
+    source: Mapped[str] = mapped_column(String(16), primary_key=True)
+    variable: Mapped[str] = mapped_column(String(64), primary_key=True)
+    start: Mapped[Time] = mapped_column(Time, nullable=False)
+    interval_seconds: Mapped[int] = mapped_column(Integer, nullable=False)
+    values: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    recorded_at: Mapped[DateTime] = mapped_column(DateTime, nullable=False, server_default=db.func.now())
+
+    @staticmethod
+    def pack(values: np.ndarray) -> bytes:
+        return np.asarray(values, dtype=SERIES_DTYPE).tobytes()
+
+    @staticmethod
+    def unpack(blob: bytes) -> np.ndarray:
+        return np.frombuffer(blob, dtype=SERIES_DTYPE)
+
+    @staticmethod
+    def expand(series: Iterable["ForecastSeries"], state_class: Type[db.Model]) -> List[db.Model]:
+        """
+        Expand the series of one day and source into state objects, like the rows stored per hour.
+
+        The states are built in memory and not added to the session.
+
+        Args:
+            series: ForecastSeries rows of the day and source
+            state_class: WeatherState or SeaState
+
+        Returns:
+            One state per time step, in time order
+        """
+        rows = list(series)
+        if not rows:
+            return []
+
+        start = datetime.combine(date.min, rows[0].start)
+        step = timedelta(seconds=rows[0].interval_seconds)
+        values = {row.variable: ForecastSeries.unpack(row.values) for row in rows}
+        length = max(len(column) for column in values.values())
+
+        states = []
+        for index in range(length):
+            state = state_class(day_id=rows[0].day_id, time=(start + index * step).time())
+            for variable, column in values.items():
+                value = float(column[index]) if index < len(column) and not np.isnan(column[index]) else None
+                if variable == "cloud" and value is not None:
+                    setattr(state, variable, f"{value:.0f}%")
+                else:
+                    setattr(state, variable, round(value, 2) if value is not None else None)
+            states.append(state)
+        return states
+
+    def __repr__(self):
+        return f'<Forecast series "Day id {self.day_id}, {self.source} {self.variable}">'
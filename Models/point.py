@@ -1,11 +1,12 @@
 import uuid_extension
 
 from Api.database import db
-from sqlalchemy import UUID, Integer, Numeric, String, Text, Enum, ForeignKey, ForeignKeyConstraint
+from sqlalchemy import UUID, Integer, Numeric, String, Text, Enum, ForeignKey, ForeignKeyConstraint, Index, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
 from Models.base_model import BaseModel
 from Models.point_has_image import PointHasImage
+from Services.Utils.geo import GEOHASH_PRECISION, encode_geohash
 from typing import Optional, List, TYPE_CHECKING
 from uuid import UUID as _UUID
 
@@ -20,12 +21,15 @@ class PointType(enum.Enum):
 class Point (BaseModel):
     __table_args__ = (
         ForeignKeyConstraint(['day_id'],['day.id'], name="day_foreign_key_in_point"),
+        Index('ix_point_geocell', 'geocell', postgresql_ops={'geocell': 'varchar_pattern_ops'}),
     )
 
     latitude: Mapped[Optional[Numeric]] = mapped_column(Numeric, nullable=True)
     longitude: Mapped[Optional[Numeric]] = mapped_column(Numeric, nullable=True)
     notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     type: Mapped[Optional[PointType]] = mapped_column(Enum(PointType), nullable=True)
+    # Geohash of (latitude, longitude), maintained by the listeners below
+    geocell: Mapped[Optional[str]] = mapped_column(String(GEOHASH_PRECISION), nullable=True)
     day_id: Mapped[Optional[_UUID]] = mapped_column(UUID, nullable=True)
     next_id: Mapped[Optional[_UUID]] = mapped_column(UUID, ForeignKey('point.id'), nullable=True)
 
@@ -39,3 +43,12 @@ class Point (BaseModel):
 
     def __repr__(self):
         return f'<Point "({self.latitude}, {self.longitude}), type {self.type}">'
+
+
+@event.listens_for(Point, 'before_insert')
+@event.listens_for(Point, 'before_update')
+def _set_geocell(mapper, connection, target: Point):
+    if target.latitude is None or target.longitude is None:
+        target.geocell = None
+    else:
+        target.geocell = encode_geohash(float(target.latitude), float(target.longitude))
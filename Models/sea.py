@@ -1,11 +1,11 @@
 from Api.database import db
 from sqlalchemy import UUID, DateTime, Integer, String, Time, ForeignKeyConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from typing import List, Optional, TYPE_CHECKING
+from typing import List, Optional
 from uuid import UUID as _UUID
 
-if TYPE_CHECKING:
-    from Models.sea_state import SeaState
+from Models.forecast_series import ForecastSeries
+from Models.sea_state import SeaState
 
 class Sea (db.Model):
     __table_args__ = (
@@ -17,4 +17,14 @@ class Sea (db.Model):
     low_tide: Mapped[Optional[Time]] = mapped_column(Time, nullable=True)
     
     sea_states: Mapped[List["SeaState"]] = relationship(foreign_keys="SeaState.day_id", cascade='all, delete,save-update')
-    recorded_at: Mapped[DateTime] = mapped_column(DateTime, nullable=False, server_default=db.func.now())
\ No newline at end of file
+    # Packed marine series of the day, stored instead of the states when FORECAST_STORAGE is 'series'
+    forecast_series: Mapped[List["ForecastSeries"]] = relationship(
+        primaryjoin="and_(Sea.day_id == foreign(ForecastSeries.day_id), ForecastSeries.source == 'marine')",
+        viewonly=True,
+    )
+    recorded_at: Mapped[DateTime] = mapped_column(DateTime, nullable=False, server_default=db.func.now())
+
+    @property
+    def states(self) -> List["SeaState"]:
+        """Hourly states, expanded from the series when the forecast is stored as series."""
+        return self.sea_states or ForecastSeries.expand(self.forecast_series, SeaState)
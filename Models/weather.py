@@ -1,11 +1,10 @@
 from Api.database import db
 from sqlalchemy import UUID, Integer, String, ForeignKeyConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from typing import Optional, List, TYPE_CHECKING
+from typing import Optional, List
 from uuid import UUID as _UUID
-
-if TYPE_CHECKING:
-    from Models.weather_state import WeatherState
+from Models.forecast_series import ForecastSeries
+from Models.weather_state import WeatherState
 
 
 class Weather (db.Model):
@@ -16,6 +15,16 @@ class Weather (db.Model):
     model: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     
     weather_states: Mapped[List["WeatherState"]] = relationship(foreign_keys="WeatherState.day_id", cascade='all, delete,save-update')
+    # Packed weather series of the day, stored instead of the states when FORECAST_STORAGE is 'series'
+    forecast_series: Mapped[List["ForecastSeries"]] = relationship(
+        primaryjoin="and_(Weather.day_id == foreign(ForecastSeries.day_id), ForecastSeries.source == 'weather')",
+        viewonly=True,
+    )
+
+    @property
+    def states(self) -> List["WeatherState"]:
+        """Hourly states, expanded from the series when the forecast is stored as series."""
+        return self.weather_states or ForecastSeries.expand(self.forecast_series, WeatherState)
 
     def __repr__(self):
         return f'<Weather "Day id {self.day_id}, Model {self.model} Weather states {self.weather_states}">'
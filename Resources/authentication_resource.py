@@ -96,3 +96,15 @@ def refresh_token():
         "access_token": access_token
     }
     return jsonify(response_object), HTTPStatus.OK
+
+
+@api.route("/api/auth/token-cache", methods=["GET"])
+@JWTService.authenticate_admin
+def get_token_cache_stats(user):
+    """
+    Reports the decoded-token cache counters, admin only.
+
+    Returns:
+        JSON response with the cache stats and 200 status code
+    """
+    return jsonify(JWTService.get_token_cache_stats()), HTTPStatus.OK
@@ -4,6 +4,7 @@ from flask import Blueprint, jsonify, request, abort
 from werkzeug.exceptions import HTTPException
 from sqlalchemy.exc import IntegrityError, NoResultFound
 from Schemas.day_schema import DaySchema
+from Schemas.registry import get_schema
 from Services.Middleware.auth_middleware import JWTService
 from Services.Middleware.privileges_middleware import require_owner
 from Services.day_service import DayService
@@ -18,7 +19,7 @@ day_api = Blueprint('day', __name__, url_prefix=DAY_ENDPOINT)
 @require_owner('day', parent_resource=('itinerary', 'itinerary_id'))
 def read_by_itinerary(itinerary_id: str):
     days = DayService.get_by_itinerary(itinerary_id)
-    return jsonify([DaySchema().dump(day) for day in days]), HTTPStatus.OK
+    return jsonify(get_schema(DaySchema, many=True).dump(days)), HTTPStatus.OK
 
 
 @day_api.route("/<string:id>", methods=['GET'])
@@ -26,7 +27,7 @@ def read_by_itinerary(itinerary_id: str):
 def read_by_id(id: str):
     try:
         day = DayService.get_day_by_id(id)
-        return jsonify(DaySchema().dump(day)), HTTPStatus.OK
+        return jsonify(get_schema(DaySchema).dump(day)), HTTPStatus.OK
     except HTTPException:
         raise
     except NoResultFound as e:
@@ -34,6 +35,20 @@ def read_by_id(id: str):
     except Exception as e:
         abort(HTTPStatus.INTERNAL_SERVER_ERROR, description=str(e))
 
+@day_api.route("/by-ids", methods=['POST'])
+@JWTService.authenticate_restful
+@require_owner('day', id_param='ids', from_body=True, many=True)
+def read_by_ids():
+    """POST /api/day/by-ids - Read several days, body {"ids": [...]}"""
+    try:
+        days = DayService.get_by_ids(request.get_json()["ids"])
+        return jsonify(get_schema(DaySchema, many=True).dump(days)), HTTPStatus.OK
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error reading days by ids: {e}")
+        abort(HTTPStatus.INTERNAL_SERVER_ERROR, description=str(e))
+
 @day_api.route("/by-key", methods=['POST'])
 @JWTService.authenticate_restful
 @require_owner('day', parent_resource=('itinerary', 'itineraryId'), from_body=True)
@@ -45,7 +60,7 @@ def read_by_key():
             abort(HTTPStatus.BAD_REQUEST, description="Missing or incomplete day key")
 
         day = DayService.get_by_key_from_dict(body)
-        return jsonify(DaySchema().dump(day)), HTTPStatus.OK
+        return jsonify(get_schema(DaySchema).dump(day)), HTTPStatus.OK
     except HTTPException:
         raise
     except Exception as e:
@@ -60,7 +75,7 @@ def create_day():
     """POST /api/day - Create new day"""
     try:
         created_day = DayService.create_day(request.get_json())
-        return jsonify(DaySchema().dump(created_day)), HTTPStatus.CREATED
+        return jsonify(get_schema(DaySchema).dump(created_day)), HTTPStatus.CREATED
     except HTTPException:
         raise
     except IntegrityError as e:
@@ -78,7 +93,7 @@ def update_day(id: str):
     try:
         day_data = request.get_json()
         updated_day = DayService.update_day(id, day_data)
-        return jsonify(DaySchema().dump(updated_day)), HTTPStatus.OK
+        return jsonify(get_schema(DaySchema).dump(updated_day)), HTTPStatus.OK
     except HTTPException:
         raise
     except NoResultFound as e:
@@ -4,10 +4,13 @@ from flask import Blueprint, jsonify, request, abort, g
 from werkzeug.exceptions import HTTPException
 from sqlalchemy.exc import IntegrityError, NoResultFound
 
+from Schemas.fast_dump import get_dumper
 from Schemas.inventory_schema import InventorySchema
+from Schemas.registry import get_schema
 from Services.inventory_service import InventoryService
 from Services.Middleware.auth_middleware import JWTService
 from Services.Middleware.privileges_middleware import require_owner
+from Services.Utils.pagination import page_arguments, page_response
 
 logger = logging.getLogger(__name__)
 
@@ -21,11 +24,14 @@ def get_all_inventories():
     try:
         logger.info("Retrieve all inventories from db")
         user_id = g.current_user_id
-        inventories = InventoryService.get_inventories_by_user(user_id)
-        return jsonify([InventorySchema().dump(inventory) for inventory in inventories]), HTTPStatus.OK
+        limit, after = page_arguments(streamable=True)
+        page = InventoryService.get_inventories_by_user(user_id, limit=limit, after=after)
+        return page_response(page, get_dumper(InventorySchema)), HTTPStatus.OK
         
     except HTTPException:
         raise
+    except ValueError as e:
+        abort(HTTPStatus.BAD_REQUEST, description=str(e))
     except Exception as e:
         logger.error(f"Error retrieving inventories: {e}")
         abort(HTTPStatus.INTERNAL_SERVER_ERROR, description=str(e))
@@ -38,7 +44,7 @@ def get_inventory(id: str):
     try:
         logger.info(f"Retrieve inventory with id {id}")
         inventory = InventoryService.get_inventory_by_id(id)
-        return jsonify(InventorySchema().dump(inventory)), HTTPStatus.OK
+        return jsonify(get_dumper(InventorySchema)(inventory)), HTTPStatus.OK
     
     except HTTPException:
         raise
@@ -55,7 +61,7 @@ def create_inventory():
     try:
         inventory_data = request.get_json()
         inventory = InventoryService.create_inventory(inventory_data)
-        return jsonify(InventorySchema().dump(inventory)), HTTPStatus.CREATED
+        return jsonify(get_schema(InventorySchema).dump(inventory)), HTTPStatus.CREATED
         
     except HTTPException:
         raise
@@ -74,7 +80,7 @@ def update_inventory(id: str):
         logger.info(f"Update inventory {id} in db")
         inventory_data = request.get_json()
         inventory = InventoryService.update_inventory(id, inventory_data)
-        return jsonify(InventorySchema().dump(inventory)), HTTPStatus.OK
+        return jsonify(get_schema(InventorySchema).dump(inventory)), HTTPStatus.OK
         
     except HTTPException:
         raise
@@ -5,6 +5,7 @@ from werkzeug.exceptions import HTTPException
 from sqlalchemy.exc import IntegrityError, NoResultFound
 
 from Schemas.item_schema import ItemSchema
+from Schemas.registry import get_schema
 from Services.item_service import ItemService
 from Services.Middleware.auth_middleware import JWTService
 from Services.Middleware.privileges_middleware import require_owner
@@ -21,7 +22,7 @@ def get_item(id: str):
     """GET /api/item/<id> - Retrieve item by ID"""
     try:
         item = ItemService.get_item_by_id(id)
-        return jsonify(ItemSchema().dump(item)), HTTPStatus.OK
+        return jsonify(get_schema(ItemSchema).dump(item)), HTTPStatus.OK
     
     except HTTPException:
         raise
@@ -39,7 +40,7 @@ def create_item():
     try:
         item_data = request.get_json()
         item = ItemService.create_item(item_data)
-        return jsonify(ItemSchema().dump(item)), HTTPStatus.CREATED
+        return jsonify(get_schema(ItemSchema).dump(item)), HTTPStatus.CREATED
     
     except HTTPException:
         raise
@@ -58,7 +59,7 @@ def update_item(id: str):
         logger.info(f"Update item {id} in db")
         item_data = request.get_json()
         item = ItemService.update_item(id, item_data)
-        return jsonify(ItemSchema().dump(item)), HTTPStatus.OK
+        return jsonify(get_schema(ItemSchema).dump(item)), HTTPStatus.OK
         
     except HTTPException:
         raise
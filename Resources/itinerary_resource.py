@@ -4,11 +4,13 @@ from flask import Blueprint, g, jsonify, request, abort
 from werkzeug.exceptions import HTTPException
 from sqlalchemy.exc import IntegrityError, NoResultFound
 from Schemas.itinerary_shema import ItinerarySchema
+from Schemas.registry import get_schema
 from Models.itinerary import Itinerary
 from Api.database import db
 from Services.Middleware.auth_middleware import JWTService
 from Services.Middleware.privileges_middleware import require_owner
 from Services.itinerary_service import ItineraryService
+from Services.Utils.pagination import page_arguments, page_response
 
 # It will print the name of this module when the main app is running
 logger = logging.getLogger(__name__)
@@ -23,10 +25,13 @@ def get_all_itineraries():
     """GET /api/itinerary - Retrieve all itineraries"""
     try:
         logger.info("Retrieve all itineraries from db")
-        itineraries = ItineraryService.get_itineraries_by_user(g.current_user_id)
+        limit, after = page_arguments(streamable=True)
+        page = ItineraryService.get_itineraries_by_user(g.current_user_id, profile="itinerary_full", limit=limit, after=after)
 
-        return jsonify([ItinerarySchema().dump(itinerary) for itinerary in itineraries]), HTTPStatus.OK
+        return page_response(page, get_schema(ItinerarySchema).dump), HTTPStatus.OK
         
+    except ValueError as e:
+        abort(HTTPStatus.BAD_REQUEST, description=str(e))
     except Exception as e:
         logger.error(f"Error retrieving itineraries: {e}")
         abort(HTTPStatus.INTERNAL_SERVER_ERROR, description=str(e))
@@ -39,12 +44,12 @@ def get_itinerary(id: str):
     """GET /api/itinerary/<id> - Retrieve itinerary by ID"""
     logger.info(f"Retrieve itinerary with id {id}")
     
-    itinerary = ItineraryService.get_itinerary_by_id(id)
+    itinerary = ItineraryService.get_itinerary_by_id(id, profile="itinerary_full")
     
     if not itinerary:
         abort(HTTPStatus.NOT_FOUND, description=f"Itinerary with id {id} not found")
     
-    return jsonify(ItinerarySchema().dump(itinerary)), HTTPStatus.OK
+    return jsonify(get_schema(ItinerarySchema).dump(itinerary)), HTTPStatus.OK
 
 @itinerary_api.route("/create", methods=["POST"])
 @JWTService.authenticate_restful
@@ -53,7 +58,7 @@ def create_itinerary():
     """POST /api/itinerary/create - Create new itinerary"""
     try:
         itinerary = ItineraryService.create_itinerary(request.get_json())
-        return jsonify(ItinerarySchema().dump(itinerary)), HTTPStatus.CREATED
+        return jsonify(get_schema(ItinerarySchema).dump(itinerary)), HTTPStatus.CREATED
         
     except HTTPException as e:
         logger.exception(f"Integrity error creating itinerary: {e}")
@@ -76,7 +81,7 @@ def update_itinerary(id: str):
     try:        
         itinerary_data = request.get_json()
         updated_itinerary = ItineraryService.update_itinerary(id, itinerary_data)
-        return jsonify(ItinerarySchema().dump(updated_itinerary)), HTTPStatus.OK
+        return jsonify(get_schema(ItinerarySchema).dump(updated_itinerary)), HTTPStatus.OK
         
     except HTTPException:
         raise
@@ -4,10 +4,13 @@ import logging
 from flask import Blueprint, abort, g, jsonify, request
 from sqlalchemy.exc import IntegrityError
 from Schemas.log_schema import LogSchema 
+from Schemas.fast_dump import get_dumper
+from Schemas.registry import get_schema
 from Api.database import db
 from Services.Middleware.auth_middleware import JWTService
 from Services.Middleware.privileges_middleware import require_owner
 from Services.log_service import LogService
+from Services.Utils.pagination import page_arguments, page_response
 
 
 logger = logging.getLogger(__name__) # It will print the name of this module when the main app is running
@@ -23,8 +26,11 @@ def get_logs():
     LogResource GET method. Retrieves all the logs associated to a user
     """
     try:        
-        logs = LogService.get_logs_by_user(g.current_user_id)
-        return jsonify([LogSchema().dump(log) for log in logs]), HTTPStatus.OK
+        limit, after = page_arguments(streamable=True)
+        page = LogService.get_logs_by_user(g.current_user_id, limit=limit, after=after)
+        return page_response(page, get_dumper(LogSchema)), HTTPStatus.OK
+    except ValueError as e:
+        abort(HTTPStatus.BAD_REQUEST, description=str(e))
     except Exception as e:
         logger.error(f"Error retrieving logs: {e}")
         abort(HTTPStatus.INTERNAL_SERVER_ERROR, description=f"{e}")
@@ -40,7 +46,8 @@ def get_endorsed_logs():
     try:        
         
         logs = LogService.get_endorsed_logs(g.current_user_id) 
-        return jsonify([LogSchema().dump(log) for log in logs]), HTTPStatus.OK
+        dump = get_dumper(LogSchema)
+        return jsonify([dump(log) for log in logs]), HTTPStatus.OK
     except Exception as e:
         logger.error(f"Error retrieving logs: {e}")
         abort(HTTPStatus.INTERNAL_SERVER_ERROR, description=f"{e}")
@@ -57,7 +64,7 @@ def post():
     try:
         log_json = request.get_json()
         log = LogService.create_log(log_json)
-        return jsonify(LogSchema().dump(log)), HTTPStatus.CREATED
+        return jsonify(get_schema(LogSchema).dump(log)), HTTPStatus.CREATED
     except HTTPException:
         raise
     except IntegrityError as e:
@@ -79,7 +86,7 @@ def update_log(id: str):
     try:
         updated_log = LogService.update_log(id, request.get_json())
 
-        return jsonify(LogSchema().dump(updated_log)), HTTPStatus.OK
+        return jsonify(get_schema(LogSchema).dump(updated_log)), HTTPStatus.OK
     
     except HTTPException:
         raise
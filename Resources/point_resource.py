@@ -3,12 +3,14 @@ from http.client import HTTPException
 import logging
 from sqlite3 import IntegrityError
 from typing import List
-from flask import Blueprint, abort, jsonify, request
-from Models.point import Point
+from flask import Blueprint, abort, current_app, g, jsonify, request
+from Models.point import PointType
 from Schemas.point_schema import PointSchema
+from Schemas.registry import get_schema
 from Services.Middleware.auth_middleware import JWTService
 from Services.Middleware.privileges_middleware import require_owner
 from Services.point_service import PointService
+from Services.Utils.track_parser import parse_track, track_format
 from Api.database import db
 from sqlalchemy.exc import NoResultFound
 
@@ -26,21 +28,44 @@ point_api = Blueprint('point', __name__, url_prefix=POINT_ENDPOINT)
 def get_poi():
     """
     PointResource GET method. Retrieves point(s) of interest.
-        
+
+    Query params:
+        range: Search radius in kilometres
+        long: Longitude of the centre
+        lat: Latitude of the centre
+        type: Optional point type (stop | position | interest); track positions are only returned when asked for
+
     Returns:
         JSON response with point data and 200 status code
     """
+    point_type = request.args.get('type', None, type=str)
+    if point_type is not None:
+        try:
+            point_type = PointType(point_type)
+        except ValueError:
+            abort(HTTPStatus.BAD_REQUEST, description=f"Unknown point type {point_type}")
     try:
         range: float =  request.args.get('range', 0.0, type=float)
         longitude: float = request.args.get('long', 0.0, type=float)
         latitude: float = request.args.get('lat', 0.0, type=float)
-        points:List[Point] = PointService.get_points_in_range(range,longitude, latitude)
+        points: List[dict] = PointService.get_pois_in_range(range, longitude, latitude, point_type, g.current_user_id)
 
-        return jsonify([PointSchema().dump(point) for point in points])
+        return jsonify(points)
     except Exception as e:
         logger.error(f"Error retrieving itineraries: {e}")
         abort(HTTPStatus.INTERNAL_SERVER_ERROR, description=str(e))
 
+@point_api.route("/pois/cache", methods=["GET"])
+@JWTService.authenticate_admin
+def get_poi_cache_stats(user):
+    """
+    PointResource GET method. Reports the POI tile cache counters, admin only.
+
+    Returns:
+        JSON response with the cache stats and 200 status code
+    """
+    return jsonify(PointService.get_poi_cache_stats()), HTTPStatus.OK
+
 @point_api.route("/create", methods=["POST"])
 @JWTService.authenticate_restful
 @require_owner("point", parent_resource=("day", "dayId"), from_body=True)
@@ -54,7 +79,7 @@ def create_point():
     try:
         point_data = request.get_json()
         point = PointService.create_point(point_data)
-        return jsonify(PointSchema().dump(point)), HTTPStatus.CREATED
+        return jsonify(get_schema(PointSchema).dump(point)), HTTPStatus.CREATED
 
     except HTTPException:
             raise
@@ -69,6 +94,43 @@ def create_point():
             db.session.rollback()
             abort(HTTPStatus.INTERNAL_SERVER_ERROR, description=str(e))
 
+@point_api.route("/day/<string:day_id>/import", methods=["POST"])
+@JWTService.authenticate_restful
+@require_owner("point", parent_resource=("day", "day_id"))
+def import_track(day_id: str):
+    """
+    PointResource POST method. Imports a GPX or GeoJSON track into a day.
+
+    The track is sent as the multipart file 'file', or as the raw request body with
+    the format query parameter. Its positions become linked position points.
+
+    Args:
+        day_id: ID of the day
+
+    Returns:
+        JSON response with the number of imported points and 201 status code
+    """
+    try:
+        upload = request.files.get("file")
+        stream = upload.stream if upload else request.stream
+        format = track_format(upload.filename if upload else None, request.args.get("format"))
+        tolerance = request.args.get("tolerance", default=current_app.config["TRACK_SIMPLIFY_TOLERANCE"], type=float)
+        received, imported = PointService.import_track(
+            day_id,
+            parse_track(stream, format),
+            batch_size=current_app.config["TRACK_IMPORT_BATCH_SIZE"],
+            max_points=current_app.config["TRACK_IMPORT_MAX_POINTS"],
+            tolerance=tolerance,
+            day_max_points=current_app.config["TRACK_IMPORT_DAY_MAX_POINTS"],
+        )
+        return jsonify({"dayId": day_id, "received": received, "imported": imported}), HTTPStatus.CREATED
+
+    except ValueError as e:
+        abort(HTTPStatus.BAD_REQUEST, description=str(e))
+    except Exception as e:
+        logger.error(f"Error importing track into day {day_id}: {e}")
+        abort(HTTPStatus.INTERNAL_SERVER_ERROR, description=str(e))
+
 @point_api.route("/<string:id>/update", methods=["POST"])
 @JWTService.authenticate_restful
 @require_owner("point")
@@ -82,7 +144,7 @@ def update_point(id: str):
     try:
         point_data = request.get_json()
         point = PointService.update_point(id, point_data)
-        return jsonify(PointSchema().dump(point)), HTTPStatus.OK
+        return jsonify(get_schema(PointSchema).dump(point)), HTTPStatus.OK
 
     except HTTPException:
             raise
@@ -94,6 +156,52 @@ def update_point(id: str):
         db.session.rollback()
         abort(HTTPStatus.INTERNAL_SERVER_ERROR, description=str(e))
 
+@point_api.route("/by-ids", methods=["POST"])
+@JWTService.authenticate_restful
+@require_owner("point", id_param="ids", from_body=True, many=True)
+def get_points_by_ids():
+    """
+    PointResource POST method. Retrieves several points by ID.
+
+    Body:
+        ids: List of point IDs
+
+    Returns:
+        JSON response with the points found and 200 status code
+    """
+    try:
+        points = PointService.get_points_by_ids(request.get_json()["ids"])
+        return jsonify(get_schema(PointSchema, many=True).dump(points)), HTTPStatus.OK
+
+    except Exception as e:
+        logger.error(f"Error retrieving points: {e}")
+        abort(HTTPStatus.INTERNAL_SERVER_ERROR, description=str(e))
+
+@point_api.route("/day/<string:day_id>", methods=["GET"])
+@JWTService.authenticate_restful
+@require_owner("point", parent_resource=("day", "day_id"))
+def get_points_by_day(day_id: str):
+    """
+    PointResource GET method. Retrieves the points of a day in route order.
+
+    Query Parameters:
+        tolerance: Simplify runs of position points to this many metres, for map views
+
+    Args:
+        day_id: ID of the day
+
+    Returns:
+        JSON response with the points, following their next links, and 200 status code
+    """
+    try:
+        tolerance = request.args.get("tolerance", type=float)
+        points = PointService.get_points_by_day(day_id, tolerance=tolerance)
+        return jsonify(PointService.dump_route(points)), HTTPStatus.OK
+
+    except Exception as e:
+        logger.error(f"Error retrieving points of day {day_id}: {e}")
+        abort(HTTPStatus.INTERNAL_SERVER_ERROR, description=str(e))
+
 @point_api.route("/<string:id>", methods=["GET"])
 @JWTService.authenticate_restful
 @require_owner("point")
@@ -109,7 +217,7 @@ def get_point(id: str):
     """
     try:
         point = PointService.get_point_by_id(id)
-        return jsonify(PointSchema().dump(point)), HTTPStatus.OK
+        return jsonify(get_schema(PointSchema).dump(point)), HTTPStatus.OK
     
     except NoResultFound:
         abort(HTTPStatus.NOT_FOUND, description=f"Point with id {id} not found")
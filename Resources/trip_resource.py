@@ -6,9 +6,11 @@ from uuid import UUID
 from sqlalchemy.exc import NoResultFound
 from flask import Blueprint, abort, g, jsonify, request
 from Schemas.trip_schema import TripSchema
+from Schemas.registry import get_schema
 from Services.Middleware.auth_middleware import JWTService
 from Services.Middleware.privileges_middleware import require_owner
 from Services.trip_service import TripService
+from Services.Utils.pagination import page_arguments, page_response
 
 logger = logging.getLogger(__name__)
 
@@ -30,8 +32,8 @@ def get_trip(id: str):
     """
     try:
         logger.info(f"Retrieving trip with id {id}")
-        trip = TripService.get_trip_by_id(id)
-        return jsonify(TripSchema().dump(trip)), HTTPStatus.OK
+        trip = TripService.get_trip_by_id(id, profile="trip_full")
+        return jsonify(get_schema(TripSchema).dump(trip)), HTTPStatus.OK
 
     except HTTPException:
         raise
@@ -52,11 +54,14 @@ def get_all_user_trips(user_id: str):
     """
     try:
         logger.info(f"Retrieving all trips for user with id {user_id}")
-        trips = TripService.get_trips_by_user(user_id)
-        return jsonify([TripSchema().dump(trip) for trip in trips]), HTTPStatus.OK
+        limit, after = page_arguments(streamable=True)
+        page = TripService.get_trips_by_user(user_id, profile="trip_full", limit=limit, after=after)
+        return page_response(page, get_schema(TripSchema).dump), HTTPStatus.OK
 
     except HTTPException:
         raise
+    except ValueError as e:
+        abort(HTTPStatus.BAD_REQUEST, description=str(e))
     except NoResultFound:
         abort(HTTPStatus.NOT_FOUND, description=f"Trip with id {id} not found")
     except Exception as e:
@@ -75,7 +80,7 @@ def get_all_user_invitations(user_id: str):
     try:
         logger.info(f"Retrieving trip with id {id}")
         trips = TripService.get_invitations_by_user(user_id)
-        return jsonify([TripSchema().dump(trip) for trip in trips]), HTTPStatus.OK
+        return jsonify(get_schema(TripSchema, many=True).dump(trips)), HTTPStatus.OK
 
     except HTTPException:
         raise
@@ -97,7 +102,7 @@ def post():
     try:
         trip_data = request.get_json()
         trip = TripService.create_trip(trip_data)
-        return jsonify(TripSchema().dump(trip)), HTTPStatus.CREATED
+        return jsonify(get_schema(TripSchema).dump(trip)), HTTPStatus.CREATED
     except HTTPException:
         raise
     except IntegrityError as e:
@@ -119,7 +124,7 @@ def put(id: str):
         logger.info(f"Update trip {request.get_json()} in db")
         trip_data = request.get_json()
         trip = TripService.update_trip(id, trip_data)
-        return jsonify(TripSchema().dump(trip)), HTTPStatus.OK
+        return jsonify(get_schema(TripSchema).dump(trip)), HTTPStatus.OK
     except HTTPException:
         raise
     except NoResultFound as e:
@@ -4,6 +4,7 @@ import logging
 from sqlite3 import IntegrityError
 from sqlalchemy.exc import NoResultFound
 from Schemas.user_schema import UserSchema
+from Schemas.registry import get_schema
 from flask import Blueprint, jsonify, request, abort
 from Services.user_service import UserService
 from Services.Middleware.auth_middleware import JWTService
@@ -25,7 +26,7 @@ def get(id:str):
             f"Retrieving user with id {id}")
                     
         user = UserService.get_user_by_id(id)
-        return jsonify(UserSchema().dump(user)), HTTPStatus.OK
+        return jsonify(get_schema(UserSchema).dump(user)), HTTPStatus.OK
     
     except HTTPException:
         raise
@@ -45,7 +46,7 @@ def update_user(id: str):
 
     try:
         user = UserService.update_user(id, request.get_json())
-        return jsonify(UserSchema().dump(user)), HTTPStatus.OK
+        return jsonify(get_schema(UserSchema).dump(user)), HTTPStatus.OK
     
     except HTTPException:
         raise
@@ -1,6 +1,9 @@
+from functools import lru_cache
+
 from marshmallow import Schema, fields, pre_load
 
 
+@lru_cache(maxsize=1024)
 def camelcase(s):
     parts = iter(s.split("_"))
     return next(parts) + "".join(i.title() for i in parts)
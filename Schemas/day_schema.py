@@ -14,7 +14,9 @@ class DaySchema(BaseSchema):
     day_number = fields.Integer(allow_none=False, required=True, validate=lambda x: 1 <= x <= 365)
     itinerary_id = fields.UUID(allow_none=True)
     date = fields.Date('%Y-%m-%d', allow_none=False, required=True)
-    points = fields.List(fields.Nested(PointSchema), allow_none=True, validate=lambda x: x is None or len(x) <= 100)
+    points = fields.List(fields.Nested(PointSchema), allow_none=True, load_only=True, validate=lambda x: x is None or len(x) <= 100)
+    # Dumped from Day.route_points, in route order
+    route_points = fields.List(fields.Nested(PointSchema), dump_only=True, data_key="points")
     sea = fields.Nested(SeaSchema, allow_none=True)
     weather = fields.Nested(WeatherSchema, allow_none=True)
 
@@ -0,0 +1,138 @@
+"""
+Compiled dumpers for read-only endpoints.
+
+Schema.dump() goes through field.serialize() for every field of every object:
+attribute lookup through the schema accessor, dump_default handling and the
+field's _serialize, each a few Python calls. Listing endpoints dump thousands of
+points, logs or items without needing any of that generality, so get_dumper()
+generates and compiles, once per schema variant, a plain function reading the
+attributes of an object and converting them inline:
+
+    dump = get_dumper(LogSchema)
+    [dump(log) for log in logs]
+
+The dumped dicts are the ones Schema.dump() returns. Fields converted inline are
+UUID, String, Float, Integer, Boolean, Raw, Enum, Date, DateTime and Time in ISO
+format, and Nested/List(Nested) of schemas compiled the same way; any other field,
+or one with a dump_default or a dotted attribute, is serialized by the field
+itself. Schemas with pre_dump/post_dump hooks are refused, their hooks being
+skipped otherwise.
+
+Objects are read with getattr, so ORM rows and Row tuples of selected columns
+both work, the fields missing from a Row being left out as Schema.dump() does.
+Dumpers don't validate anything and are only meant for GET handlers.
+"""
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Optional, Type
+
+from marshmallow import Schema, fields, missing
+from marshmallow.decorators import POST_DUMP, PRE_DUMP
+
+from Schemas.registry import get_schema
+
+Dumper = Callable[[Any], Dict[str, Any]]
+
+# Fields whose _serialize returns the value unchanged
+_PASSTHROUGH = (fields.Boolean, fields.Raw)
+_ISO_TYPES = (fields.DateTime, fields.Date, fields.Time)
+
+
+def get_dumper(
+    schema_class: Type[Schema],
+    *,
+    only: Optional[Iterable[str]] = None,
+    exclude: Iterable[str] = (),
+) -> Dumper:
+    """
+    Compiled dumper of a schema variant, built the first time it is asked for.
+
+    Args:
+        schema_class: The schema class
+        only: Fields to dump exclusively, all fields if None
+        exclude: Fields left out
+
+    Returns:
+        Function dumping one object like get_schema(schema_class, only=only, exclude=exclude).dump
+
+    Raises:
+        ValueError: If the schema or one of its nested schemas has dump hooks
+    """
+    return _compiled(get_schema(schema_class, only=only, exclude=exclude))
+
+
+@lru_cache(maxsize=None)
+def _compiled(schema: Schema) -> Dumper:
+    # Keyed by the registry's shared instance of the variant
+    return compile_dumper(schema)
+
+
+def compile_dumper(schema: Schema) -> Dumper:
+    """
+    Generate the dumper of a schema instance.
+
+    Args:
+        schema: Schema with the only/exclude lists to honour
+
+    Returns:
+        Function dumping one object like schema.dump
+
+    Raises:
+        ValueError: If the schema or one of its nested schemas has dump hooks
+    """
+    if schema._hooks[PRE_DUMP] or schema._hooks[POST_DUMP]:
+        raise ValueError(f"{type(schema).__name__} has dump hooks and can't be compiled")
+
+    namespace: Dict[str, Any] = {"_missing": missing}
+    lines = ["def dump(obj):", "    data = {}"]
+    for index, (name, field) in enumerate(schema.dump_fields.items()):
+        key = field.data_key if field.data_key is not None else name
+        attribute = field.attribute or name
+        expression = _expression(field, index, namespace)
+
+        if expression is None or "." in attribute or field.dump_default is not missing:
+            namespace[f"_field_{index}"] = field
+            lines += [
+                f"    value = _field_{index}.serialize({name!r}, obj)",
+                "    if value is not _missing:",
+                f"        data[{key!r}] = value",
+            ]
+            continue
+
+        lines += [
+            f"    value = getattr(obj, {attribute!r}, _missing)",
+            "    if value is not _missing:",
+            f"        data[{key!r}] = {expression}",
+        ]
+    lines.append("    return data")
+
+    code = compile("\n".join(lines), f"<dumper of {type(schema).__name__}>", "exec")
+    exec(code, namespace)
+    return namespace["dump"]
+
+
+def _expression(field: fields.Field, index: int, namespace: Dict[str, Any]) -> Optional[str]:
+    """Inline conversion of `value` for a field, None if the field must serialize it itself."""
+    field_type = type(field)
+
+    if field_type in (fields.UUID, fields.String):
+        return "None if value is None else str(value)"
+    if field_type in (fields.Float, fields.Integer) and not field.as_string:
+        return f"None if value is None else {field.num_type.__name__}(value)"
+    if field_type in _PASSTHROUGH:
+        return "value"
+    if field_type is fields.Enum:
+        # by_value=True dumps through a Raw field, by name or a typed value through a real one
+        if type(field.field) not in _PASSTHROUGH:
+            return None
+        return "None if value is None else value.value"
+    if field_type in _ISO_TYPES and (field.format or field_type.DEFAULT_FORMAT) in ("iso", "iso8601"):
+        return "None if value is None else value.isoformat()"
+    if field_type is fields.Nested:
+        namespace[f"_nested_{index}"] = compile_dumper(field.schema)
+        if field.schema.many or field.many:
+            return f"None if value is None else [_nested_{index}(item) for item in value]"
+        return f"None if value is None else _nested_{index}(value)"
+    if field_type is fields.List and type(field.inner) is fields.Nested and not field.inner.many:
+        namespace[f"_nested_{index}"] = compile_dumper(field.inner.schema)
+        return f"None if value is None else [_nested_{index}(item) for item in value]"
+    return None
@@ -0,0 +1,53 @@
+"""
+Process-wide registry of schema instances.
+
+Building a schema binds every field (computing its camelCase data key) and, on
+first use, every nested schema with its only/exclude lists. Schemas hold no
+per-call state, so each (schema class, only, exclude, many) variant is built once
+and shared by every request:
+
+    get_schema(TripSchema).dump(trip)
+    get_schema(PointSchema, many=True).dump(points)
+"""
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple, Type
+
+from marshmallow import Schema
+
+
+def get_schema(
+    schema_class: Type[Schema],
+    *,
+    only: Optional[Iterable[str]] = None,
+    exclude: Iterable[str] = (),
+    many: bool = False,
+) -> Schema:
+    """
+    Shared instance of a schema variant.
+
+    Args:
+        schema_class: The schema class
+        only: Fields to dump/load exclusively, all fields if None
+        exclude: Fields left out
+        many: Whether the schema handles lists of objects
+
+    Returns:
+        The instance built the first time the variant was asked for
+    """
+    return _build(schema_class, _names(only) if only is not None else None, _names(exclude), many)
+
+
+def get_schema_registry_stats() -> dict:
+    """Number of variants built and lookups served by the registry."""
+    info = _build.cache_info()
+    return {"size": info.currsize, "hits": info.hits, "misses": info.misses}
+
+
+@lru_cache(maxsize=None)
+def _build(schema_class: Type[Schema], only: Optional[Tuple[str, ...]], exclude: Tuple[str, ...], many: bool) -> Schema:
+    return schema_class(only=only, exclude=exclude, many=many)
+
+
+def _names(fields: Iterable[str]) -> Tuple[str, ...]:
+    # Field order doesn't change the variant
+    return tuple(sorted(fields))
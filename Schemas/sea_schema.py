@@ -15,7 +15,9 @@ class SeaSchema(Schema):
     moon_phase = fields.String(allow_none=True, validate=lambda x: x is None or len(x.strip()) <= 50)
     high_tide = fields.Time('%H:%M', allow_none=True)
     low_tide = fields.Time('%H:%M', allow_none=True)
-    sea_states = fields.List(fields.Nested(SeaStateSchema), allow_none=True, validate=lambda x: x is None or len(x) <= 24)
+    sea_states = fields.List(fields.Nested(SeaStateSchema), allow_none=True, load_only=True, validate=lambda x: x is None or len(x) <= 24)
+    # Dumped from Sea.states, which expands forecasts stored as series
+    states = fields.List(fields.Nested(SeaStateSchema), dump_only=True, data_key="sea_states")
 
     @validates('moon_phase')
     def validate_moon_phase(self, value):
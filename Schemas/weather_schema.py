@@ -12,7 +12,9 @@ class WeatherSchema(Schema):
 
     day_id = fields.UUID(allow_none=False, required=True)
     model = fields.String(allow_none=False, required=True, validate=lambda x: 1 <= len(x.strip()) <= 100)
-    weather_states = fields.List(fields.Nested(WeatherStateSchema), allow_none=True, validate=lambda x: x is None or len(x) <= 24)
+    weather_states = fields.List(fields.Nested(WeatherStateSchema), allow_none=True, load_only=True, validate=lambda x: x is None or len(x) <= 24)
+    # Dumped from Weather.states, which expands forecasts stored as series
+    states = fields.List(fields.Nested(WeatherStateSchema), dump_only=True, data_key="weather_states")
 
     @validates('model')
     def validate_model(self, value):
@@ -1,14 +1,19 @@
 from functools import wraps
+import hashlib
 from http import HTTPStatus
+import time
 from uuid import UUID
 import jwt
 from datetime import datetime, timedelta, timezone
 from typing import Any, Optional, Dict
-import os
 from flask import current_app,abort, g, request
+from werkzeug.exceptions import HTTPException
 from Models.user import User
-from Api.database import db
 from Services.user_service import UserService
+from Services.Utils.cache import LRUCache
+
+# Decoded payloads of verified tokens keyed by token digest, each kept until the token expires
+token_cache = LRUCache(maxsize=4096)
 
 class JWTService:
 
@@ -69,6 +74,34 @@ class JWTService:
             raise ValueError("User not found")
         return JWTService.generate_access_token(user.user_id, user.email, user.is_admin)
     
+    @staticmethod
+    def decode_token_cached(token: str) -> Dict:
+        """
+        Decode a JWT token, reusing the payload of a previous successful decode.
+
+        Verified payloads are cached under a SHA-256 digest of the token until the
+        token's exp claim, so repeated requests with the same bearer token skip the
+        signature check.
+
+        Raises:
+            ValueError: If the token is invalid or expired
+        """
+        key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        payload = token_cache.get(key)
+        if payload is not None:
+            return payload
+
+        payload = JWTService.decode_token(token)
+        remaining = payload.get('exp', 0) - time.time()
+        if remaining > 0:
+            token_cache.put(key, payload, ttl=remaining)
+        return payload
+
+    @staticmethod
+    def get_token_cache_stats() -> Dict[str, Any]:
+        """Hit, miss and eviction counters of the decoded-token cache."""
+        return token_cache.stats()
+
     @staticmethod
     def verify_token(token: str, token_type: str = 'access') -> Optional[Dict]:
         """
@@ -82,7 +115,7 @@ class JWTService:
             Decoded payload if valid, None otherwise
         """
         try:
-            payload = JWTService.decode_token(token)
+            payload = JWTService.decode_token_cached(token)
             if not payload:
                 raise ValueError("Failed token decoding")
             
@@ -130,15 +163,20 @@ class JWTService:
                     if not data:
                         abort(401, description="Invalid token")
                     
-                    user = UserService.get_user_by_id(data["user_id"])
+                    # The token is verified, only check the user still exists and is active (cached)
+                    mail = UserService.get_active_user_mail(data["user_id"])
                 
-                    if not user:
+                    if mail is None:
                         return abort(HTTPStatus.UNAUTHORIZED)
 
-                    g.current_user_mail = user.mail
-                    g.current_user_id = str(user.id)
+                    g.current_user_mail = mail
+                    g.current_user_id = str(UUID(data["user_id"]))
+                    # Access decisions memoised by require_owner for this request
+                    g.access_decisions = {}
 
-            except:
+            except HTTPException:
+                raise
+            except Exception:
                 raise ValueError("Invalid token")
         
             return f(*args, **kwargs)
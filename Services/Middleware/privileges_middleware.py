@@ -3,18 +3,25 @@ Privileges Middleware - Resource ownership verification.
 
 This module provides functions to verify that a user has access to specific resources
 by checking ownership chains through the database relationships.
+
+Each check is a single query. When the user's trips are in TripService's membership
+cache the query only loads the resource's owner and trip, which are matched against
+them; otherwise trip membership is resolved in the same query with an EXISTS over
+user_has_trip. The membership cache is per process: a change made through
+TripService invalidates it in the worker handling the request only, so other
+workers may keep granting (or denying) access for up to ACCESS_CACHE_TTL seconds.
+Decisions are also memoised in g for the rest of the request.
 """
 
 from functools import wraps
 from http import HTTPStatus
 import logging
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Set
 from uuid import UUID
 
 from flask import abort, g, request
 from Api.database import db
 from Models.inventory_items import inventory_items
-from Models.user import User
 from Models.trip import Trip
 from Models.itinerary import Itinerary
 from Models.day import Day
@@ -23,20 +30,18 @@ from Models.weather import Weather
 from Models.inventory import Inventory
 from Models.item import Item
 from Models.point import Point
+from Models.point_has_image import PointHasImage
 from Models.log import Log
 from Models.image import Image
 from Models.user_has_trip import user_has_trip
-from Models.user_has_inventory import user_has_inventory
-from sqlalchemy import or_
-from Services.day_service import DayService
-from Services.itinerary_service import ItineraryService
+from sqlalchemy import exists
 from Services.trip_service import TripService
 
 logger = logging.getLogger(__name__)
 
 
 def require_owner(
-    resource_type, *, id_param="id", from_body=False, parent_resource=None
+    resource_type, *, id_param="id", from_body=False, parent_resource=None, many=False
 ):
     """
     Decorator to ensure user owns the resource or has access to it.
@@ -51,6 +56,8 @@ def require_owner(
         from_body: If True, extract id_param from request body instead of URL (default: False)
         parent_resource: Tuple of (parent_type, parent_id_param) to check parent ownership
                          for create operations. E.g., ('itinerary', 'itinerary_id')
+        many: If True, id_param holds a list of IDs which are all checked in a single
+              query (supported for 'day' and 'point')
 
     Examples:
         # GET /api/day/<id> - Check day ownership from URL
@@ -61,6 +68,9 @@ def require_owner(
 
         # PUT /api/day/<id>/update with body - Check day ownership from URL
         @require_owner('day', id_param='id')
+
+        # POST /api/day/by-ids with {"ids": [...]} - Check every day at once
+        @require_owner('day', id_param='ids', from_body=True, many=True)
     """
 
     def decorator(f):
@@ -71,6 +81,30 @@ def require_owner(
             if not user_id:
                 abort(HTTPStatus.UNAUTHORIZED, description="Authentication required")
 
+            if many:
+                data = request.get_json(silent=True) if from_body else kwargs
+                resource_ids = data.get(id_param) if data else None
+                if not isinstance(resource_ids, list) or not resource_ids:
+                    abort(
+                        HTTPStatus.BAD_REQUEST,
+                        description=f"Resource IDs ({id_param}) required",
+                    )
+
+                try:
+                    decisions = check_resources_ownership(resource_type, resource_ids)
+                except ValueError:
+                    abort(HTTPStatus.BAD_REQUEST, description=f"Invalid {resource_type} id in {id_param}")
+
+                # Missing resources are left for the endpoint to handle
+                denied = [resource_id for resource_id, allowed in decisions.items() if not allowed]
+                if denied:
+                    abort(
+                        HTTPStatus.FORBIDDEN,
+                        description=f"Access denied to {resource_type} {', '.join(denied)}",
+                    )
+
+                return f(*args, **kwargs)
+
             # Determine which resource to check
             if parent_resource:
                 # For create operations, check parent resource ownership
@@ -139,7 +173,9 @@ def check_resource_ownership(resource_type: str, resource_id: str) -> Optional[b
     Check if a user has ownership or access rights to a specific resource.
 
     This function verifies the ownership chain by traversing database relationships
-    from the resource back to the user.
+    from the resource back to the user. Each check runs a single query loading the
+    resource's owner and trip, along with the user's membership of that trip unless
+    the user's accessible trips are cached by TripService.
 
     Args:
         user_id: The id of the user
@@ -149,37 +185,43 @@ def check_resource_ownership(resource_type: str, resource_id: str) -> Optional[b
     Returns:
         True if user has access, False if user lacks permission, None if resource doesn't exist
     """
+    # Decisions are memoised for the rest of the request
+    decisions = g.setdefault("access_decisions", {})
+    key = (g.current_user_id, resource_type, str(resource_id))
+    if key in decisions:
+        return decisions[key]
+
     try:
         # Check ownership based on resource type
         if resource_type == "trip":
-            return _check_trip_ownership(g.current_user_id, resource_id)
+            decision = _check_trip_ownership(g.current_user_id, resource_id)
 
         elif resource_type == "itinerary":
-            return _check_itinerary_ownership(g.current_user_id, resource_id)
+            decision = _check_itinerary_ownership(g.current_user_id, resource_id)
 
         elif resource_type == "day":
-            return _check_day_ownership(g.current_user_id, resource_id)
+            decision = _check_day_ownership(g.current_user_id, resource_id)
 
         elif resource_type == "sea":
-            return _check_sea_ownership(g.current_user_id, resource_id)
+            decision = _check_sea_ownership(g.current_user_id, resource_id)
 
         elif resource_type == "weather":
-            return _check_weather_ownership(g.current_user_id, resource_id)
+            decision = _check_weather_ownership(g.current_user_id, resource_id)
 
         elif resource_type == "inventory":
-            return _check_inventory_ownership(g.current_user_id, resource_id)
+            decision = _check_inventory_ownership(g.current_user_id, resource_id)
 
         elif resource_type == "item":
-            return _check_item_ownership(g.current_user_id, resource_id)
+            decision = _check_item_ownership(g.current_user_id, resource_id)
 
         elif resource_type == "point":
-            return _check_point_ownership(g.current_user_id, resource_id)
+            decision = _check_point_ownership(g.current_user_id, resource_id)
 
         elif resource_type == "log":
-            return _check_log_ownership(g.current_user_id, str(resource_id))
+            decision = _check_log_ownership(g.current_user_id, str(resource_id))
 
         elif resource_type == "image":
-            return _check_image_ownership(g.current_user_id, str(resource_id))
+            decision = _check_image_ownership(g.current_user_id, str(resource_id))
 
         else:
             logger.error(f"Unknown resource type: {resource_type}")
@@ -189,234 +231,255 @@ def check_resource_ownership(resource_type: str, resource_id: str) -> Optional[b
         logger.error(f"Error checking ownership: {e}")
         return False
 
+    decisions[key] = decision
+    return decision
+
+
+def check_resources_ownership(resource_type: str, resource_ids: Iterable[str]) -> Dict[str, bool]:
+    """
+    Check the current user's access to several resources of the same type at once.
+
+    The owner and trip of every resource are loaded in a single query; decisions are
+    also recorded in the request memo used by check_resource_ownership.
+
+    Args:
+        resource_type: Type of resource ('day' or 'point')
+        resource_ids: IDs of the resources to check
+
+    Returns:
+        Mapping of each existing resource ID to whether the user has access to it.
+        IDs of resources that don't exist are left out.
+
+    Raises:
+        ValueError: If the resource type isn't supported or an ID isn't a valid UUID
+    """
+    if resource_type not in _BATCH_OWNERSHIP_QUERIES:
+        raise ValueError(f"Batch ownership checks are not supported for {resource_type}")
+
+    user_id = g.current_user_id
+    ids = {str(UUID(str(resource_id))): UUID(str(resource_id)) for resource_id in resource_ids}
+
+    rows = _BATCH_OWNERSHIP_QUERIES[resource_type](user_id, list(ids.values()))
+    decisions = {str(row.id): _itinerary_access(user_id, row) for row in rows}
+
+    memo = g.setdefault("access_decisions", {})
+    for resource_id in ids:
+        memo[(user_id, resource_type, resource_id)] = decisions.get(resource_id)
+
+    return decisions
+
+
+def allowed_resource_ids(resource_type: str, resource_ids: Iterable[str]) -> Set[str]:
+    """
+    Filter resource IDs down to the ones the current user can access, in one query.
+
+    Args:
+        resource_type: Type of resource ('day' or 'point')
+        resource_ids: IDs of the resources to check
+
+    Returns:
+        Set of the accessible resource IDs
+    """
+    decisions = check_resources_ownership(resource_type, resource_ids)
+    return {resource_id for resource_id, allowed in decisions.items() if allowed}
+
+
+def _day_owners(user_id: str, day_ids: List[UUID]) -> list:
+    """Owner and trip of the itinerary of each day."""
+    return (
+        db.session.query(
+            Day.id, Itinerary.user_id.label("owner_id"), Itinerary.trip_id, *_membership(user_id, Itinerary.trip_id)
+        )
+        .outerjoin(Itinerary, Day.itinerary_id == Itinerary.id)
+        .filter(Day.id.in_(day_ids))
+        .all()
+    )
+
+
+def _point_owners(user_id: str, point_ids: List[UUID]) -> list:
+    """Owner and trip of the itinerary of each point."""
+    return (
+        db.session.query(
+            Point.id, Itinerary.user_id.label("owner_id"), Itinerary.trip_id, *_membership(user_id, Itinerary.trip_id)
+        )
+        .outerjoin(Day, Point.day_id == Day.id)
+        .outerjoin(Itinerary, Day.itinerary_id == Itinerary.id)
+        .filter(Point.id.in_(point_ids))
+        .all()
+    )
+
+
+_BATCH_OWNERSHIP_QUERIES = {
+    "day": _day_owners,
+    "point": _point_owners,
+}
+
+
+def _membership(user_id: str, trip_id_column) -> tuple:
+    """
+    Columns to select along with a resource's trip to decide the user's membership.
+
+    Returns:
+        Nothing when the user's trips are cached, otherwise an EXISTS over
+        user_has_trip labelled 'member'
+    """
+    if TripService.get_cached_trip_ids(user_id) is not None:
+        return ()
+    member = exists().where(
+        user_has_trip.c.trip_id == trip_id_column,
+        user_has_trip.c.user_id == UUID(user_id),
+    )
+    return (member.label("member"),)
+
+
+def _is_trip_member(user_id: str, row) -> bool:
+    """Check the user travels on the trip of a row, from its 'member' column or the cached trip membership."""
+    if "member" in row._fields:
+        return bool(row.member)
+    return row.trip_id is not None and row.trip_id in TripService.get_accessible_trip_ids(user_id)
+
+
+def _itinerary_access(user_id: str, row) -> bool:
+    """Access decision for a row carrying an itinerary's owner and trip: draft owner or trip traveller."""
+    return row.owner_id == UUID(user_id) or _is_trip_member(user_id, row)
+
 
 def _check_trip_ownership(user_id: str, trip_id: str) -> Optional[bool]:
     """Check if user owns or is a companion on the trip."""
+    trip_ids = TripService.get_cached_trip_ids(user_id)
+    if trip_ids is not None and UUID(trip_id) in trip_ids:
+        return True
 
-    # First check if trip exists by id
-    trip = TripService.get_trip_by_id(trip_id)
-    if not trip:
-        return None  # Trip doesn't exist
-
-    # Check if user is associated with trip
-    result = (
-        db.session.query(Trip)
-        .join(user_has_trip, Trip.id == user_has_trip.c.trip_id)
-        .filter(Trip.id == trip.id, user_has_trip.c.user_id == UUID(user_id))
+    trip = (
+        db.session.query(Trip.id.label("trip_id"), *_membership(user_id, Trip.id))
+        .filter(Trip.id == UUID(trip_id))
         .first()
     )
-
-    return result is not None
+    if not trip:
+        return None  # Trip doesn't exist
+    return _is_trip_member(user_id, trip)
 
 
 def _check_itinerary_ownership(user_id: str, itinerary_id: str) -> Optional[bool]:
     """Check if user owns the itinerary through trip ownership."""
-
-    # First check if itinerary exists
-    itinerary = ItineraryService.get_itinerary_by_id(itinerary_id)
-    if not itinerary:
-        return None  # Itinerary doesn't exist
-    
-    if itinerary.is_public:
-        return True
-    
-    result = (
-        db.session.query(Itinerary)
-        .join(Trip, Itinerary.trip_id == Trip.id)
-        .join(user_has_trip, Trip.id == user_has_trip.c.trip_id)
-        .filter(Itinerary.id == itinerary.id, user_has_trip.c.user_id == UUID(user_id))
+    itinerary = (
+        db.session.query(Itinerary.is_public, Itinerary.trip_id, *_membership(user_id, Itinerary.trip_id))
+        .filter(Itinerary.id == UUID(itinerary_id))
         .first()
     )
+    if not itinerary:
+        return None  # Itinerary doesn't exist
 
-    return result is not None
+    return bool(itinerary.is_public) or _is_trip_member(user_id, itinerary)
 
 
 def _check_day_ownership(user_id: str, day_id: str) -> Optional[bool]:
     """Check if user owns the day through itinerary/trip ownership."""
-    # First check if day exists
-    day = db.session.query(Day).filter_by(id=UUID(day_id)).first()
-    if not day:
+    days = _day_owners(user_id, [UUID(day_id)])
+    if not days:
         return None  # Day doesn't exist
 
-    # Check on draft itinerary
-    result = (
-        db.session.query(Day)
-        .join(Itinerary, Day.itinerary_id == Itinerary.id)
-        .filter(Day.id == UUID(day_id), Itinerary.user_id == UUID(user_id))
-        .first()
-    )
-    if result is not None:
-        return True
-    
-    # Check on trip itinerary 
-    result = (
-        db.session.query(Day)
-        .join(Itinerary, Day.itinerary_id == Itinerary.id)
-        .join(Trip, Itinerary.trip_id == Trip.id)
-        .join(user_has_trip, Trip.id == user_has_trip.c.trip_id)
-        .filter(Day.id == UUID(day_id), user_has_trip.c.user_id == UUID(user_id))
-        .first()
-    )
-
-    return result is not None
+    return _itinerary_access(user_id, days[0])
 
 
 def _check_sea_ownership(user_id: str, sea_id: str) -> Optional[bool]:
     """Check if user owns the sea through day/itinerary/trip ownership."""
-    # First check if sea exists
-    sea = db.session.query(Sea).filter_by(id=sea_id).first()
-    if not sea:
-        return None  # Sea doesn't exist
-
-    result = (
-        db.session.query(Sea)
-        .join(Day, Sea.day_id == Day.id)
-        .join(Itinerary, Day.itinerary_id == Itinerary.id)
-        .join(Trip, Itinerary.trip_id == Trip.id)
-        .join(user_has_trip, Trip.id == user_has_trip.c.trip_id)
-        .filter(Sea.day_id == sea_id, user_has_trip.c.user_id == UUID(user_id))
+    # Sea is keyed by the id of its day
+    sea = (
+        db.session.query(Itinerary.trip_id, *_membership(user_id, Itinerary.trip_id))
+        .select_from(Sea)
+        .outerjoin(Day, Sea.day_id == Day.id)
+        .outerjoin(Itinerary, Day.itinerary_id == Itinerary.id)
+        .filter(Sea.day_id == UUID(sea_id))
         .first()
     )
+    if not sea:
+        return None  # Sea doesn't exist
 
-    return result is not None
+    return _is_trip_member(user_id, sea)
 
 
 def _check_weather_ownership(user_id: str, weather_id: str) -> Optional[bool]:
     """Check if user owns the weather through day/itinerary/trip ownership."""
-    # First check if weather exists
-    weather = db.session.query(Weather).filter_by(id=weather_id).first()
-    if not weather:
-        return None  # Weather doesn't exist
-
-    result = (
-        db.session.query(Weather)
-        .join(Day, Weather.day_id == Day.id)
-        .join(Itinerary, Day.itinerary_id == Itinerary.id)
-        .join(Trip, Itinerary.trip_id == Trip.id)
-        .join(user_has_trip, Trip.id == user_has_trip.c.trip_id)
-        .filter(Weather.day_id == weather_id, user_has_trip.c.user_id == UUID(user_id))
+    # Weather is keyed by the id of its day
+    weather = (
+        db.session.query(Itinerary.trip_id, *_membership(user_id, Itinerary.trip_id))
+        .select_from(Weather)
+        .outerjoin(Day, Weather.day_id == Day.id)
+        .outerjoin(Itinerary, Day.itinerary_id == Itinerary.id)
+        .filter(Weather.day_id == UUID(weather_id))
         .first()
     )
+    if not weather:
+        return None  # Weather doesn't exist
 
-    return result is not None
+    return _is_trip_member(user_id, weather)
 
 
 def _check_inventory_ownership(user_id: str, inventory_id: str) -> Optional[bool]:
-    """Check if user owns the inventory directly, through user_has_inventory, or through trip ownership."""
-
-    # First check if inventory exists
-    inventory = db.session.query(Inventory).filter_by(id=UUID(inventory_id)).first()
-    if not inventory:
-        return None  # Inventory doesn't exist
-
-    # Check direct ownership via inventory.user_id FK
-    if inventory.user_id == UUID(user_id):
-        return True
-
-    result = (
-        db.session.query(Inventory)
-        .join(Trip, Inventory.trip_id == Trip.id)
-        .join(user_has_trip, Trip.id == user_has_trip.c.trip_id)
-        .filter(Inventory.id == inventory_id, user_has_trip.c.user_id == UUID(user_id))
+    """Check if user owns the inventory directly or through trip ownership."""
+    inventory = (
+        db.session.query(Inventory.user_id, Inventory.trip_id, *_membership(user_id, Inventory.trip_id))
+        .filter(Inventory.id == UUID(inventory_id))
         .first()
     )
+    if not inventory:
+        return None  # Inventory doesn't exist
 
-    return result is not None
+    return inventory.user_id == UUID(user_id) or _is_trip_member(user_id, inventory)
 
 
 def _check_item_ownership(user_id: str, item_id: str) -> Optional[bool]:
-    """Check if user owns the item through inventory/trip ownership."""
-    # First check if item exists
-    item = db.session.query(Item).filter_by(id=UUID(item_id)).first()
-    if not item:
+    """Check if user owns the item directly or through inventory/trip ownership."""
+    # One row per inventory holding the item
+    rows = (
+        db.session.query(Item.user_id, Inventory.trip_id, *_membership(user_id, Inventory.trip_id))
+        .outerjoin(inventory_items, Item.id == inventory_items.c.item_id)
+        .outerjoin(Inventory, inventory_items.c.inventory_id == Inventory.id)
+        .filter(Item.id == UUID(item_id))
+        .all()
+    )
+    if not rows:
         return None  # Item doesn't exist
 
-    # Second check user owns item
-    if item.user_id and item.user_id == UUID(user_id):
-        return True
-
-    # Third check trip inventory has item
-    result = (
-        db.session.query(Item)
-        .join(inventory_items, Item.id == inventory_items.c.item_id)
-        .join(Inventory, inventory_items.c.inventory_id == Inventory.id)
-        .join(Trip, Inventory.trip_id == Trip.id)
-        .join(user_has_trip, Trip.id == user_has_trip.c.trip_id)
-        .filter(
-            Item.id == UUID(item_id),
-            or_(user_has_trip.c.user_id == UUID(user_id)),
-        )
-        .first()
+    return any(
+        row.user_id == UUID(user_id) or _is_trip_member(user_id, row)
+        for row in rows
     )
 
-    return result is not None
-
 
 def _check_point_ownership(user_id: str, point_id: str) -> Optional[bool]:
     """Check if user owns the point through day/itinerary/trip ownership."""
-    # First check if point exists
-    point = db.session.query(Point).filter_by(id=UUID(point_id)).first()
-    if not point:
+    points = _point_owners(user_id, [UUID(point_id)])
+    if not points:
         return None  # Point doesn't exist
 
-    # Check user owns draft itinerary
-    result = (
-            db.session.query(Point)
-            .join(Day, Point.day_id == Day.id)
-            .join(Itinerary, Day.itinerary_id == Itinerary.id)
-            .filter(Point.id == UUID(point_id), Itinerary.user_id == UUID(user_id))
-            .first()
-        )
-    
-    if result:
-        return True
-    
-    # Check user belongs to trip with such itinerary
-    result = (
-        db.session.query(Point)
-        .join(Day, Point.day_id == Day.id)
-        .join(Itinerary, Day.itinerary_id == Itinerary.id)
-        .join(Trip, Itinerary.trip_id == Trip.id)
-        .join(user_has_trip, Trip.id == user_has_trip.c.trip_id)
-        .filter(Point.id == UUID(point_id), user_has_trip.c.user_id == UUID(user_id))
-        .first()
-    )
-
-    return result is not None
+    return _itinerary_access(user_id, points[0])
 
 
 def _check_log_ownership(user_id: str, log_id: str) -> Optional[bool]:
-    """Check if user owns or has access to the log."""
-    # log_id is actually a id (string)
-    log = db.session.query(Log).filter_by(id=UUID(log_id)).first()
+    """Check if user is the author of the log."""
+    log = db.session.query(Log.user_id).filter(Log.id == UUID(log_id)).first()
     if not log:
         return None  # Log doesn't exist
 
-    # Check if user is the log author
-    return (
-        db.session.query(User)
-        .join(User.logs)
-        .filter(User.id == UUID(user_id), Log.id == UUID(log_id))
-        .first()
-        is not None
-    )
+    return log.user_id == UUID(user_id)
 
 
 def _check_image_ownership(user_id: str, image_id: str) -> Optional[bool]:
-    """Check if user owns the image through point or user ownership."""
-    image = db.session.query(Image).filter_by(id=UUID(image_id)).first()
-    if not image:
-        return None  # Image doesn't exist
-
-    # Check if image belongs to user's point or is user's profile picture
-    # This depends on your specific image relationships
-    # For now, check if user owns related points
-    points_with_image = (
-        db.session.query(Point).join(Point.images).filter(Image.id == UUID(image_id)).all()
+    """Check if user owns the image through the points it is attached to."""
+    # One row per point holding the image
+    rows = (
+        db.session.query(Itinerary.user_id.label("owner_id"), Itinerary.trip_id, *_membership(user_id, Itinerary.trip_id))
+        .select_from(Image)
+        .outerjoin(PointHasImage, Image.id == PointHasImage.c.image_id)
+        .outerjoin(Point, PointHasImage.c.point_id == Point.id)
+        .outerjoin(Day, Point.day_id == Day.id)
+        .outerjoin(Itinerary, Day.itinerary_id == Itinerary.id)
+        .filter(Image.id == UUID(image_id))
+        .all()
     )
+    if not rows:
+        return None  # Image doesn't exist
 
-    for point in points_with_image:
-        if _check_point_ownership(user_id, str(point.id)):
-            return True
-
-    return False
+    return any(_itinerary_access(user_id, row) for row in rows)
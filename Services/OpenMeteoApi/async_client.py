@@ -0,0 +1,212 @@
+"""
+Concurrent Open-Meteo fetcher for refreshing many days at once.
+
+Locations are grouped by date and batched into multi-location requests of up to
+batch_size coordinates, which run concurrently on an asyncio event loop (at most
+max_concurrency in flight). Identical requests issued while one is already in
+flight await the same future instead of going out twice. Failed requests follow
+the blocking client's policy: up to RETRIES retries on connection errors and
+STATUS_TO_RETRY responses, with exponential backoff.
+
+prefetch() stores the results in the forecast cache, so warming it before a
+refresh turns the services' sequential requests into cache hits:
+
+    AsyncForecastFetcher().prefetch(weather_locations, marine_locations)
+"""
+from collections import defaultdict
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import logging
+
+import niquests
+import numpy as np
+import openmeteo_requests
+from openmeteo_requests import OpenMeteoRequestsError
+from openmeteo_sdk.WeatherApiResponse import WeatherApiResponse
+
+from Services.OpenMeteoApi import sea_service, weather_service
+from Services.OpenMeteoApi.client import (
+    BACKOFF_FACTOR,
+    FORECAST_URL,
+    MARINE_URL,
+    RETRIES,
+    STATUS_TO_RETRY,
+    OpenMeteoClient,
+    hourly_params,
+    split_hourly,
+)
+from Services.OpenMeteoApi.forecast_cache import missing_cells, store_forecasts
+
+logger = logging.getLogger(__name__)
+
+Location = Tuple[float, float, date]
+
+
+class AsyncForecastFetcher:
+    """Batched, concurrent and coalescing client of the forecast and marine endpoints."""
+
+    def __init__(
+        self,
+        session_factory=niquests.AsyncSession,
+        forecast_url: str = FORECAST_URL,
+        marine_url: str = MARINE_URL,
+        retries: int = RETRIES,
+        backoff_factor: float = BACKOFF_FACTOR,
+        max_concurrency: int = 4,
+        batch_size: int = 50,
+        limiter=None,
+    ):
+        """
+        Args:
+            session_factory: Builds the async HTTP session of each event loop run
+            forecast_url: URL of the weather forecast endpoint
+            marine_url: URL of the marine forecast endpoint
+            retries: Retries on connection errors and STATUS_TO_RETRY responses
+            backoff_factor: Base of the exponential delay between attempts, in seconds
+            max_concurrency: Requests in flight at the same time
+            batch_size: Locations per request
+            limiter: Rate limiter whose blocking acquire() is called before each request
+        """
+        self.session_factory = session_factory
+        self.urls = {"weather": forecast_url, "marine": marine_url}
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
+        self.limiter = limiter
+        self.requests_sent = 0
+        self._in_flight: Dict[Tuple, asyncio.Future] = {}
+        self._session = None
+        self._client: Optional[openmeteo_requests.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @classmethod
+    def from_client(cls, client: OpenMeteoClient, **kwargs) -> "AsyncForecastFetcher":
+        """Fetcher using the endpoints of a blocking client."""
+        return cls(forecast_url=client.forecast_url, marine_url=client.marine_url, **kwargs)
+
+    async def __aenter__(self) -> "AsyncForecastFetcher":
+        self._session = self.session_factory()
+        self._client = openmeteo_requests.AsyncClient(session=self._session)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self._session.close()
+        self._session = self._client = self._semaphore = None
+
+    async def fetch(
+        self, source: str, locations: Sequence[Location], variables: Sequence[str], model: str
+    ) -> List[Dict[str, np.ndarray]]:
+        """
+        Hourly values of each location, with one request per batch of same-date locations.
+
+        Must be awaited within `async with fetcher:`.
+
+        Args:
+            source: 'weather' or 'marine'
+            locations: (latitude, longitude, date) of each location
+            variables: Hourly variables to request, in order
+            model: Model to request
+
+        Returns:
+            For each location, the 24 local hourly values of every variable
+        """
+        by_date: Dict[date, List[Location]] = defaultdict(list)
+        for location in dict.fromkeys(locations):
+            by_date[location[2]].append(location)
+
+        batches = [
+            tuple(same_date[start:start + self.batch_size])
+            for same_date in by_date.values()
+            for start in range(0, len(same_date), self.batch_size)
+        ]
+        results = await asyncio.gather(*(self._coalesced(source, batch, tuple(variables), model) for batch in batches))
+
+        values = {
+            location: forecast
+            for batch, forecasts in zip(batches, results)
+            for location, forecast in zip(batch, forecasts)
+        }
+        return [values[location] for location in locations]
+
+    def prefetch(self, weather_locations: Sequence[Location] = (), marine_locations: Sequence[Location] = ()) -> int:
+        """
+        Fetch the forecasts missing from the forecast cache for many locations concurrently.
+
+        Must not be called from a running event loop.
+
+        Args:
+            weather_locations: (latitude, longitude, date) of the weather forecasts needed
+            marine_locations: (latitude, longitude, date) of the marine forecasts needed
+
+        Returns:
+            Number of grid cells fetched
+        """
+        requests = []
+        weather_cells = missing_cells("weather", weather_service.WEATHER_MODEL, weather_locations)
+        if weather_cells:
+            variables = weather_service.HOURLY_VARIABLES
+            requests.append(("weather", weather_service.WEATHER_MODEL, variables, variables, weather_cells))
+        marine_cells = missing_cells("marine", sea_service.MARINE_MODEL, marine_locations)
+        if marine_cells:
+            variables = list(sea_service.HOURLY_VARIABLES.values())
+            requests.append(("marine", sea_service.MARINE_MODEL, variables, list(sea_service.HOURLY_VARIABLES), marine_cells))
+
+        if not requests:
+            return 0
+        return asyncio.run(self._prefetch(requests))
+
+    async def _prefetch(self, requests) -> int:
+        async with self:
+            results = await asyncio.gather(*(
+                self.fetch(source, cells, variables, model) for source, model, variables, _, cells in requests
+            ))
+        for (source, model, variables, names, cells), forecasts in zip(requests, results):
+            store_forecasts(source, model, cells, [_rename(forecast, variables, names) for forecast in forecasts])
+        return sum(len(cells) for *_, cells in requests)
+
+    async def _coalesced(self, source: str, batch: Tuple[Location, ...], variables: Tuple[str, ...], model: str):
+        """Send a request, or wait for the identical one already in flight."""
+        key = (source, batch, variables, model)
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._request(source, batch, variables, model))
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def _request(self, source: str, batch: Tuple[Location, ...], variables: Tuple[str, ...], model: str):
+        params = hourly_params(batch, variables, model)
+        async with self._semaphore:
+            if self.limiter is not None:
+                await asyncio.to_thread(self.limiter.acquire)
+            responses = await self._with_retries(self.urls[source], params)
+        return split_hourly(responses, batch, variables)
+
+    async def _with_retries(self, url: str, params: Dict[str, Any]) -> List[WeatherApiResponse]:
+        attempt = 0
+        while True:
+            self.requests_sent += 1
+            try:
+                return await self._client.weather_api(url, params=params)
+            except OpenMeteoRequestsError as e:
+                if attempt >= self.retries or not _is_retryable(e.__cause__):
+                    raise
+                delay = self.backoff_factor * 2 ** attempt
+                attempt += 1
+                logger.warning(f"Retrying Open-Meteo request in {delay:.1f}s ({attempt}/{self.retries}): {str(e)}")
+                await asyncio.sleep(delay)
+
+
+def _rename(forecast: Dict[str, np.ndarray], variables: Sequence[str], names: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Key the values by the names the services use instead of the API variables."""
+    return {name: forecast[variable] for variable, name in zip(variables, names)}
+
+
+def _is_retryable(error: Optional[BaseException]) -> bool:
+    if isinstance(error, (niquests.exceptions.ConnectionError, niquests.exceptions.Timeout)):
+        return True
+    response = getattr(error, "response", None)
+    return response is not None and response.status_code in STATUS_TO_RETRY
@@ -0,0 +1,154 @@
+"""
+Open-Meteo HTTP client shared by the weather and marine services.
+
+Requests go through openmeteo_requests, which decodes the FlatBuffers payload, on
+top of a requests session wrapped with the retry policy. The session is the
+transport: any requests-compatible session can be passed (tests use one against a
+local stub server whose URLs replace the public endpoints). Responses are cached
+by Services/OpenMeteoApi/forecast_cache.py, not by the session.
+"""
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+import openmeteo_requests
+import requests
+from flask import current_app, has_app_context
+from openmeteo_sdk.WeatherApiResponse import WeatherApiResponse
+from retry_requests import retry
+
+logger = logging.getLogger(__name__)
+
+FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+MARINE_URL = "https://marine-api.open-meteo.com/v1/marine"
+# Days ahead covered by the marine endpoint, later dates make it reject the whole request
+MARINE_FORECAST_DAYS = 8
+
+RETRIES = 5
+BACKOFF_FACTOR = 0.2
+STATUS_TO_RETRY = (500, 502, 504)
+
+HOURS_PER_DAY = 24
+
+
+class OpenMeteoClient:
+    """Forecast and marine endpoints of Open-Meteo behind one retrying session."""
+
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        forecast_url: str = FORECAST_URL,
+        marine_url: str = MARINE_URL,
+        retries: int = RETRIES,
+        backoff_factor: float = BACKOFF_FACTOR,
+    ):
+        """
+        Args:
+            session: Transport used for the HTTP calls, a new requests session by default
+            forecast_url: URL of the weather forecast endpoint
+            marine_url: URL of the marine forecast endpoint
+            retries: Attempts made on connection errors and 5xx responses
+            backoff_factor: Base of the exponential delay between attempts, in seconds
+        """
+        self.forecast_url = forecast_url
+        self.marine_url = marine_url
+        self._client = openmeteo_requests.Client(
+            session=retry(
+                session or requests.Session(),
+                retries=retries,
+                backoff_factor=backoff_factor,
+                status_to_retry=STATUS_TO_RETRY,
+            )
+        )
+
+    def forecast(self, params: Dict[str, Any]) -> List[WeatherApiResponse]:
+        """Call the weather forecast endpoint, one response per requested location."""
+        return self._client.weather_api(self.forecast_url, params=params)
+
+    def marine(self, params: Dict[str, Any]) -> List[WeatherApiResponse]:
+        """Call the marine forecast endpoint, one response per requested location."""
+        return self._client.weather_api(self.marine_url, params=params)
+
+
+_default_client: Optional[OpenMeteoClient] = None
+
+
+def get_client() -> OpenMeteoClient:
+    """
+    Client used when the services aren't given one.
+
+    Built on first use from the OPEN_METEO_* settings of the current app.
+    """
+    global _default_client
+    if _default_client is None:
+        config = current_app.config if has_app_context() else {}
+        _default_client = OpenMeteoClient(
+            forecast_url=config.get("OPEN_METEO_FORECAST_URL", FORECAST_URL),
+            marine_url=config.get("OPEN_METEO_MARINE_URL", MARINE_URL),
+        )
+    return _default_client
+
+
+def set_client(client: Optional[OpenMeteoClient]) -> None:
+    """Replace the default client, None rebuilds it from the app settings on next use."""
+    global _default_client
+    _default_client = client
+
+
+def hourly_params(locations: Sequence[Tuple[float, float, date]], variables: Sequence[str], model: str) -> Dict[str, Any]:
+    """
+    Parameters of one multi-location request covering the dates of all locations.
+
+    Args:
+        locations: (latitude, longitude, date) of each location
+        variables: Hourly variables to request, in order
+        model: Model to request
+    """
+    dates = [day for _, _, day in locations]
+    return {
+        "latitude": [latitude for latitude, _, _ in locations],
+        "longitude": [longitude for _, longitude, _ in locations],
+        "hourly": list(variables),
+        "models": model,
+        "timezone": "auto",
+        "start_date": min(dates).isoformat(),
+        "end_date": max(dates).isoformat(),
+    }
+
+
+def by_date(locations: Sequence[Tuple[float, float, date]]) -> Dict[date, List[int]]:
+    """Indexes of the locations sharing each date, so each request spans a single day."""
+    groups: Dict[date, List[int]] = {}
+    for index, (_, _, day) in enumerate(locations):
+        groups.setdefault(day, []).append(index)
+    return groups
+
+
+def split_hourly(
+    responses: List[WeatherApiResponse], locations: Sequence[Tuple[float, float, date]], names: Sequence[str]
+) -> List[Dict[str, np.ndarray]]:
+    """
+    Slice the hourly series of a request made with hourly_params to each location's own date.
+
+    Args:
+        responses: Responses of the request, one per location
+        locations: (latitude, longitude, date) of each location, as requested
+        names: Key given to each requested variable, in request order
+
+    Returns:
+        For each location, the 24 local hourly values of every variable (NaN where missing)
+    """
+    first = min(day for _, _, day in locations)
+    forecasts = []
+    for response, (_, _, day) in zip(responses, locations):
+        hourly = response.Hourly()
+        steps_per_day = timedelta(days=1) // timedelta(seconds=hourly.Interval())
+        offset = (day - first).days * steps_per_day
+        values = {}
+        for index, name in enumerate(names):
+            series = hourly.Variables(index).ValuesAsNumpy()[offset:offset + steps_per_day][:HOURS_PER_DAY]
+            values[name] = np.full(HOURS_PER_DAY, np.nan)
+            values[name][:len(series)] = series
+        forecasts.append(values)
+    return forecasts
@@ -0,0 +1,108 @@
+"""
+Forecast cache shared by the weather and marine services.
+
+Forecasts are cached per grid cell rather than per exact coordinate: locations are
+snapped to the centre of a GRID_DEGREES cell (about 5 km) and the cell centre is
+what gets requested, so every point of a busy stretch of coast shares one entry.
+Entries are keyed by (source, model, cell, date, update cycle) and hold the 24
+hourly values of each variable for that date. They expire when the source's model
+publishes its next run, so a cell is fetched at most once per cycle.
+"""
+import math
+import time
+from datetime import date
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from Services.Utils.cache import LRUCache
+
+# Side of a grid cell in degrees
+GRID_DEGREES = 0.05
+
+# Seconds between two runs of the models behind each source
+MODEL_UPDATE_INTERVALS = {
+    "weather": 3600,
+    "marine": 6 * 3600,
+}
+
+forecast_cache = LRUCache(maxsize=4096)
+
+Location = Tuple[float, float, date]
+HourlyValues = Dict[str, np.ndarray]
+
+
+def grid_cell(latitude: float, longitude: float) -> Tuple[float, float]:
+    """Centre of the grid cell containing a coordinate."""
+    return (
+        round((math.floor(latitude / GRID_DEGREES) + 0.5) * GRID_DEGREES, 6),
+        round((math.floor(longitude / GRID_DEGREES) + 0.5) * GRID_DEGREES, 6),
+    )
+
+
+def update_cycle(source: str, now: Optional[float] = None) -> Tuple[int, float]:
+    """
+    Current model run of a source.
+
+    Returns:
+        Tuple of (cycle number, seconds until the next run)
+    """
+    interval = MODEL_UPDATE_INTERVALS[source]
+    now = time.time() if now is None else now
+    cycle = int(now // interval)
+    return cycle, (cycle + 1) * interval - now
+
+
+def cached_forecasts(
+    source: str, model: str, locations: Sequence[Location], fetch: Callable[[List[Location]], List[HourlyValues]]
+) -> List[HourlyValues]:
+    """
+    Hourly forecasts of several (latitude, longitude, date) locations, fetching only the missing cells.
+
+    Args:
+        source: Forecast source, a key of MODEL_UPDATE_INTERVALS
+        model: Model requested from the source
+        locations: (latitude, longitude, date) of each forecast needed
+        fetch: Called once with the (cell latitude, cell longitude, date) of every
+            missing entry, returns their hourly values in the same order
+
+    Returns:
+        Hourly values of each location, in order. The arrays are shared with the
+        cache and must not be modified.
+    """
+    cycle, ttl = update_cycle(source)
+    keys = [(source, model, *grid_cell(latitude, longitude), day, cycle) for latitude, longitude, day in locations]
+
+    found = {key: forecast_cache.get(key) for key in dict.fromkeys(keys)}
+    missing = [key for key, values in found.items() if values is None]
+    if missing:
+        fetched = fetch([(cell_latitude, cell_longitude, day) for _, _, cell_latitude, cell_longitude, day, _ in missing])
+        for key, values in zip(missing, fetched):
+            forecast_cache.put(key, values, ttl=ttl)
+            found[key] = values
+
+    return [found[key] for key in keys]
+
+
+def missing_cells(source: str, model: str, locations: Sequence[Location]) -> List[Location]:
+    """
+    Grid cells of the locations that aren't cached for the current model run.
+
+    Returns:
+        (cell latitude, cell longitude, date) of each missing entry, without duplicates
+    """
+    cycle, _ = update_cycle(source)
+    cells = dict.fromkeys((*grid_cell(latitude, longitude), day) for latitude, longitude, day in locations)
+    return [cell for cell in cells if forecast_cache.get((source, model, *cell, cycle)) is None]
+
+
+def store_forecasts(source: str, model: str, cells: Sequence[Location], forecasts: Sequence[HourlyValues]) -> None:
+    """Cache the hourly values fetched for grid cells until the source's next model run."""
+    cycle, ttl = update_cycle(source)
+    for (cell_latitude, cell_longitude, day), values in zip(cells, forecasts):
+        forecast_cache.put((source, model, cell_latitude, cell_longitude, day, cycle), values, ttl=ttl)
+
+
+def get_forecast_cache_stats() -> Dict[str, float]:
+    """Hit, miss and size counters of the forecast cache."""
+    return forecast_cache.stats()
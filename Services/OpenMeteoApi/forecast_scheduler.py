@@ -0,0 +1,241 @@
+"""
+Background refresh of the forecasts of upcoming trip days.
+
+Every FORECAST_REFRESH_INTERVAL seconds the scheduler looks for days dated within
+the next FORECAST_REFRESH_DAYS_AHEAD days that have located points, groups them by
+the grid cell of their centre and refreshes their weather and sea states on a
+small thread pool. Before that, the forecasts of every due cell are fetched
+concurrently in batched requests to warm the forecast cache, so the refreshes
+mostly read from it. Every Open-Meteo request first takes a token from a rate
+limiter, which the refreshes hand down to the services so that the sea refresh of
+a cell takes one per date requested and forecasts read from the cache take none.
+Request handlers then only read the stored states.
+
+The scheduler runs inside the app process when FORECAST_REFRESH_ENABLED is set. A
+single pass can also be run with `flask --app Api.app:createApp('development')
+refresh-forecasts`, e.g. from cron when the app runs in several processes.
+"""
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+import threading
+import time
+
+from flask import Flask
+from sqlalchemy import func
+
+from Api.database import db
+from Models.day import Day
+from Models.point import Point
+from Services.OpenMeteoApi.async_client import AsyncForecastFetcher
+from Services.OpenMeteoApi.client import get_client
+from Services.OpenMeteoApi.forecast_cache import grid_cell
+from Services.OpenMeteoApi.sea_service import SeaService
+from Services.OpenMeteoApi.weather_service import WeatherService
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Thread-safe rate limiter allowing rate_per_minute acquisitions with bursts of up to burst."""
+
+    def __init__(
+        self,
+        rate_per_minute: float,
+        burst: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst if burst is not None else max(1, int(rate_per_minute // 60)))
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Take one token, waiting for it if the bucket is empty."""
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+
+
+class ForecastScheduler:
+    """Periodically refreshes the weather and sea states of the days coming up."""
+
+    def __init__(self, app: Flask, interval: float, days_ahead: int, workers: int, requests_per_minute: float):
+        """
+        Args:
+            app: Application whose database holds the days
+            interval: Seconds between two refresh passes
+            days_ahead: Days from today whose forecasts are refreshed
+            workers: Cell groups refreshed concurrently
+            requests_per_minute: Maximum Open-Meteo requests per minute
+        """
+        self.app = app
+        self.interval = interval
+        self.days_ahead = days_ahead
+        self.workers = workers
+        self.limiter = TokenBucket(requests_per_minute)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def due_days(self) -> Dict[Tuple[float, float], List[str]]:
+        """
+        Upcoming days with located points, grouped by the grid cell of their centre.
+
+        Must be called within an app context.
+        """
+        groups: Dict[Tuple[float, float], List[str]] = defaultdict(list)
+        for row in self._due_centres():
+            groups[grid_cell(float(row.latitude), float(row.longitude))].append(str(row.id))
+        return groups
+
+    def prefetch(self) -> int:
+        """
+        Warm the forecast cache with the weather of every due point and the sea of every due day.
+
+        Must be called within an app context.
+
+        Returns:
+            Number of grid cells fetched
+        """
+        points = (
+            db.session.query(Point.latitude, Point.longitude, Day.date)
+            .join(Day, Point.day_id == Day.id)
+            .filter(*self._due_filters())
+            .all()
+        )
+        fetcher = AsyncForecastFetcher.from_client(get_client(), max_concurrency=self.workers, limiter=self.limiter)
+        return fetcher.prefetch(
+            [(float(row.latitude), float(row.longitude), row.date) for row in points],
+            [(float(row.latitude), float(row.longitude), row.date) for row in self._due_centres()],
+        )
+
+    def run_once(self) -> Dict[str, int]:
+        """
+        Refresh the forecasts of every due day once.
+
+        Returns:
+            Counts of due days, of their cells and of the refreshes that failed
+        """
+        with self.app.app_context():
+            groups = self.due_days()
+            try:
+                self.prefetch()
+            except Exception as e:
+                # The refreshes fall back to one request each
+                logger.warning(f"Forecast prefetch failed: {str(e)}")
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="forecast-refresh") as executor:
+            results = list(executor.map(self._refresh_group, groups.values()))
+
+        summary = {
+            "days": sum(len(day_ids) for day_ids in groups.values()),
+            "cells": len(groups),
+            "failed": sum(results),
+        }
+        logger.info(f"Refreshed forecasts of {summary['days']} days in {summary['cells']} cells, {summary['failed']} failures")
+        return summary
+
+    def start(self) -> None:
+        """Run refresh passes in a daemon thread until stop() is called."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="forecast-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _due_filters(self) -> list:
+        today = date.today()
+        return [
+            Day.date >= today,
+            Day.date <= today + timedelta(days=self.days_ahead),
+            Point.latitude.isnot(None),
+            Point.longitude.isnot(None),
+        ]
+
+    def _due_centres(self) -> list:
+        """Id, date and centre of the points of each due day."""
+        return (
+            db.session.query(
+                Day.id, Day.date, func.avg(Point.latitude).label("latitude"), func.avg(Point.longitude).label("longitude")
+            )
+            .join(Point, Point.day_id == Day.id)
+            .filter(*self._due_filters())
+            .group_by(Day.id, Day.date)
+            .all()
+        )
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Forecast refresh pass failed: {str(e)}")
+            self._stop.wait(self.interval)
+
+    def _refresh_group(self, day_ids: List[str]) -> int:
+        """Refresh the sea states of a cell's days in one call and their weather day by day."""
+        failed = 0
+        with self.app.app_context():
+            try:
+                SeaService.refresh_days(day_ids, limiter=self.limiter)
+            except Exception as e:
+                failed += 1
+                logger.warning(f"Sea forecast refresh failed for days {day_ids}: {str(e)}")
+
+            for day_id in day_ids:
+                try:
+                    WeatherService.refresh_day(day_id, limiter=self.limiter)
+                except Exception as e:
+                    failed += 1
+                    logger.warning(f"Weather forecast refresh failed for day {day_id}: {str(e)}")
+        return failed
+
+
+def register_forecast_scheduler(app: Flask) -> ForecastScheduler:
+    """
+    Create the app's forecast scheduler and the refresh-forecasts CLI command.
+
+    The background thread is only started when FORECAST_REFRESH_ENABLED is set.
+
+    Args:
+        app: Flask application instance
+
+    Returns:
+        The scheduler
+    """
+    scheduler = ForecastScheduler(
+        app,
+        interval=app.config["FORECAST_REFRESH_INTERVAL"],
+        days_ahead=app.config["FORECAST_REFRESH_DAYS_AHEAD"],
+        workers=app.config["FORECAST_REFRESH_WORKERS"],
+        requests_per_minute=app.config["FORECAST_REQUESTS_PER_MINUTE"],
+    )
+
+    @app.cli.command("refresh-forecasts")
+    def refresh_forecasts():
+        """Refresh the forecasts of the upcoming trip days once."""
+        summary = scheduler.run_once()
+        print(f"Refreshed {summary['days']} days in {summary['cells']} cells, {summary['failed']} failures")
+
+    app.extensions["forecast_scheduler"] = scheduler
+    if app.config["FORECAST_REFRESH_ENABLED"]:
+        scheduler.start()
+    return scheduler
@@ -1,95 +1,216 @@
-import openmeteo_requests
-
-import pandas as pd
-import requests_cache
-from retry_requests import retry
-
-# Setup the Open-Meteo API client with cache and retry on error
-cache_session = requests_cache.CachedSession('.cache', expire_after = 3600)
-retry_session = retry(cache_session, retries = 5, backoff_factor = 0.2)
-openmeteo = openmeteo_requests.Client(session = retry_session)
-
-# Make sure all required weather variables are listed here
-# The order of variables in hourly or daily is important to assign them correctly below
-url = "https://marine-api.open-meteo.com/v1/marine"
-params = {
-	"latitude": 50.8284,
-	"longitude": -0.1395,
-	"hourly": "wave_height",
-	"models": "best_match",
-	"current": ["ocean_current_direction", "ocean_current_velocity", "sea_level_height_msl", "wave_height", "wave_direction", "wave_period", "wind_wave_height", "wind_wave_direction", "wind_wave_period", "swell_wave_height", "swell_wave_direction", "swell_wave_period"],
-	"minutely_15": ["ocean_current_velocity", "ocean_current_direction", "sea_level_height_msl"],
-	"forecast_hours": 1,
+"""
+Hourly marine forecasts for the days of an itinerary.
+
+Days are refreshed in batch: each day is represented by the centre of its points
+and those whose grid cell isn't in the forecast cache go to the Open-Meteo marine
+endpoint in one multi-location request per date, so the response stays one day
+long per location. Days past the marine forecast horizon are skipped, as a single
+one would make the endpoint reject the request. Each location's arrays are sliced
+to its own date, stacked into (days, hours) matrices and written
+as SeaState rows with one bulk insert, without building ORM objects per row.
+"""
+from datetime import date, time, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+import logging
+
+import numpy as np
+from sqlalchemy import delete, func, insert, update
+from flask import current_app, has_app_context
+from sqlalchemy.orm import selectinload
+
+from Api.database import db
+from Models.day import Day
+from Models.sea import Sea
+from Models.sea_state import SeaState
+from Services.OpenMeteoApi.client import (
+    HOURS_PER_DAY,
+    MARINE_FORECAST_DAYS,
+    OpenMeteoClient,
+    by_date,
+    get_client,
+    hourly_params,
+    split_hourly,
+)
+from Services.OpenMeteoApi.forecast_cache import cached_forecasts
+from Services.forecast_series_service import ForecastSeriesService
+
+logger = logging.getLogger(__name__)
+
+MARINE_MODEL = "best_match"
+
+# Marine variable requested for each SeaState column, in request order
+HOURLY_VARIABLES = {
+    "wave_height": "wave_height",
+    "wave_direction": "wave_direction",
+    "swell_direction": "swell_wave_direction",
+    "swell_period": "swell_wave_period",
 }
-responses = openmeteo.weather_api(url, params=params)
-
-# Process first location. Add a for-loop for multiple locations or weather models
-response = responses[0]
-print(f"Coordinates: {response.Latitude()}°N {response.Longitude()}°E")
-print(f"Elevation: {response.Elevation()} m asl")
-print(f"Timezone difference to GMT+0: {response.UtcOffsetSeconds()}s")
-
-# Process current data. The order of variables needs to be the same as requested.
-current = response.Current()
-current_ocean_current_direction = current.Variables(0).Value()
-current_ocean_current_velocity = current.Variables(1).Value()
-current_sea_level_height_msl = current.Variables(2).Value()
-current_wave_height = current.Variables(3).Value()
-current_wave_direction = current.Variables(4).Value()
-current_wave_period = current.Variables(5).Value()
-current_wind_wave_height = current.Variables(6).Value()
-current_wind_wave_direction = current.Variables(7).Value()
-current_wind_wave_period = current.Variables(8).Value()
-current_swell_wave_height = current.Variables(9).Value()
-current_swell_wave_direction = current.Variables(10).Value()
-current_swell_wave_period = current.Variables(11).Value()
-
-print(f"\nCurrent time: {current.Time()}")
-print(f"Current ocean_current_direction: {current_ocean_current_direction}")
-print(f"Current ocean_current_velocity: {current_ocean_current_velocity}")
-print(f"Current sea_level_height_msl: {current_sea_level_height_msl}")
-print(f"Current wave_height: {current_wave_height}")
-print(f"Current wave_direction: {current_wave_direction}")
-print(f"Current wave_period: {current_wave_period}")
-print(f"Current wind_wave_height: {current_wind_wave_height}")
-print(f"Current wind_wave_direction: {current_wind_wave_direction}")
-print(f"Current wind_wave_period: {current_wind_wave_period}")
-print(f"Current swell_wave_height: {current_swell_wave_height}")
-print(f"Current swell_wave_direction: {current_swell_wave_direction}")
-print(f"Current swell_wave_period: {current_swell_wave_period}")
-
-# Process minutely_15 data. The order of variables needs to be the same as requested.
-minutely_15 = response.Minutely15()
-minutely_15_ocean_current_velocity = minutely_15.Variables(0).ValuesAsNumpy()
-minutely_15_ocean_current_direction = minutely_15.Variables(1).ValuesAsNumpy()
-minutely_15_sea_level_height_msl = minutely_15.Variables(2).ValuesAsNumpy()
-
-minutely_15_data = {"date": pd.date_range(
-	start = pd.to_datetime(minutely_15.Time(), unit = "s", utc = True),
-	end =  pd.to_datetime(minutely_15.TimeEnd(), unit = "s", utc = True),
-	freq = pd.Timedelta(seconds = minutely_15.Interval()),
-	inclusive = "left"
-)}
-
-minutely_15_data["ocean_current_velocity"] = minutely_15_ocean_current_velocity
-minutely_15_data["ocean_current_direction"] = minutely_15_ocean_current_direction
-minutely_15_data["sea_level_height_msl"] = minutely_15_sea_level_height_msl
-
-minutely_15_dataframe = pd.DataFrame(data = minutely_15_data)
-print("\nMinutely15 data\n", minutely_15_dataframe)
-
-# Process hourly data. The order of variables needs to be the same as requested.
-hourly = response.Hourly()
-hourly_wave_height = hourly.Variables(0).ValuesAsNumpy()
-
-hourly_data = {"date": pd.date_range(
-	start = pd.to_datetime(hourly.Time(), unit = "s", utc = True),
-	end =  pd.to_datetime(hourly.TimeEnd(), unit = "s", utc = True),
-	freq = pd.Timedelta(seconds = hourly.Interval()),
-	inclusive = "left"
-)}
-
-hourly_data["wave_height"] = hourly_wave_height
-
-hourly_dataframe = pd.DataFrame(data = hourly_data)
-print("\nHourly data\n", hourly_dataframe)
+
+
+class SeaService:
+
+    @staticmethod
+    def refresh_itinerary(itinerary_id: str, client: Optional[OpenMeteoClient] = None) -> List[UUID]:
+        """
+        Fetch and store the marine forecast of every day of an itinerary.
+
+        Args:
+            itinerary_id: The ID of the itinerary
+            client: Open-Meteo client, the default one if not given
+
+        Returns:
+            IDs of the days whose sea states were stored
+        """
+        day_ids = db.session.query(Day.id).filter_by(itinerary_id=UUID(itinerary_id)).all()
+        return SeaService.refresh_days([str(row.id) for row in day_ids], client)
+
+    @staticmethod
+    def refresh_days(day_ids: Sequence[str], client: Optional[OpenMeteoClient] = None, limiter=None) -> List[UUID]:
+        """
+        Fetch and store the marine forecast of several days with at most one request per date.
+
+        Days without located points or past the marine forecast horizon
+        (OPEN_METEO_MARINE_FORECAST_DAYS from today) are skipped. The previous sea
+        states of the refreshed days are replaced.
+
+        Args:
+            day_ids: IDs of the days
+            client: Open-Meteo client, the default one if not given
+            limiter: Rate limiter whose blocking acquire() is called before each request
+
+        Returns:
+            IDs of the days whose sea states were stored
+
+        Raises:
+            OpenMeteoRequestsError: If the marine request fails
+        """
+        days = (
+            db.session.query(Day)
+            .options(selectinload(Day.points))
+            .filter(Day.id.in_([UUID(day_id) for day_id in day_ids]))
+            .all()
+        )
+
+        horizon = date.today() + timedelta(days=SeaService.forecast_days() - 1)
+        located = []
+        for day in days:
+            if day.date > horizon:
+                logger.info(f"Skipping sea forecast of day {day.id}: {day.date} is past the marine forecast horizon")
+                continue
+            coordinates = [
+                (float(point.latitude), float(point.longitude))
+                for point in day.points or []
+                if point.latitude is not None and point.longitude is not None
+            ]
+            if coordinates:
+                latitude, longitude = np.mean(coordinates, axis=0)
+                located.append((day, float(latitude), float(longitude)))
+            else:
+                logger.info(f"Skipping sea forecast of day {day.id}: no points with coordinates")
+
+        if not located:
+            return []
+
+        matrices = SeaService.fetch_hourly(
+            [(latitude, longitude) for _, latitude, longitude in located],
+            [day.date for day, _, _ in located],
+            client,
+            limiter,
+        )
+        refreshed = [day.id for day, _, _ in located]
+        SeaService.store_states(refreshed, matrices)
+        logger.info(f"Stored sea states for {len(refreshed)} days")
+        return refreshed
+
+    @staticmethod
+    def fetch_hourly(
+        coordinates: Sequence[Tuple[float, float]],
+        dates: Sequence[date],
+        client: Optional[OpenMeteoClient] = None,
+        limiter=None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Hourly marine forecast of each (location, date) pair.
+
+        Pairs are served from the forecast cache by grid cell; those not cached for
+        the current model run are fetched with one request per date.
+
+        Args:
+            coordinates: (latitude, longitude) of each day
+            dates: Date of each day, in the locations' local time
+            client: Open-Meteo client, the default one if not given
+            limiter: Rate limiter whose blocking acquire() is called before each request
+
+        Returns:
+            Arrays of shape (days, 24) keyed by SeaState column, NaN where the
+            forecast has no value
+        """
+        def request(cells):
+            forecasts = [None] * len(cells)
+            for indexes in by_date(cells).values():
+                same_date = [cells[index] for index in indexes]
+                if limiter is not None:
+                    limiter.acquire()
+                responses = (client or get_client()).marine(hourly_params(same_date, HOURLY_VARIABLES.values(), MARINE_MODEL))
+                for index, forecast in zip(indexes, split_hourly(responses, same_date, list(HOURLY_VARIABLES))):
+                    forecasts[index] = forecast
+            return forecasts
+
+        forecasts = cached_forecasts(
+            "marine",
+            MARINE_MODEL,
+            [(latitude, longitude, day) for (latitude, longitude), day in zip(coordinates, dates)],
+            request,
+        )
+        return {column: np.vstack([forecast[column] for forecast in forecasts]) for column in HOURLY_VARIABLES}
+
+    @staticmethod
+    def forecast_days() -> int:
+        """Days ahead the marine endpoint forecasts, from the app settings when available."""
+        if has_app_context():
+            return current_app.config.get("OPEN_METEO_MARINE_FORECAST_DAYS", MARINE_FORECAST_DAYS)
+        return MARINE_FORECAST_DAYS
+
+    @staticmethod
+    def store_states(day_ids: List[UUID], matrices: Dict[str, np.ndarray]) -> None:
+        """
+        Replace the sea states of several days with one bulk insert.
+
+        When FORECAST_STORAGE is 'series' the matrices are stored as packed series
+        instead of state rows.
+
+        Args:
+            day_ids: IDs of the days, in the row order of the matrices
+            matrices: Arrays of shape (days, 24) keyed by SeaState column
+        """
+        try:
+            existing = {row.day_id for row in db.session.query(Sea.day_id).filter(Sea.day_id.in_(day_ids))}
+            missing = [{"day_id": day_id} for day_id in day_ids if day_id not in existing]
+            if missing:
+                db.session.execute(insert(Sea), missing)
+            if existing:
+                db.session.execute(update(Sea).where(Sea.day_id.in_(existing)).values(recorded_at=func.now()))
+
+            db.session.execute(delete(SeaState).where(SeaState.day_id.in_(day_ids)))
+            if ForecastSeriesService.enabled():
+                ForecastSeriesService.replace("marine", day_ids, {column: matrix.round(2) for column, matrix in matrices.items()})
+            else:
+                db.session.execute(insert(SeaState), SeaService._state_rows(day_ids, matrices))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error storing sea states for days {day_ids}: {str(e)}")
+            raise
+
+    @staticmethod
+    def _state_rows(day_ids: List[UUID], matrices: Dict[str, np.ndarray]) -> List[Dict]:
+        """SeaState rows of the matrices, built column-wise with NaN as None."""
+        day_column = np.repeat(np.array(day_ids, dtype=object), HOURS_PER_DAY).tolist()
+        time_column = [time(hour) for hour in range(HOURS_PER_DAY)] * len(day_ids)
+        value_columns = [
+            np.where(np.isnan(matrix), None, matrix.round(2).astype(object)).ravel().tolist()
+            for matrix in matrices.values()
+        ]
+        names = ["day_id", "time", *matrices.keys()]
+        return [dict(zip(names, values)) for values in zip(day_column, time_column, *value_columns)]
@@ -1,57 +1,182 @@
-import openmeteo_requests
-
-import pandas as pd
-import requests_cache
-from retry_requests import retry
-
-# Setup the Open-Meteo API client with cache and retry on error
-cache_session = requests_cache.CachedSession('.cache', expire_after = 3600)
-retry_session = retry(cache_session, retries = 5, backoff_factor = 0.2)
-openmeteo = openmeteo_requests.Client(session = retry_session)
-
-# Make sure all required weather variables are listed here
-# The order of variables in hourly or daily is important to assign them correctly below
-url = "https://api.open-meteo.com/v1/forecast"
-params = {
-	"latitude": 52.52,
-	"longitude": 13.41,
-	"hourly": ["temperature_2m", "wind_speed_10m", "wind_direction_10m", "wind_gusts_10m", "rain", "precipitation", "visibility", "cloud_cover"],
-	"models": "best_match",
-}
-responses = openmeteo.weather_api(url, params=params)
-
-# Process first location. Add a for-loop for multiple locations or weather models
-response = responses[0]
-print(f"Coordinates: {response.Latitude()}°N {response.Longitude()}°E")
-print(f"Elevation: {response.Elevation()} m asl")
-print(f"Timezone difference to GMT+0: {response.UtcOffsetSeconds()}s")
-
-# Process hourly data. The order of variables needs to be the same as requested.
-hourly = response.Hourly()
-hourly_temperature_2m = hourly.Variables(0).ValuesAsNumpy()
-hourly_wind_speed_10m = hourly.Variables(1).ValuesAsNumpy()
-hourly_wind_direction_10m = hourly.Variables(2).ValuesAsNumpy()
-hourly_wind_gusts_10m = hourly.Variables(3).ValuesAsNumpy()
-hourly_rain = hourly.Variables(4).ValuesAsNumpy()
-hourly_precipitation = hourly.Variables(5).ValuesAsNumpy()
-hourly_visibility = hourly.Variables(6).ValuesAsNumpy()
-hourly_cloud_cover = hourly.Variables(7).ValuesAsNumpy()
-
-hourly_data = {"date": pd.date_range(
-	start = pd.to_datetime(hourly.Time(), unit = "s", utc = True),
-	end =  pd.to_datetime(hourly.TimeEnd(), unit = "s", utc = True),
-	freq = pd.Timedelta(seconds = hourly.Interval()),
-	inclusive = "left"
-)}
-
-hourly_data["temperature_2m"] = hourly_temperature_2m
-hourly_data["wind_speed_10m"] = hourly_wind_speed_10m
-hourly_data["wind_direction_10m"] = hourly_wind_direction_10m
-hourly_data["wind_gusts_10m"] = hourly_wind_gusts_10m
-hourly_data["rain"] = hourly_rain
-hourly_data["precipitation"] = hourly_precipitation
-hourly_data["visibility"] = hourly_visibility
-hourly_data["cloud_cover"] = hourly_cloud_cover
-
-hourly_dataframe = pd.DataFrame(data = hourly_data)
-print("\nHourly data\n", hourly_dataframe)
+"""
+Hourly weather forecasts for the days of an itinerary.
+
+The points of a day whose grid cell isn't in the forecast cache are sent to the
+Open-Meteo forecast endpoint in a single multi-location request. The per-location
+series are reduced to one hourly series for the day (mean temperature and cloud
+cover, the worst precipitation and wind along the route, circular mean of the wind
+direction) and stored as the day's WeatherState rows with one bulk insert, or as
+ForecastSeries when FORECAST_STORAGE is 'series'.
+"""
+from datetime import date, time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+import logging
+import warnings
+
+import numpy as np
+from sqlalchemy import delete, insert
+from sqlalchemy.exc import NoResultFound
+from sqlalchemy.orm import selectinload
+
+from Api.database import db
+from Models.day import Day
+from Models.weather import Weather
+from Models.weather_state import WeatherState
+from Services.OpenMeteoApi.client import HOURS_PER_DAY, OpenMeteoClient, get_client, hourly_params, split_hourly
+from Services.OpenMeteoApi.forecast_cache import cached_forecasts
+from Services.forecast_series_service import ForecastSeriesService
+
+logger = logging.getLogger(__name__)
+
+WEATHER_MODEL = "best_match"
+
+# The order of the variables is the order of the series in the response
+HOURLY_VARIABLES = ["temperature_2m", "precipitation", "wind_speed_10m", "wind_direction_10m", "cloud_cover"]
+
+
+class WeatherService:
+
+    @staticmethod
+    def fetch_hourly(
+        coordinates: Sequence[Tuple[float, float]],
+        day: date,
+        client: Optional[OpenMeteoClient] = None,
+        limiter=None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Hourly forecast of a day for several locations.
+
+        Locations are served from the forecast cache by grid cell; the cells not
+        cached for the current model run are fetched together in one request.
+
+        Args:
+            coordinates: (latitude, longitude) of each location
+            day: Date of the forecast, in the locations' local time
+            client: Open-Meteo client, the default one if not given
+            limiter: Rate limiter whose blocking acquire() is called before the request
+
+        Returns:
+            Arrays of shape (locations, 24 hours) keyed by each of HOURLY_VARIABLES
+        """
+        def request(cells):
+            if limiter is not None:
+                limiter.acquire()
+            responses = (client or get_client()).forecast(hourly_params(cells, HOURLY_VARIABLES, WEATHER_MODEL))
+            return split_hourly(responses, cells, HOURLY_VARIABLES)
+
+        forecasts = cached_forecasts(
+            "weather", WEATHER_MODEL, [(latitude, longitude, day) for latitude, longitude in coordinates], request
+        )
+        return {name: np.vstack([forecast[name] for forecast in forecasts]) for name in HOURLY_VARIABLES}
+
+    @staticmethod
+    def summarize(series: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Reduce per-location hourly series to the weather of a day.
+
+        Args:
+            series: Arrays of shape (locations, 24 hours) keyed by variable
+
+        Returns:
+            24 hourly values of each WeatherState column (cloud as cover percentage), NaN where missing
+        """
+        with warnings.catch_warnings():
+            # Hours missing at every location reduce to NaN, stored as None
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            radians = np.radians(series["wind_direction_10m"])
+            direction = np.degrees(np.arctan2(np.nanmean(np.sin(radians), axis=0), np.nanmean(np.cos(radians), axis=0))) % 360
+            return {
+                "temperature": np.nanmean(series["temperature_2m"], axis=0).round(2),
+                "precipitation": np.nanmax(series["precipitation"], axis=0).round(2),
+                "wind_direction": direction.round(2),
+                "wind_force": np.nanmax(series["wind_speed_10m"], axis=0).round(2),
+                "cloud": np.nanmean(series["cloud_cover"], axis=0).round(0),
+            }
+
+    @staticmethod
+    def refresh_day(day_id: str, client: Optional[OpenMeteoClient] = None, limiter=None) -> Weather:
+        """
+        Fetch and store the weather forecast of a day.
+
+        The day's located points are sent in one request and the previous weather
+        states of the day are replaced.
+
+        Args:
+            day_id: The ID of the day
+            client: Open-Meteo client, the default one if not given
+            limiter: Rate limiter whose blocking acquire() is called before the request
+
+        Returns:
+            The day's weather
+
+        Raises:
+            NoResultFound: If the day doesn't exist
+            ValueError: If none of the day's points has coordinates
+            OpenMeteoRequestsError: If the forecast request fails
+        """
+        day = db.session.query(Day).options(selectinload(Day.points)).filter_by(id=UUID(day_id)).first()
+        if not day:
+            raise NoResultFound(f"Day with id {day_id} not found")
+
+        coordinates = [
+            (float(point.latitude), float(point.longitude))
+            for point in day.points or []
+            if point.latitude is not None and point.longitude is not None
+        ]
+        if not coordinates:
+            raise ValueError(f"Day {day_id} has no points with coordinates")
+
+        series = WeatherService.fetch_hourly(coordinates, day.date, client, limiter)
+        weather = WeatherService.store_states(day.id, WeatherService.summarize(series))
+        logger.info(f"Stored the weather of day {day_id} from {len(coordinates)} locations")
+        return weather
+
+    @staticmethod
+    def store_states(day_id: UUID, columns: Dict[str, np.ndarray]) -> Weather:
+        """
+        Replace the weather states of a day.
+
+        The states are written with a single bulk insert, or as packed series when
+        FORECAST_STORAGE is 'series'.
+
+        Args:
+            day_id: The ID of the day
+            columns: 24 hourly values of each WeatherState column, as returned by summarize
+
+        Returns:
+            The day's weather
+        """
+        try:
+            weather = db.session.get(Weather, day_id)
+            if weather is None:
+                weather = Weather(day_id=day_id, model=WEATHER_MODEL)
+                db.session.add(weather)
+            else:
+                weather.model = WEATHER_MODEL
+            db.session.flush()
+
+            db.session.execute(delete(WeatherState).where(WeatherState.day_id == day_id))
+            if ForecastSeriesService.enabled():
+                ForecastSeriesService.replace("weather", [day_id], {name: column[np.newaxis] for name, column in columns.items()})
+            else:
+                db.session.execute(insert(WeatherState), WeatherService._state_rows(day_id, columns))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error storing weather states for day {day_id}: {str(e)}")
+            raise
+        return weather
+
+    @staticmethod
+    def _state_rows(day_id: UUID, columns: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+        values = {name: _nan_to_none(column) for name, column in columns.items()}
+        values["cloud"] = [None if cover is None else f"{cover:.0f}%" for cover in values["cloud"]]
+        return [
+            {"day_id": day_id, "time": time(hour), **{name: column[hour] for name, column in values.items()}}
+            for hour in range(HOURS_PER_DAY)
+        ]
+
+
+def _nan_to_none(values: np.ndarray) -> List[Optional[float]]:
+    return [None if np.isnan(value) else value for value in values.tolist()]
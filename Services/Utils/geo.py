@@ -0,0 +1,204 @@
+"""
+Geospatial helpers shared by the point services.
+
+Points are indexed with a geohash cell stored alongside their coordinates so that
+radius lookups can be answered with an indexed prefix scan instead of a full scan
+of the point table.
+"""
+import math
+from typing import List, Optional, Set, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+EARTH_RADIUS_NM = EARTH_RADIUS_KM / 1.852
+
+# Precision stored on each point (~4.8m x 4.8m cells)
+GEOHASH_PRECISION = 9
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """
+    Encode a coordinate as a geohash string.
+
+    Args:
+        latitude: Latitude in degrees (-90..90)
+        longitude: Longitude in degrees (-180..180)
+        precision: Number of characters of the resulting hash
+
+    Returns:
+        The geohash of the cell containing the coordinate
+    """
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(geohash) < precision:
+        if even:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lon_range[0] = mid
+            else:
+                bits = bits << 1
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits = bits << 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+
+        if bit_count == 5:
+            geohash.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(geohash)
+
+
+def geohash_cell_size(precision: int) -> Tuple[float, float]:
+    """
+    Size of a geohash cell in degrees.
+
+    Returns:
+        Tuple of (latitude degrees, longitude degrees) spanned by one cell
+    """
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lon_bits)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in kilometres between two coordinates."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def haversine_nm(lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """Element-wise great-circle distances in nautical miles between arrays of coordinates."""
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = np.radians(np.asarray(lon2) - np.asarray(lon1))
+    a = np.sin(d_phi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_NM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> Tuple[float, float, Optional[float], Optional[float]]:
+    """
+    Compute the bounding box enclosing a circle on the sphere.
+
+    Returns:
+        Tuple of (min_lat, max_lat, min_lon, max_lon). The longitude bounds are None
+        when the circle spans every meridian (near the poles or for huge radii).
+        min_lon may be greater than max_lon when the box crosses the antimeridian.
+    """
+    d_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat = max(-90.0, latitude - d_lat)
+    max_lat = min(90.0, latitude + d_lat)
+
+    cos_lat = math.cos(math.radians(latitude))
+    if min_lat <= -90.0 or max_lat >= 90.0 or cos_lat <= 1e-12:
+        return min_lat, max_lat, None, None
+
+    d_lon = math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat))
+    if d_lon >= 180.0:
+        return min_lat, max_lat, None, None
+
+    min_lon = _wrap_longitude(longitude - d_lon)
+    max_lon = _wrap_longitude(longitude + d_lon)
+    return min_lat, max_lat, min_lon, max_lon
+
+
+def covering_cells(latitude: float, longitude: float, radius_km: float) -> List[str]:
+    """
+    Geohash prefixes whose union covers the circle around a coordinate.
+
+    The precision is the finest one whose cells are at least as large as the
+    circle's bounding box half-extent, so at most a 3x3 block of cells is needed.
+    Sampling the box corners, edge midpoints and centre hits every one of them.
+
+    Returns:
+        Sorted list of geohash prefixes, or an empty list if the radius is too large
+        for a prefix filter to be selective.
+    """
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+    if min_lon is None or max_lon is None:
+        return []
+
+    d_lat = max(latitude - min_lat, max_lat - latitude)
+    d_lon = math.degrees(radius_km / (EARTH_RADIUS_KM * math.cos(math.radians(latitude))))
+
+    precision = 0
+    for candidate in range(1, GEOHASH_PRECISION + 1):
+        cell_lat, cell_lon = geohash_cell_size(candidate)
+        if cell_lat < d_lat or cell_lon < d_lon:
+            break
+        precision = candidate
+
+    if precision == 0:
+        return []
+
+    cells: Set[str] = set()
+    for sample_lat in (min_lat, latitude, max_lat):
+        for sample_lon in (longitude - d_lon, longitude, longitude + d_lon):
+            cells.add(encode_geohash(sample_lat, _wrap_longitude(sample_lon), precision))
+    return sorted(cells)
+
+
+def cells_in_box(min_lat: float, max_lat: float, min_lon: float, max_lon: float, precision: int, limit: int) -> Optional[List[str]]:
+    """
+    Enumerate the geohash cells of a given precision intersecting a bounding box.
+
+    Args:
+        min_lat, max_lat, min_lon, max_lon: Box bounds as returned by bounding_box
+        precision: Precision of the cells to enumerate
+        limit: Maximum number of cells to return
+
+    Returns:
+        Sorted list of cells, or None if the box needs more than limit cells
+    """
+    cell_lat, cell_lon = geohash_cell_size(precision)
+
+    if min_lon <= max_lon:
+        lon_spans = [(min_lon, max_lon)]
+    else:
+        lon_spans = [(min_lon, 180.0), (-180.0, max_lon)]
+
+    lat_steps = _axis_steps(min_lat, max_lat, cell_lat)
+    lon_steps = [step for low, high in lon_spans for step in _axis_steps(low, high, cell_lon)]
+    if len(lat_steps) * len(lon_steps) > limit:
+        return None
+
+    return sorted({encode_geohash(lat, lon, precision) for lat in lat_steps for lon in lon_steps})
+
+
+def _axis_steps(low: float, high: float, step: float) -> List[float]:
+    """Sample positions along an axis so that every cell of size step in [low, high] is hit."""
+    positions = []
+    position = low
+    while position < high:
+        positions.append(position)
+        position += step
+    positions.append(high)
+    return positions
+
+
+def _wrap_longitude(longitude: float) -> float:
+    """Normalise a longitude to the -180..180 range."""
+    if -180.0 <= longitude <= 180.0:
+        return longitude
+    return ((longitude + 180.0) % 360.0) - 180.0
@@ -1,19 +1,107 @@
+"""
+JSON providers of the Flask app.
+
+OrjsonProvider encodes responses with orjson, which handles UUID, datetime, date,
+time, enum and dataclass values natively and writes the response body as bytes.
+CustomJSONProvider is the stdlib fallback used when orjson isn't installed or
+JSON_PROVIDER is set to 'stdlib'. Both encode datetimes as ISO 8601 and Decimals as
+strings, and honour the provider's sort_keys and compact settings.
+"""
+import dataclasses
+import decimal
+import enum
 import json
+import logging
+from datetime import date, datetime, time
 from uuid import UUID
-from datetime import datetime
+
 from flask.json.provider import DefaultJSONProvider
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def _default(o):
+    """Encoding of the values the JSON encoders don't handle natively."""
+    if isinstance(o, UUID):
+        return str(o)
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if isinstance(o, enum.Enum):
+        return o.value
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
 class CustomJSONEncoder(json.JSONEncoder):
     def default(self, o):
-        if isinstance(o, UUID):
-            return str(o)
-        if isinstance(o, datetime):
-            return o.isoformat()
-        return super().default(o)
+        return _default(o)
+
 
 class CustomJSONProvider(DefaultJSONProvider):
+    """Stdlib json provider encoding UUIDs, datetimes and Decimals like OrjsonProvider."""
+
+    default = staticmethod(_default)
+
     def dumps(self, obj, **kwargs):
-        return json.dumps(obj, cls=CustomJSONEncoder, **kwargs)
-    
+        kwargs.setdefault("default", self.default)
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
     def loads(self, s, **kwargs):
-        return json.loads(s, **kwargs)
\ No newline at end of file
+        return json.loads(s, **kwargs)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """orjson-backed provider; dumps() keeps the stdlib signature for callers passing indent."""
+
+    def _options(self, indent: bool = False) -> int:
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_default, option=self._options(bool(kwargs.get("indent")))).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=_default, option=self._options(indent) | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+JSON_PROVIDERS = {"orjson": OrjsonProvider, "stdlib": CustomJSONProvider}
+
+
+def json_provider_class(name: str = "orjson") -> type:
+    """
+    JSON provider class for a JSON_PROVIDER setting.
+
+    Args:
+        name: 'orjson' or 'stdlib'
+
+    Returns:
+        The provider class, CustomJSONProvider when orjson isn't installed
+    """
+    if name not in JSON_PROVIDERS:
+        raise ValueError(f"Unknown JSON provider {name}, expected one of {', '.join(JSON_PROVIDERS)}")
+    if name == "orjson" and orjson is None:
+        logger.warning("orjson is not installed, falling back to the stdlib JSON provider")
+        return CustomJSONProvider
+    return JSON_PROVIDERS[name]
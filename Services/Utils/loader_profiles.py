@@ -0,0 +1,84 @@
+"""
+Named eager-loading profiles for the read paths that serialize whole object graphs.
+
+Each profile is a list of loader options covering every relationship the matching
+schema dumps, so reading an entity costs a fixed number of queries (one per
+relationship level) however many days, points or items it holds.
+
+Profiles are relative to their root entity and can be nested under a relationship:
+
+    db.session.query(Trip).options(*loader_options("trip_full"))
+    db.session.query(User).options(selectinload(User.trips).options(*loader_options("trip_full")))
+"""
+from typing import Callable, Dict, List
+
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+
+from Models.day import Day
+from Models.inventory import Inventory
+from Models.itinerary import Itinerary
+from Models.point import Point
+from Models.sea import Sea
+from Models.trip import Trip
+from Models.user import User
+from Models.weather import Weather
+from Services.forecast_series_service import ForecastSeriesService
+
+
+def _day_full() -> List[LoaderOption]:
+    """Day with its points (and their images and next point), weather and sea states."""
+    options = [
+        selectinload(Day.points).options(
+            selectinload(Point.images),
+            selectinload(Point.next).selectinload(Point.images),
+        ),
+        selectinload(Day.weather).selectinload(Weather.weather_states),
+        selectinload(Day.sea).selectinload(Sea.sea_states),
+    ]
+    if ForecastSeriesService.enabled():
+        options += [
+            selectinload(Day.weather).selectinload(Weather.forecast_series),
+            selectinload(Day.sea).selectinload(Sea.forecast_series),
+        ]
+    return options
+
+
+def _itinerary_full() -> List[LoaderOption]:
+    """Itinerary with every day loaded as in day_full."""
+    return [selectinload(Itinerary.days).options(*_day_full())]
+
+
+def _trip_full() -> List[LoaderOption]:
+    """Trip with its inventory items, full itinerary and travellers."""
+    return [
+        selectinload(Trip.inventory).selectinload(Inventory.items),
+        selectinload(Trip.itinerary).options(*_itinerary_full()),
+        selectinload(Trip.travellers).selectinload(User.image),
+        selectinload(Trip.pending_travellers).selectinload(User.image),
+    ]
+
+
+LOADER_PROFILES: Dict[str, Callable[[], List[LoaderOption]]] = {
+    "day_full": _day_full,
+    "itinerary_full": _itinerary_full,
+    "trip_full": _trip_full,
+}
+
+
+def loader_options(profile: str) -> List[LoaderOption]:
+    """
+    Loader options of a named profile.
+
+    Args:
+        profile: Name of the profile ('day_full', 'itinerary_full', 'trip_full')
+
+    Returns:
+        List of options to pass to Query.options()
+
+    Raises:
+        ValueError: If the profile doesn't exist
+    """
+    if profile not in LOADER_PROFILES:
+        raise ValueError(f"Unknown loader profile {profile}")
+    return LOADER_PROFILES[profile]()
@@ -0,0 +1,128 @@
+"""
+Keyset pagination of per-user listings.
+
+Listing endpoints take `limit` and `after` query parameters and answer with a JSON
+list, the cursor of the next page being sent in the X-Next-Cursor header.
+
+Entities are paged in id order: ids are UUIDv7 (see BaseModel), so id order is
+creation order and `id > cursor` is an index range scan whatever the page. A page
+holds up to `limit` entities and the cursor of the next one, which is the id of
+its last entity, or None on the last page.
+
+Endpoints that opt in also accept `stream=true`: every entity after the cursor is
+then read from a server-side cursor in batches of STREAM_BATCH_SIZE rows, dumped
+one at a time and written out as chunks of a JSON array, so neither the rows nor
+the dumped list nor the encoded body are held in memory at once. The status and
+headers are sent before the rows are read, so an error while streaming can't
+change them: the error is logged and the array ends with a {"streamError": message}
+object, which clients must check the last element for.
+"""
+import logging
+
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from flask import Response, current_app, jsonify, request, stream_with_context
+from sqlalchemy.orm import Query
+
+from Api.database import db
+
+logger = logging.getLogger(__name__)
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Encoded bytes gathered before a chunk of a streamed array is written
+STREAM_CHUNK_SIZE = 64 * 1024
+# Key of the object ending a streamed array that failed part way
+STREAM_ERROR_KEY = "streamError"
+
+
+class Page(NamedTuple):
+    # A list, or a lazy iterator over the rows when streamed
+    items: Iterable
+    next_cursor: Optional[str]
+
+
+def paginate(query: Query, id_column, limit: Optional[int], after: Optional[str] = None) -> Page:
+    """
+    One page of a query, ordered by id.
+
+    Args:
+        query: Query of the entities to page through
+        id_column: UUIDv7 primary key column of the entities
+        limit: Largest number of entities in the page, None to stream every entity after the cursor
+        after: Cursor returned with the previous page, None for the first page
+
+    Returns:
+        The page and the cursor of the next one
+    """
+    if after:
+        query = query.filter(id_column > UUID(after))
+    query = query.order_by(id_column)
+    if limit is None:
+        return Page(query.yield_per(current_app.config["STREAM_BATCH_SIZE"]), None)
+
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        return Page(rows[:limit], str(rows[limit - 1].id))
+    return Page(rows, None)
+
+
+def page_arguments(streamable: bool = False) -> Tuple[Optional[int], Optional[str]]:
+    """
+    The limit and after query parameters of the current request.
+
+    limit defaults to PAGE_SIZE_DEFAULT and is capped at PAGE_SIZE_MAX. It is None
+    when a streamable endpoint is called with stream=true.
+
+    Args:
+        streamable: Whether the endpoint supports streaming every entity
+
+    Raises:
+        ValueError: If limit isn't a positive integer or after isn't a UUID
+    """
+    after = request.args.get("after") or None
+    if after is not None:
+        UUID(after)
+    if streamable and request.args.get("stream", "false").lower() == "true":
+        return None, after
+
+    limit = request.args.get("limit", default=current_app.config["PAGE_SIZE_DEFAULT"], type=int)
+    if limit is None or limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return min(limit, current_app.config["PAGE_SIZE_MAX"]), after
+
+
+def page_response(page: Page, dump: Callable) -> Response:
+    """JSON list of the dumped entities of a page, with the next cursor header when there is one."""
+    if not isinstance(page.items, list):
+        return Response(stream_with_context(_json_array(page.items, dump)), mimetype="application/json")
+
+    response = jsonify([dump(item) for item in page.items])
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return response
+
+
+def _json_array(rows: Iterable, dump: Callable) -> Iterator[str]:
+    encode = current_app.json.dumps
+    chunk = ["["]
+    size = 1
+    written = 0
+    try:
+        for row in rows:
+            item = encode(dump(row))
+            chunk.append("," + item if written else item)
+            written += 1
+            size += len(item) + 1
+            if size >= STREAM_CHUNK_SIZE:
+                yield "".join(chunk)
+                chunk = []
+                size = 0
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error streaming {request.method} {request.path} after {written} rows: {e}")
+        error = encode({STREAM_ERROR_KEY: str(e)})
+        chunk.append("," + error if written else error)
+    chunk.append("]")
+    yield "".join(chunk)
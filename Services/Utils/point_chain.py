@@ -0,0 +1,63 @@
+"""
+Ordering of points along their Point.next_id links.
+
+The points of a day form one or more singly linked chains. walk_chains() puts them
+in route order in memory, from an ID -> next ID mapping loaded in a single query,
+instead of following Point.next one lazy load per hop.
+"""
+from typing import Dict, Hashable, List, NamedTuple, Optional
+
+
+class PointChains(NamedTuple):
+    """Chains of linked points, each in route order."""
+
+    # Chains starting at a point nothing links to come first, in input order
+    chains: List[List[Hashable]]
+    # Points linking back to a point already walked (a loop or two points sharing a next one)
+    cycles: List[Hashable]
+
+    @property
+    def order(self) -> List[Hashable]:
+        """Every point, chain after chain."""
+        return [point_id for chain in self.chains for point_id in chain]
+
+    @property
+    def broken(self) -> bool:
+        """Whether the points don't form a single chain."""
+        return len(self.chains) > 1 or bool(self.cycles)
+
+
+def walk_chains(links: Dict[Hashable, Optional[Hashable]]) -> PointChains:
+    """
+    Split linked points into chains in route order.
+
+    Links to points outside the mapping end a chain (a route continuing on another
+    day). Points only reachable through a loop start a chain of their own, so every
+    point appears exactly once.
+
+    Args:
+        links: Next point ID of every point ID, None at the end of a route
+
+    Returns:
+        The chains and the points closing a cycle
+    """
+    targets = set(links.values())
+    starts = [point_id for point_id in links if point_id not in targets] + list(links)
+
+    visited = set()
+    chains = []
+    cycles = []
+    for start in starts:
+        if start in visited:
+            continue
+        chain = []
+        current = start
+        while current in links and current not in visited:
+            visited.add(current)
+            chain.append(current)
+            next_id = links[current]
+            if next_id in visited:
+                cycles.append(current)
+            current = next_id
+        chains.append(chain)
+    return PointChains(chains, cycles)
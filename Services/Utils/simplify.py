@@ -0,0 +1,68 @@
+"""
+Simplification of recorded tracks.
+
+Douglas-Peucker over NumPy arrays: a track is reduced to the points that deviate
+from the straight segment between their neighbours by more than a tolerance in
+metres, so a straight leg recorded every few seconds keeps its two ends. The
+coordinates are projected on a local equirectangular plane, accurate enough for
+the extent of a day on the water.
+"""
+import numpy as np
+
+from Services.Utils.geo import EARTH_RADIUS_KM
+
+EARTH_RADIUS_M = EARTH_RADIUS_KM * 1000
+
+
+def simplify_track(latitudes: np.ndarray, longitudes: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Points of a track kept by Douglas-Peucker simplification.
+
+    Args:
+        latitudes: Latitude of each point in degrees, in track order
+        longitudes: Longitude of each point in degrees, in track order
+        tolerance: Largest distance in metres a dropped point may lie from the simplified track
+
+    Returns:
+        Boolean mask of the points to keep; the first and last are always kept
+    """
+    latitudes = np.asarray(latitudes, dtype=float)
+    longitudes = np.asarray(longitudes, dtype=float)
+    count = len(latitudes)
+    keep = np.ones(count, dtype=bool)
+    if count <= 2 or tolerance <= 0:
+        return keep
+
+    x, y = _project(latitudes, longitudes)
+    keep[1:-1] = False
+    stack = [(0, count - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        dx, dy = x[end] - x[start], y[end] - y[start]
+        px, py = x[start + 1:end] - x[start], y[start + 1:end] - y[start]
+        # Distance to the segment, not to the line through its ends, so a track
+        # doubling back on itself keeps its turnaround
+        squared_length = dx * dx + dy * dy
+        if squared_length == 0:
+            along = np.zeros_like(px)
+        else:
+            along = np.clip((px * dx + py * dy) / squared_length, 0.0, 1.0)
+        distances = np.hypot(px - along * dx, py - along * dy)
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            index = start + 1 + farthest
+            keep[index] = True
+            stack.append((start, index))
+            stack.append((index, end))
+    return keep
+
+
+def _project(latitudes: np.ndarray, longitudes: np.ndarray):
+    """Metres east and north of the track's mean position."""
+    origin_latitude = np.radians(latitudes.mean())
+    origin_longitude = longitudes.mean()
+    x = EARTH_RADIUS_M * np.radians(longitudes - origin_longitude) * np.cos(origin_latitude)
+    y = EARTH_RADIUS_M * np.radians(latitudes - latitudes.mean())
+    return x, y
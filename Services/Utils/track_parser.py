@@ -0,0 +1,112 @@
+"""
+Parsers of recorded tracks uploaded as GPX or GeoJSON.
+
+Both yield the positions of a track in recording order as (latitude, longitude,
+note) tuples. GPX is parsed incrementally, each track point being released once
+read, so large uploads aren't held in memory as a tree.
+"""
+import json
+import xml.etree.ElementTree as ElementTree
+from typing import IO, Iterator, Optional, Tuple
+
+TrackPoint = Tuple[float, float, Optional[str]]
+
+TRACK_FORMATS = {".gpx": "gpx", ".geojson": "geojson", ".json": "geojson"}
+
+
+def track_format(filename: Optional[str], requested: Optional[str] = None) -> str:
+    """
+    Format of an uploaded track.
+
+    Args:
+        filename: Name of the uploaded file
+        requested: Format given explicitly ('gpx' or 'geojson'), takes precedence
+
+    Raises:
+        ValueError: If the format is neither given nor recognised from the extension
+    """
+    if requested:
+        if requested.lower() not in TRACK_FORMATS.values():
+            raise ValueError(f"Unsupported track format {requested}")
+        return requested.lower()
+    for extension, name in TRACK_FORMATS.items():
+        if filename and filename.lower().endswith(extension):
+            return name
+    raise ValueError("Track format must be gpx or geojson")
+
+
+def parse_track(stream: IO[bytes], format: str) -> Iterator[TrackPoint]:
+    """Positions of a GPX or GeoJSON track, in order."""
+    return parse_gpx(stream) if format == "gpx" else parse_geojson(stream)
+
+
+def parse_gpx(stream: IO[bytes]) -> Iterator[TrackPoint]:
+    """
+    Track and route points of a GPX document, in order.
+
+    Raises:
+        ValueError: If the document is malformed or a coordinate is invalid
+    """
+    try:
+        for _, element in ElementTree.iterparse(stream, events=("end",)):
+            tag = element.tag.rsplit("}", 1)[-1]
+            if tag not in ("trkpt", "rtept"):
+                continue
+            note = None
+            for child in element:
+                if child.tag.rsplit("}", 1)[-1] in ("name", "time") and child.text:
+                    note = child.text.strip()
+                    break
+            yield _checked(element.get("lat"), element.get("lon"), note)
+            element.clear()
+    except ElementTree.ParseError as e:
+        raise ValueError(f"Invalid GPX document: {e}") from e
+
+
+def parse_geojson(stream: IO[bytes]) -> Iterator[TrackPoint]:
+    """
+    Positions of the LineString, MultiLineString and Point geometries of a GeoJSON document, in order.
+
+    Raises:
+        ValueError: If the document is malformed or a coordinate is invalid
+    """
+    try:
+        document = json.load(stream)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid GeoJSON document: {e}") from e
+
+    if document.get("type") == "FeatureCollection":
+        features = document.get("features") or []
+    elif document.get("type") == "Feature":
+        features = [document]
+    else:
+        features = [{"geometry": document, "properties": {}}]
+
+    for feature in features:
+        geometry = feature.get("geometry") or {}
+        name = (feature.get("properties") or {}).get("name")
+        kind = geometry.get("type")
+        if kind == "Point":
+            lines = [[geometry.get("coordinates")]]
+        elif kind == "LineString":
+            lines = [geometry.get("coordinates") or []]
+        elif kind == "MultiLineString":
+            lines = geometry.get("coordinates") or []
+        else:
+            continue
+        for line in lines:
+            for position in line:
+                if not isinstance(position, list) or len(position) < 2:
+                    raise ValueError(f"Invalid GeoJSON position {position}")
+                # GeoJSON positions are [longitude, latitude, ...]
+                yield _checked(position[1], position[0], name)
+
+
+def _checked(latitude, longitude, note: Optional[str]) -> TrackPoint:
+    try:
+        latitude, longitude = float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid coordinate ({latitude}, {longitude})")
+    if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+        raise ValueError(f"Coordinate ({latitude}, {longitude}) out of range")
+    return latitude, longitude, note
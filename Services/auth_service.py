@@ -7,6 +7,7 @@ from sqlalchemy.exc import NoResultFound, IntegrityError
 from Models.user import User
 from Api.database import db
 from Schemas.user_schema import UserSchema
+from Schemas.registry import get_schema
 
 logger = logging.getLogger(__name__)
 
@@ -60,7 +61,11 @@ class AuthService:
         if existing:
             raise IntegrityError(statement="User already present", params=None, orig=Exception())
 
-        user = UserSchema().load(user_json)
+        user = get_schema(UserSchema).load(user_json)
+        # Registered users can sign in right away, authenticated requests require active users.
+        # Admin rights are never granted through registration, whatever the payload says
+        user.active = True
+        user.admin = False
         db.session.add(user)
         db.session.commit()
 
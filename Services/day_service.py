@@ -7,7 +7,9 @@ from Models.itinerary import Itinerary
 from Models.sea import Sea
 from Models.weather import Weather
 from Api.database import db
-from sqlalchemy.orm import selectinload
+from Services.point_service import PointService
+from Services.route_service import RouteService
+from Services.Utils.loader_profiles import loader_options
 from sqlalchemy.exc import NoResultFound, IntegrityError
 from datetime import date, time
 import logging
@@ -31,12 +33,7 @@ class DayService:
         """
         day = (
             db.session.query(Day)
-            .options(
-                selectinload(Day.sea),
-                selectinload(Sea.sea_states),
-                selectinload(Day.weather),
-                selectinload(Weather.weather_states),
-            )
+            .options(*loader_options("day_full"))
             .filter_by(id=UUID(day_id))
             .first()
         )
@@ -58,6 +55,7 @@ class DayService:
         """
         days = (
             db.session.query(Day)
+            .options(*loader_options("day_full"))
             .join(Itinerary, Day.itinerary_id == Itinerary.id)
             .filter(Itinerary.id == UUID(itinerary_id))
             .all()
@@ -74,7 +72,12 @@ class DayService:
         Returns:
             List of days
         """
-        days = db.session.query(Day).filter(Day.id.in_([UUID(day_id) for day_id in day_ids])).all()
+        days = (
+            db.session.query(Day)
+            .options(*loader_options("day_full"))
+            .filter(Day.id.in_([UUID(day_id) for day_id in day_ids]))
+            .all()
+        )
         return days
 
     @staticmethod
@@ -262,6 +265,12 @@ class DayService:
         if not day_to_delete:
             raise NoResultFound(f"Day with id {day_id} not found")
 
+        itinerary_id = day_to_delete.itinerary_id
+        cells = PointService.delete_points_of_days([day_to_delete.id])
         db.session.delete(day_to_delete)
+        db.session.flush()
+        RouteService.refresh_itinerary_miles([itinerary_id])
         db.session.commit()
+        PointService.invalidate_poi_tiles(cells)
+        RouteService.invalidate_days([UUID(day_id)])
         logger.info(f"Day with id {day_id} successfully deleted")
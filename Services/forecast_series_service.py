@@ -0,0 +1,146 @@
+"""
+Columnar storage of the forecasts of a day.
+
+With FORECAST_STORAGE set to 'series', the weather and marine services store one
+ForecastSeries row per day and variable, packing the hourly values as a float32
+array, instead of one WeatherState/SeaState row per hour. Weather.states and
+Sea.states expand the series back into states for the dumps, so clients see the
+same payload in both modes.
+
+migrate_states() moves the forecasts already stored as rows into series.
+"""
+from datetime import time
+from typing import Any, Dict, Sequence
+from uuid import UUID
+import logging
+
+import numpy as np
+from flask import current_app, has_app_context
+from sqlalchemy import delete, insert
+
+from Api.database import db
+from Models.forecast_series import ForecastSeries
+from Models.sea_state import SeaState
+from Models.weather_state import WeatherState
+
+logger = logging.getLogger(__name__)
+
+# Hourly series starting at local midnight
+SERIES_START = time(0)
+SERIES_INTERVAL = 3600
+STEPS_PER_DAY = 24
+
+# State model and value columns stored for each source
+STATE_COLUMNS = {
+    "weather": (WeatherState, ["temperature", "precipitation", "wind_direction", "wind_force", "cloud"]),
+    "marine": (SeaState, ["wave_height", "wave_direction", "swell_direction", "swell_period"]),
+}
+
+
+class ForecastSeriesService:
+
+    @staticmethod
+    def enabled() -> bool:
+        """Whether forecasts are stored as series rather than state rows."""
+        return has_app_context() and current_app.config.get("FORECAST_STORAGE") == "series"
+
+    @staticmethod
+    def replace(source: str, day_ids: Sequence[UUID], columns: Dict[str, np.ndarray]) -> None:
+        """
+        Replace the series of a source for several days, without committing.
+
+        Args:
+            source: 'weather' or 'marine'
+            day_ids: IDs of the days, in the row order of the arrays
+            columns: Arrays of shape (days, 24) keyed by variable
+        """
+        db.session.execute(
+            delete(ForecastSeries).where(ForecastSeries.source == source, ForecastSeries.day_id.in_(day_ids))
+        )
+        rows = [
+            {
+                "day_id": day_id,
+                "source": source,
+                "variable": variable,
+                "start": SERIES_START,
+                "interval_seconds": SERIES_INTERVAL,
+                "values": ForecastSeries.pack(matrix[index]),
+            }
+            for variable, matrix in columns.items()
+            for index, day_id in enumerate(day_ids)
+        ]
+        if rows:
+            db.session.execute(insert(ForecastSeries), rows)
+
+    @staticmethod
+    def get_series(day_id: str, source: str) -> Dict[str, np.ndarray]:
+        """
+        Stored series of a day.
+
+        Args:
+            day_id: The ID of the day
+            source: 'weather' or 'marine'
+
+        Returns:
+            float32 array of each variable, empty if none is stored
+        """
+        series = db.session.query(ForecastSeries).filter_by(day_id=UUID(day_id), source=source).all()
+        return {row.variable: ForecastSeries.unpack(row.values) for row in series}
+
+    @staticmethod
+    def migrate_states(source: str, batch_size: int = 500) -> int:
+        """
+        Move the forecasts stored as state rows of a source into series.
+
+        Days are converted batch_size at a time, each batch in its own transaction:
+        their states are placed by hour, the series written and the rows deleted.
+
+        Args:
+            source: 'weather' or 'marine'
+            batch_size: Days converted per transaction
+
+        Returns:
+            Number of days converted
+        """
+        model, columns = STATE_COLUMNS[source]
+        day_ids = [row.day_id for row in db.session.query(model.day_id).distinct().order_by(model.day_id)]
+
+        for start in range(0, len(day_ids), batch_size):
+            batch = day_ids[start:start + batch_size]
+            matrices = {column: np.full((len(batch), STEPS_PER_DAY), np.nan) for column in columns}
+            rows = {day_id: index for index, day_id in enumerate(batch)}
+            for state in db.session.query(model).filter(model.day_id.in_(batch)):
+                for column in columns:
+                    matrices[column][rows[state.day_id], state.time.hour] = _state_value(getattr(state, column))
+
+            try:
+                ForecastSeriesService.replace(source, batch, matrices)
+                db.session.execute(delete(model).where(model.day_id.in_(batch)))
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Error migrating {source} states of days {batch}: {str(e)}")
+                raise
+
+        logger.info(f"Migrated {source} states of {len(day_ids)} days to series")
+        return len(day_ids)
+
+
+def _state_value(value: Any) -> float:
+    """Numeric value of a state column, cloud descriptions like '40%' included."""
+    if value is None:
+        return np.nan
+    try:
+        return float(str(value).rstrip("%"))
+    except ValueError:
+        return np.nan
+
+
+def register_forecast_storage_commands(app) -> None:
+    """Add the `flask migrate-forecast-storage` command moving stored states into series."""
+
+    @app.cli.command("migrate-forecast-storage")
+    def migrate_forecast_storage():
+        """Move the weather and sea states stored as rows into series."""
+        for source in STATE_COLUMNS:
+            print(f"Migrated the {source} states of {ForecastSeriesService.migrate_states(source)} days")
@@ -10,6 +10,7 @@ from Models.image import Image
 from Models.point import Point
 from Models.point_has_image import PointHasImage
 from Schemas.image_schema import ImageSchema
+from Schemas.registry import get_schema
 from Api.database import db
 
 logger = logging.getLogger(__name__)
@@ -76,7 +77,7 @@ class ImageService:
             IntegrityError: If database constraints are violated
         """
         logger.info("Creating new image")
-        image = cast(Image, ImageSchema().load(image_data))
+        image = cast(Image, get_schema(ImageSchema).load(image_data))
         db.session.add(image)
         db.session.commit()
 
@@ -107,7 +108,7 @@ class ImageService:
             raise NoResultFound(f"Image with id {id} not found")
         logger.info(f"Updating image {id}")
 
-        updated_image = ImageSchema().load(image_data)
+        updated_image = get_schema(ImageSchema).load(image_data)
 
         try:
             merged_image = cast(Image, db.session.merge(updated_image))
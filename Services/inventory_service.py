@@ -3,17 +3,18 @@ Inventory Service - Business logic for inventory operations.
 """
 
 import logging
-from typing import List, Optional, cast
+from typing import Optional, cast
 from uuid import UUID
 from flask import g
 from sqlalchemy.exc import NoResultFound, IntegrityError
 
 from Models.inventory import Inventory
 from Models.item import Item
-from Models.user import User
 from Schemas.inventory_schema import InventorySchema
 from Api.database import db
+from Services.Utils.pagination import Page, paginate
 from Schemas.item_schema import ItemSchema
+from Schemas.registry import get_schema
 
 logger = logging.getLogger(__name__)
 
@@ -42,27 +43,25 @@ class InventoryService:
         return inventory
 
     @staticmethod
-    def get_inventories_by_user(user_id: str) -> List[Inventory]:
+    def get_inventories_by_user(user_id: str, limit: Optional[int] = 50, after: Optional[str] = None) -> Page:
         """
-        Retrieve all inventories for a user.
+        Retrieve one page of a user's inventories, oldest first.
 
         Args:
             user_id: The ID of the user
+            limit: Largest number of inventories returned, None to stream them all
+            after: Cursor of the page, as returned with the previous one
 
         Returns:
-            List of Inventory objects
-
-        Raises:
-            NoResultFound: If no inventories exist
+            The page of Inventory objects and the cursor of the next page
         """
-        inventories = (
-            db.session.query(Inventory)
-            .join(User)
-            .filter(Inventory.user_id == User.id, User.id == UUID(user_id))
-            .all()
-        )
-        logger.info(f"Found {len(inventories)} inventories for user {user_id}")
-        return inventories
+        query = db.session.query(Inventory).filter(Inventory.user_id == UUID(user_id))
+        page = paginate(query, Inventory.id, limit, after)
+        if isinstance(page.items, list):
+            logger.info(f"Found {len(page.items)} inventories for user {user_id}")
+        else:
+            logger.info(f"Streaming the inventories of user {user_id}")
+        return page
 
     @staticmethod
     def create_inventory(inventory_data: dict) -> Inventory:
@@ -85,7 +84,7 @@ class InventoryService:
         if (items := inventory_data.get("items", None)) is not None:
             for item in items:
                 item.setdefault("user_id", user_id)
-        inventory = cast(Inventory, InventorySchema().load(inventory_data))
+        inventory = cast(Inventory, get_schema(InventorySchema).load(inventory_data))
 
         db.session.add(inventory)
         db.session.commit()
@@ -126,7 +125,7 @@ class InventoryService:
                         item_dict.setdefault('user_id', user_id)
             inventory_data.setdefault("user_id", user_id)
 
-            updated_inventory = InventorySchema().load(inventory_data)
+            updated_inventory = get_schema(InventorySchema).load(inventory_data)
 
             merged_inventory = cast(Inventory, db.session.merge(updated_inventory))
             db.session.commit()
@@ -9,6 +9,7 @@ from sqlalchemy.exc import NoResultFound, IntegrityError
 
 from Models.item import Item
 from Schemas.item_schema import ItemSchema
+from Schemas.registry import get_schema
 from Api.database import db
 
 logger = logging.getLogger(__name__)
@@ -53,7 +54,7 @@ class ItemService:
             IntegrityError: If database constraints are violated
         """
         logger.info("Creating new item")
-        item = cast(Item, ItemSchema().load(item_data))
+        item = cast(Item, get_schema(ItemSchema).load(item_data))
         db.session.add(item)
         db.session.commit()
 
@@ -86,7 +87,7 @@ class ItemService:
         logger.info(f"Updating item {item_id}")
         user_id = g.current_user_id
         item_data.setdefault("user_id", user_id)
-        updated_item = cast(Item, ItemSchema().load(item_data))
+        updated_item = cast(Item, get_schema(ItemSchema).load(item_data))
 
         try:
             merged_item = db.session.merge(updated_item)
@@ -2,15 +2,24 @@
 Itinerary Service - Business logic for itinerary operations.
 """
 import logging
-from typing import List, Optional, cast
+from typing import Dict, List, Optional, Tuple, cast
 from uuid import UUID
 from sqlalchemy.exc import NoResultFound, IntegrityError
 from sqlalchemy.orm import selectinload
 from Models.user_has_itinerary import user_has_itinerary
+from Models.day import Day
 from Models.itinerary import Itinerary
+from Models.point import Point
 from Models.user import User
 from Schemas.itinerary_shema import ItinerarySchema
+from Schemas.sea_schema import SeaSchema
+from Schemas.weather_schema import WeatherSchema
+from Schemas.registry import get_schema
 from Api.database import db
+from Services.point_service import PointService
+from Services.route_service import RouteService
+from Services.Utils.loader_profiles import loader_options
+from Services.Utils.pagination import Page, paginate
 
 logger = logging.getLogger(__name__)
 
@@ -19,12 +28,13 @@ class ItineraryService:
     """Service class for Itinerary-related business logic."""
 
     @staticmethod
-    def get_itinerary_by_id(itinerary_id: str) -> Itinerary:
+    def get_itinerary_by_id(itinerary_id: str, profile: Optional[str] = None) -> Itinerary:
         """
         Retrieve an itinerary by its public ID.
 
         Args:
             itinerary_id: The public ID of the itinerary to retrieve
+            profile: Optional loader profile eager loading the itinerary's relationships
 
         Returns:
             Itinerary object if found
@@ -32,30 +42,42 @@ class ItineraryService:
         Raises:
             NoResultFound: If itinerary doesn't exist
         """
-        itinerary = db.session.query(Itinerary).options(selectinload(Itinerary.days)).filter_by(id=UUID(itinerary_id)).first()
+        options = loader_options(profile) if profile else [selectinload(Itinerary.days)]
+        itinerary = db.session.query(Itinerary).options(*options).filter_by(id=UUID(itinerary_id)).first()
         if not itinerary:
             logger.warning(f"Itinerary with id {itinerary_id} not found")
             raise NoResultFound(f"Itinerary {itinerary_id} not found in database")
         return itinerary
 
     @staticmethod
-    def get_itineraries_by_user(user_id: str) -> List[Itinerary]:
+    def get_itineraries_by_user(
+        user_id: str, profile: Optional[str] = None, limit: Optional[int] = 50, after: Optional[str] = None
+    ) -> Page:
         """
-        Retrieve all itineraries for a user.
+        Retrieve one page of a user's itineraries, oldest first.
 
         Args:
             user_id: The ID of the user
+            profile: Optional loader profile eager loading the itineraries' relationships
+            limit: Largest number of itineraries returned, None to stream them all
+            after: Cursor of the page, as returned with the previous one
 
         Returns:
-            List of Itinerary objects
+            The page of Itinerary objects and the cursor of the next page
         """
-        user = db.session.query(User).options(selectinload(User.itineraries)).filter_by(id=UUID(user_id)).first()
-        if not user:
+        if db.session.get(User, UUID(user_id)) is None:
             raise NoResultFound(f"User with id {user_id} not found in db")
-        
-        logger.info(f"Found {len(user.itineraries)} itineraries for user {user_id}")
 
-        return user.itineraries
+        query = db.session.query(Itinerary).select_from(User).join(User.itineraries).filter(User.id == UUID(user_id))
+        if profile:
+            query = query.options(*loader_options(profile))
+        page = paginate(query, Itinerary.id, limit, after)
+        if isinstance(page.items, list):
+            logger.info(f"Found {len(page.items)} itineraries for user {user_id}")
+        else:
+            logger.info(f"Streaming the itineraries of user {user_id}")
+
+        return page
 
     @staticmethod
     def create_itinerary(itinerary_data: dict) -> Itinerary:
@@ -73,8 +95,11 @@ class ItineraryService:
             IntegrityError: If database constraints are violated
         """
         logger.info("Creating new itinerary")
-        itinerary = cast(Itinerary, ItinerarySchema().load(itinerary_data))
+        itinerary = cast(Itinerary, get_schema(ItinerarySchema).load(itinerary_data))
         db.session.add(itinerary)
+        db.session.flush()
+        # The distance is computed from the days' points, not taken from the client
+        RouteService.update_itinerary_miles(itinerary)
         db.session.commit()
 
         db.session.refresh(itinerary)
@@ -98,8 +123,13 @@ class ItineraryService:
             NoResultFound: If itinerary doesn't exist
             IntegrityError: If database constraints are violated
         """
-        # Verify itinerary exists
-        existing_itinerary = ItineraryService.get_itinerary_by_id(id)
+        # Verify itinerary exists, loading everything the diff compares in one go
+        existing_itinerary = (
+            db.session.query(Itinerary)
+            .options(*loader_options("itinerary_full"))
+            .filter_by(id=UUID(id))
+            .first()
+        )
         
         if not existing_itinerary:
             raise NoResultFound(f"Itinerary with id {id} not found")
@@ -108,36 +138,199 @@ class ItineraryService:
 
         try:
             # Load and validate the new data (schema will resolve id to db id)
-            updated_itinerary = cast(Itinerary, ItinerarySchema().load(itinerary_data))
+            updated_itinerary = cast(Itinerary, get_schema(ItinerarySchema).load(itinerary_data))
 
             # Update scalar fields
+            was_public = bool(existing_itinerary.is_public)
             existing_itinerary.is_public = updated_itinerary.is_public
-            existing_itinerary.total_miles = updated_itinerary.total_miles
             existing_itinerary.expected_total_miles = updated_itinerary.expected_total_miles
-            
-            # Delete old days and expunge them from session to avoid conflicts
-            for day in list(existing_itinerary.days):
-                db.session.delete(day)
+
+            day_ids = [day.id for day in existing_itinerary.days]
+            cells = ItineraryService._sync_days(existing_itinerary, updated_itinerary.days or [])
             db.session.flush()
-            
-           # Add new days
-            logger.info(f"Adding {len(updated_itinerary.days)} new days")
-            for day in updated_itinerary.days:
-                logger.info(f"Adding day {day.day_number} with date {day.date}")
-                day.itinerary_id = existing_itinerary.id
-                existing_itinerary.days.append(day)
+
+            # The distance is computed from the days' points, not taken from the client
+            RouteService.invalidate_days(day.id for day in existing_itinerary.days)
+            RouteService.update_itinerary_miles(existing_itinerary)
             
             db.session.commit()
             db.session.refresh(existing_itinerary)
+            PointService.invalidate_poi_tiles(cells)
+            RouteService.invalidate_days(day_ids)
+
+            if was_public != bool(existing_itinerary.is_public):
+                # Cached POI entries carry the visibility of their itinerary
+                PointService.invalidate_poi_tiles(
+                    point.geocell for day in existing_itinerary.days for point in day.points or []
+                )
 
             logger.info(f"Itinerary {id} updated successfully")
             return existing_itinerary
 
         except IntegrityError as e:
+            RouteService.invalidate_days(day.id for day in existing_itinerary.days)
             db.session.rollback()
             logger.error(f"Integrity error updating itinerary {id}: {e}")
             raise
 
+    @staticmethod
+    def _sync_days(itinerary: Itinerary, incoming_days: List[Day]) -> List[Optional[str]]:
+        """
+        Apply the difference between the stored days of an itinerary and the incoming ones.
+
+        Days are matched on their (day_number, date) key, the itinerary being fixed;
+        an incoming day whose key matches no stored day is matched by id instead, so
+        a day can be moved to another date. Matched days are updated only where their
+        points, weather or sea differ, unmatched incoming days are inserted and stored
+        days missing from the payload are deleted along with their points.
+
+        Args:
+            itinerary: The persistent itinerary being updated
+            incoming_days: Transient days loaded from the payload
+
+        Returns:
+            Geohash cells of the points of the deleted days, to invalidate once committed
+        """
+        stored_by_key: Dict[Tuple[int, object], Day] = {
+            (day.day_number, day.date): day for day in itinerary.days
+        }
+        matches: List[Tuple[Day, Day]] = []
+        inserts: List[Day] = []
+        unmatched: List[Day] = []
+
+        for incoming in incoming_days:
+            stored = stored_by_key.pop((incoming.day_number, incoming.date), None)
+            if stored is not None:
+                matches.append((stored, incoming))
+            else:
+                unmatched.append(incoming)
+
+        stored_by_id = {day.id: day for day in stored_by_key.values()}
+        for incoming in unmatched:
+            stored = stored_by_id.pop(incoming.id, None) if incoming.id else None
+            if stored is not None:
+                matches.append((stored, incoming))
+            else:
+                inserts.append(incoming)
+
+        # Delete first so that the freed keys can be reused by the days that follow
+        cells = PointService.delete_points_of_days(stored_by_id)
+        with db.session.no_autoflush:
+            for day in stored_by_id.values():
+                db.session.delete(day)
+                itinerary.days.remove(day)
+        db.session.flush()
+
+        updated = 0
+        for stored, incoming in matches:
+            if ItineraryService._sync_day(stored, incoming):
+                updated += 1
+
+        for day in inserts:
+            day.itinerary_id = itinerary.id
+            itinerary.days.append(day)
+
+        logger.info(
+            f"Itinerary {itinerary.id} days: {len(inserts)} inserted, {updated} updated, "
+            f"{len(stored_by_id)} deleted, {len(matches) - updated} unchanged"
+        )
+        return cells
+
+    @staticmethod
+    def _sync_day(stored: Day, incoming: Day) -> bool:
+        """
+        Update a stored day in place from its incoming version.
+
+        Returns:
+            True if anything about the day changed
+        """
+        changed = False
+        if stored.day_number != incoming.day_number or stored.date != incoming.date:
+            stored.day_number = incoming.day_number
+            stored.date = incoming.date
+            changed = True
+
+        changed |= ItineraryService._sync_points(stored, incoming.points or [])
+
+        weather_schema = get_schema(WeatherSchema, exclude=("day_id",))
+        if ItineraryService._dump_or_none(weather_schema, stored.weather) != ItineraryService._dump_or_none(weather_schema, incoming.weather):
+            ItineraryService._replace_child(stored, "weather", incoming.weather)
+            changed = True
+
+        sea_schema = get_schema(SeaSchema, exclude=("day_id",))
+        if ItineraryService._dump_or_none(sea_schema, stored.sea) != ItineraryService._dump_or_none(sea_schema, incoming.sea):
+            ItineraryService._replace_child(stored, "sea", incoming.sea)
+            changed = True
+
+        return changed
+
+    @staticmethod
+    def _sync_points(day: Day, incoming_points: List[Point]) -> bool:
+        """
+        Reconcile the points of a day with the incoming ones.
+
+        Incoming points carrying the id of a point of the day update it in place,
+        the others are added; points of the day missing from the payload are detached
+        from it, as happened when the whole day was replaced.
+
+        Returns:
+            True if the points of the day changed
+        """
+        stored_points = list(day.points or [])
+        if len(stored_points) == len(incoming_points) and all(
+            ItineraryService._point_signature(stored) == ItineraryService._point_signature(incoming)
+            and incoming.id in (None, stored.id)
+            for stored, incoming in zip(stored_points, incoming_points)
+        ):
+            return False
+
+        affected_cells = [point.geocell for point in stored_points]
+        stored_by_id = {point.id: point for point in stored_points}
+        points = []
+        for incoming in incoming_points:
+            stored = stored_by_id.pop(incoming.id, None) if incoming.id else None
+            if stored is not None:
+                stored.type = incoming.type
+                stored.latitude = incoming.latitude
+                stored.longitude = incoming.longitude
+                stored.notes = incoming.notes
+                points.append(stored)
+            else:
+                incoming.day_id = day.id
+                points.append(incoming)
+
+        day.points = points
+        db.session.flush()
+
+        PointService.invalidate_poi_tiles(affected_cells + [point.geocell for point in points])
+        return True
+
+    @staticmethod
+    def _point_signature(point: Point) -> tuple:
+        """Fields of a point compared to detect changes."""
+        return (
+            point.type,
+            float(point.latitude) if point.latitude is not None else None,
+            float(point.longitude) if point.longitude is not None else None,
+            point.notes,
+        )
+
+    @staticmethod
+    def _dump_or_none(schema, value) -> Optional[dict]:
+        return schema.dump(value) if value is not None else None
+
+    @staticmethod
+    def _replace_child(day: Day, attribute: str, value) -> None:
+        """Replace the weather or sea of a day, removing the old row first as both are keyed by day_id."""
+        previous = getattr(day, attribute)
+        if previous is not None:
+            setattr(day, attribute, None)
+            db.session.delete(previous)
+            db.session.flush()
+        if value is not None:
+            value.day_id = day.id
+            setattr(day, attribute, value)
+
     @staticmethod
     def delete_itinerary(id: str) -> None:
         """
@@ -154,8 +347,12 @@ class ItineraryService:
 
         try:
             logger.info(f"Deleting itinerary {id}")
+            day_ids = [day.id for day in itinerary.days]
+            cells = PointService.delete_points_of_days(day_ids)
             db.session.delete(itinerary)
             db.session.commit()
+            PointService.invalidate_poi_tiles(cells)
+            RouteService.invalidate_days(day_ids)
             logger.info(f"Itinerary {id} deleted successfully")
 
         except IntegrityError as e:
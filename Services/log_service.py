@@ -2,7 +2,7 @@
 Log Service - Business logic for log operations.
 """
 import logging
-from typing import List, cast
+from typing import List, Optional, cast
 from uuid import UUID
 from camel_converter import dict_to_snake
 from flask import g
@@ -12,7 +12,9 @@ from sqlalchemy.orm import selectinload
 from Models.log import Log
 from Models.user import User
 from Schemas.log_schema import LogSchema
+from Schemas.registry import get_schema
 from Api.database import db
+from Services.Utils.pagination import Page, paginate
 
 logger = logging.getLogger(__name__)
 
@@ -41,21 +43,26 @@ class LogService:
         return log
 
     @staticmethod
-    def get_logs_by_user(user_id: str) -> List[Log]:
+    def get_logs_by_user(user_id: str, limit: Optional[int] = 50, after: Optional[str] = None) -> Page:
         """
-        Retrieve all logs created by a user.
+        Retrieve one page of the logs created by a user, oldest first.
 
         Args:
             user_id: The ID of the user
+            limit: Largest number of logs returned, None to stream them all
+            after: Cursor of the page, as returned with the previous one
 
         Returns:
-            List of Log objects
+            The page of Log objects and the cursor of the next page
         """
-        user = db.session.query(User).options(selectinload(User.logs)).filter_by(id=UUID(user_id)).first()
-        if not user:
+        if db.session.get(User, UUID(user_id)) is None:
             raise NoResultFound(f"User with id {user_id} not found in db")
-        logger.info(f"Found {len(user.logs)} logs for user {user_id}")
-        return user.logs
+        page = paginate(db.session.query(Log).filter(Log.user_id == UUID(user_id)), Log.id, limit, after)
+        if isinstance(page.items, list):
+            logger.info(f"Found {len(page.items)} logs for user {user_id}")
+        else:
+            logger.info(f"Streaming the logs of user {user_id}")
+        return page
 
     @staticmethod
     def create_log(log_data: dict) -> Log:
@@ -74,7 +81,7 @@ class LogService:
         """
         logger.info("Creating new log")
         log_data.setdefault("user_id", g.current_user_id)
-        log = cast(Log, LogSchema().load(log_data))
+        log = cast(Log, get_schema(LogSchema).load(log_data))
         db.session.add(log)
         db.session.commit()
 
@@ -107,7 +114,7 @@ class LogService:
         log_data = dict_to_snake(log_data)
         log_data.setdefault("user_id", existing_log.user_id)
         
-        updated_log = LogSchema().load(log_data)
+        updated_log = get_schema(LogSchema).load(log_data)
 
         try:
             merged_log = cast(Log, db.session.merge(updated_log))
@@ -3,20 +3,42 @@ Point Service - Business logic for point operations.
 """
 import logging
 from sqlite3 import IntegrityError
-from typing import List, Optional, cast
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, cast
 from uuid import UUID
 from camel_converter import dict_to_snake
+import numpy as np
+import uuid_extension
+from sqlalchemy import and_, insert, or_, update
 from sqlalchemy.exc import NoResultFound
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import lazyload, selectinload
 
 from Models.day import Day
 from Models.itinerary import Itinerary
-from Models.point import Point
+from Models.point import Point, PointType
+from Schemas.fast_dump import Dumper, get_dumper
 from Schemas.point_schema import PointSchema
+from Schemas.registry import get_schema
 from Api.database import db
+from Services.route_service import RouteService
+from Services.trip_service import TripService
+from Services.Utils.cache import LRUCache
+from Services.Utils.geo import bounding_box, cells_in_box, covering_cells, encode_geohash, haversine_km
+from Services.Utils.point_chain import walk_chains
+from Services.Utils.simplify import simplify_track
+from Services.Utils.track_parser import TrackPoint
 
 logger = logging.getLogger(__name__)
 
+# POI lists are cached per geohash tile of this precision (~4.9km x 4.9km)
+POI_TILE_PRECISION = 5
+# Lookups spanning more tiles than this bypass the cache
+POI_MAX_TILES = 64
+
+# Keyed by (tile, point type value or None for every type but positions), holds
+# (latitude, longitude, trip id, public, dump) tuples of the points of every trip;
+# visibility is checked per caller when reading them
+poi_tile_cache = LRUCache(maxsize=2048, ttl=300)
+
 
 class PointService:
     """Service class for Point-related business logic."""
@@ -87,15 +109,114 @@ class PointService:
             IntegrityError: If database constraints are violated
         """
         logger.info(f"Creating new point")
-        point: Point = cast(Point, PointSchema().load(point_data))
+        point: Point = cast(Point, get_schema(PointSchema).load(point_data))
         db.session.add(point)
+        db.session.flush()
+        RouteService.refresh_total_miles([point.day_id])
         db.session.commit()
         
         # Refresh to get relationships
         db.session.refresh(point)
+        PointService.invalidate_poi_tiles([point.geocell])
+        RouteService.invalidate_days([point.day_id])
         logger.info(f"Point {point.id} created successfully")
         return point
     
+    @staticmethod
+    def import_track(
+        day_id: str,
+        track: Iterable[TrackPoint],
+        batch_size: int = 1000,
+        max_points: Optional[int] = None,
+        tolerance: float = 0,
+        day_max_points: Optional[int] = None,
+    ) -> Tuple[int, int]:
+        """
+        Add the positions of a recorded track to a day as linked position points.
+
+        Points are inserted batch_size at a time without going through the ORM unit
+        of work, each one linked to the next in recording order, and committed once.
+        Within a batch rows are inserted last first so every next_id refers to a row
+        already present; the previous batch's last point is then linked to the new batch.
+        The track is appended to the day's route: its first point is linked from the
+        last point of the day's existing chain.
+        The track is simplified as a whole before it is split into batches, so the
+        points stored don't depend on batch_size.
+
+        Args:
+            day_id: The ID of the day
+            track: (latitude, longitude, note) of each position, in order
+            batch_size: Points per INSERT statement
+            max_points: Largest number of points accepted, unlimited if None
+            tolerance: Simplification tolerance in metres, 0 to store every position
+            day_max_points: Largest number of points the day may hold afterwards, unlimited if None
+
+        Returns:
+            Tuple of (positions received, points stored)
+
+        Raises:
+            ValueError: If the track is invalid, empty or too long, or the day would hold too many points
+        """
+        day_uuid = UUID(day_id)
+        positions: List[TrackPoint] = []
+        for position in track:
+            positions.append(position)
+            if max_points is not None and len(positions) > max_points:
+                raise ValueError(f"Tracks are limited to {max_points} points")
+        if not positions:
+            raise ValueError("The track has no points")
+
+        count = len(positions)
+        if tolerance > 0:
+            coordinates = np.array([(latitude, longitude) for latitude, longitude, _ in positions])
+            keep = simplify_track(coordinates[:, 0], coordinates[:, 1], tolerance)
+            positions = [position for position, kept in zip(positions, keep) if kept]
+        stored = len(positions)
+        links = {row.id: row.next_id for row in db.session.query(Point.id, Point.next_id).filter(Point.day_id == day_uuid).order_by(Point.id)}
+        if day_max_points is not None and len(links) + stored > day_max_points:
+            raise ValueError(
+                f"A day cannot have more than {day_max_points} points: it has {len(links)} and the track adds {stored}"
+            )
+
+        # The tail of the day's route, linked to the first imported point
+        order = walk_chains(links).order
+        previous_last = order[-1] if order and links[order[-1]] is None else None
+        cells: Set[str] = set()
+
+        try:
+            for batch in _batches(positions, batch_size):
+                ids = [uuid_extension.uuid7() for _ in batch]
+                rows = []
+                for index, (latitude, longitude, note) in enumerate(batch):
+                    geocell = encode_geohash(latitude, longitude)
+                    cells.add(geocell)
+                    rows.append({
+                        "id": ids[index],
+                        "day_id": day_uuid,
+                        "latitude": latitude,
+                        "longitude": longitude,
+                        "geocell": geocell,
+                        "notes": note,
+                        "type": PointType.POSITION,
+                        "next_id": ids[index + 1] if index + 1 < len(ids) else None,
+                    })
+                db.session.execute(insert(Point), rows[::-1])
+                if previous_last is not None:
+                    db.session.execute(update(Point).where(Point.id == previous_last).values(next_id=ids[0]))
+                previous_last = ids[-1]
+
+            db.session.flush()
+            RouteService.refresh_total_miles([day_uuid])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        PointService.invalidate_poi_tiles(cells)
+        RouteService.invalidate_days([day_uuid])
+        logger.info(f"Imported {stored} of {count} track points into day {day_id}")
+        return count, stored
+
     @staticmethod
     def update_point(point_id: str, point_data: dict) -> Point:
         """
@@ -118,6 +239,10 @@ class PointService:
             raise NoResultFound(f"Point {point_id} not found")
         
         logger.info(f"Updating point {point_id}")
+        previous_cell = existing_point.geocell
+        previous_day_id = existing_point.day_id
+        previous_chain = (existing_point.day_id, existing_point.next_id)
+        previous_coordinates = (existing_point.latitude, existing_point.longitude)
         
         point_data = dict_to_snake(point_data)
         # Update scalar fields if provided
@@ -158,11 +283,24 @@ class PointService:
             # Add new images
             if point_data['images']:
                 for image_data in point_data['images']:
-                    image = cast(Image, ImageSchema().load(image_data))
+                    image = cast(Image, get_schema(ImageSchema).load(image_data))
                     existing_point.images.append(image)
         
+        relinked = (existing_point.day_id, existing_point.next_id) != previous_chain
+        moved = (existing_point.latitude, existing_point.longitude) != previous_coordinates
+        if relinked or moved:
+            db.session.flush()
+            RouteService.refresh_total_miles([previous_day_id, existing_point.day_id])
+
         db.session.commit()
         db.session.refresh(existing_point)      
+        PointService.invalidate_poi_tiles([previous_cell, existing_point.geocell])
+
+        # A moved point changes its two legs, a relinked one the whole chain
+        if relinked:
+            RouteService.invalidate_days([previous_day_id, existing_point.day_id])
+        elif moved:
+            RouteService.update_point_legs(existing_point)
   
         return existing_point
     
@@ -179,25 +317,353 @@ class PointService:
         """
         point = PointService.get_point_by_id(point_id)
         logger.info(f"Deleting point {point_id}")
+        previous_cell = point.geocell
+        day_id = point.day_id
         db.session.delete(point)
+        db.session.flush()
+        RouteService.refresh_total_miles([day_id])
         db.session.commit()
+        PointService.invalidate_poi_tiles([previous_cell])
+        RouteService.invalidate_days([day_id])
         logger.info(f"Point {point_id} deleted successfully")
     
     @staticmethod
-    def get_points_by_day(day_id: str) -> List[Point]:
+    def get_points_by_day(day_id: str, tolerance: Optional[float] = None) -> List[Point]:
         """
-        Retrieve all points for a specific day.
+        Retrieve all points for a specific day in route order.
+
+        The points are loaded in one query and ordered in memory along their
+        next links; see order_points. With a tolerance, runs of position points
+        are downsampled for display: the dropped ones are only left out of the
+        result, nothing is changed in the database. Dump the result with
+        dump_route so the next links skip the dropped points.
         
         Args:
             day_id: The ID of the day
+            tolerance: Simplification tolerance in metres of the position points, None for every point
             
         Returns:
             List of Point objects for that day
         """
-        points = db.session.query(Point).filter_by(day_id=UUID(day_id)).all()
+        points = (
+            db.session.query(Point)
+            .options(selectinload(Point.next))
+            .filter_by(day_id=UUID(day_id))
+            .order_by(Point.id)
+            .all()
+        )
         logger.info(f"Found {len(points)} points for day {day_id}")
+        points = PointService.order_points(points, context=f"day {day_id}")
+        if tolerance:
+            points = PointService.simplify_positions(points, tolerance)
+        return points
+
+    @staticmethod
+    def simplify_positions(points: List[Point], tolerance: float) -> List[Point]:
+        """
+        Drop the position points that a Douglas-Peucker simplification leaves out.
+
+        Stops, points of interest and points without coordinates are always kept and
+        split the positions into runs simplified separately.
+
+        Args:
+            points: Points in route order
+            tolerance: Simplification tolerance in metres
+
+        Returns:
+            The kept points, in order
+        """
+        kept: List[Point] = []
+        run: List[Point] = []
+
+        def flush():
+            if run:
+                coordinates = np.array([(float(point.latitude), float(point.longitude)) for point in run])
+                keep = simplify_track(coordinates[:, 0], coordinates[:, 1], tolerance)
+                kept.extend(point for point, is_kept in zip(run, keep) if is_kept)
+                run.clear()
+
+        for point in points:
+            if point.type == PointType.POSITION and point.latitude is not None and point.longitude is not None:
+                run.append(point)
+            else:
+                flush()
+                kept.append(point)
+        flush()
+        return kept
+
+    @staticmethod
+    def dump_route(points: List[Point]) -> List[dict]:
+        """
+        Dump points in route order, linking each to the next one in the list when
+        the point it links to was left out, as simplify_positions does.
+
+        Args:
+            points: Points in route order
+
+        Returns:
+            The dumped points
+        """
+        dump = get_dumper(PointSchema)
+        dump_next = get_dumper(PointSchema, exclude=("next", "nearby"))
+        listed = {point.id for point in points}
+        dumped = []
+        for index, point in enumerate(points):
+            data = dump(point)
+            if point.next_id is not None and point.next_id not in listed:
+                following = points[index + 1] if index + 1 < len(points) else None
+                data["next"] = dump_next(following) if following is not None else None
+            dumped.append(data)
+        return dumped
+
+    @staticmethod
+    def order_points(points: List[Point], context: str = "points") -> List[Point]:
+        """
+        Order points along their next links, without loading anything.
+
+        Separate chains follow each other, starting with those created first. Cycles
+        and broken chains are logged and their points kept.
+
+        Args:
+            points: Points to order
+            context: What the points belong to, for the log
+
+        Returns:
+            The same points in route order
+        """
+        chains = walk_chains({point.id: point.next_id for point in points})
+        if chains.broken:
+            logger.warning(
+                f"Points of {context} form {len(chains.chains)} chains"
+                + (f", with cycles at {', '.join(str(point_id) for point_id in chains.cycles)}" if chains.cycles else "")
+            )
+        by_id = {point.id: point for point in points}
+        return [by_id[point_id] for point_id in chains.order]
+
+    @staticmethod
+    def get_points_by_ids(point_ids: List[str]) -> List[Point]:
+        """
+        Retrieve points by their IDs.
+
+        Args:
+            point_ids: List of point IDs
+
+        Returns:
+            List of the Point objects found
+        """
+        points = db.session.query(Point).filter(Point.id.in_([UUID(point_id) for point_id in point_ids])).all()
+        logger.info(f"Found {len(points)} of {len(point_ids)} requested points")
         return points
 
     @staticmethod
-    def get_points_in_range(range:float,long: float, lat:float)-> List[Point]:
-        return []
\ No newline at end of file
+    def get_points_in_range(
+        range: float,
+        long: float,
+        lat: float,
+        trip_ids: Optional[Iterable[UUID]] = None,
+        point_type: Optional[PointType] = None,
+    ) -> List[Point]:
+        """
+        Retrieve the points lying within a radius of a coordinate.
+
+        The candidates are first narrowed with an indexed geohash prefix scan and a
+        bounding box on latitude/longitude, then refined with the exact haversine
+        distance. Only points of public itineraries and of the given trips are
+        returned, track positions only when point_type asks for them.
+
+        Args:
+            range: Search radius in kilometres
+            long: Longitude of the centre in degrees
+            lat: Latitude of the centre in degrees
+            trip_ids: Trips whose private points are visible too
+            point_type: Only return points of this type, every type but positions if None
+
+        Returns:
+            List of Point objects ordered by distance from the centre
+        """
+        if range <= 0:
+            return []
+
+        min_lat, max_lat, min_lon, max_lon = bounding_box(lat, long, range)
+        filters = [
+            Point.latitude.isnot(None),
+            Point.longitude.isnot(None),
+            Point.latitude.between(min_lat, max_lat),
+        ]
+        if min_lon is not None and max_lon is not None:
+            if min_lon <= max_lon:
+                filters.append(Point.longitude.between(min_lon, max_lon))
+            else:
+                # Box crosses the antimeridian
+                filters.append(or_(Point.longitude >= min_lon, Point.longitude <= max_lon))
+
+        cells = covering_cells(lat, long, range)
+        if cells:
+            filters.append(or_(*[Point.geocell.startswith(cell, autoescape=True) for cell in cells]))
+
+        visible = [Itinerary.is_public.is_(True)]
+        if trip_ids:
+            visible.append(Itinerary.trip_id.in_(list(trip_ids)))
+        filters.append(or_(*visible))
+
+        candidates = PointService._poi_query(point_type).filter(and_(*filters)).all()
+
+        in_range = []
+        for point in candidates:
+            distance = haversine_km(lat, long, float(point.latitude), float(point.longitude))
+            if distance <= range:
+                in_range.append((distance, point))
+        in_range.sort(key=lambda pair: pair[0])
+
+        logger.info(f"Found {len(in_range)} points within {range}km of ({lat}, {long})")
+        return [point for _, point in in_range]
+
+    @staticmethod
+    def get_pois_in_range(
+        range: float,
+        long: float,
+        lat: float,
+        point_type: Optional[PointType] = None,
+        user_id: Optional[str] = None,
+    ) -> List[dict]:
+        """
+        Retrieve the serialized points lying within a radius of a coordinate.
+
+        Points are served from the POI tile cache; only tiles missing from it are
+        loaded from the database, all in a single query. Only the points of public
+        itineraries and of the trips the user travels on are returned, and track
+        positions only when point_type is PointType.POSITION.
+
+        Args:
+            range: Search radius in kilometres
+            long: Longitude of the centre in degrees
+            lat: Latitude of the centre in degrees
+            point_type: Only return points of this type, every type but positions if None
+            user_id: The ID of the caller, only public points are visible if None
+
+        Returns:
+            List of serialized points ordered by distance from the centre
+        """
+        if range <= 0:
+            return []
+
+        trip_ids = TripService.get_accessible_trip_ids(user_id) if user_id else frozenset()
+        min_lat, max_lat, min_lon, max_lon = bounding_box(lat, long, range)
+        tiles = None
+        if min_lon is not None and max_lon is not None:
+            tiles = cells_in_box(min_lat, max_lat, min_lon, max_lon, POI_TILE_PRECISION, POI_MAX_TILES)
+
+        if tiles is None:
+            # Too wide for the tile cache, answer straight from the index
+            points = PointService.get_points_in_range(range, long, lat, trip_ids, point_type)
+            dump = PointService._poi_dumper()
+            return [dump(point) for point in points]
+
+        type_key = point_type.value if point_type else None
+        entries = []
+        missing_tiles = []
+        for tile in tiles:
+            cached = poi_tile_cache.get((tile, type_key))
+            if cached is None:
+                missing_tiles.append(tile)
+            else:
+                entries.extend(cached)
+
+        if missing_tiles:
+            loaded = PointService._load_poi_tiles(missing_tiles, point_type)
+            for tile in missing_tiles:
+                poi_tile_cache.put((tile, type_key), loaded[tile])
+                entries.extend(loaded[tile])
+
+        in_range = []
+        for point_lat, point_long, trip_id, public, dump in entries:
+            if not public and trip_id not in trip_ids:
+                continue
+            distance = haversine_km(lat, long, point_lat, point_long)
+            if distance <= range:
+                in_range.append((distance, dump))
+        in_range.sort(key=lambda pair: pair[0])
+
+        logger.info(f"Found {len(in_range)} POIs within {range}km of ({lat}, {long}) from {len(tiles)} tiles, {len(missing_tiles)} loaded")
+        return [dump for _, dump in in_range]
+
+    @staticmethod
+    def get_poi_cache_stats() -> dict:
+        """Hit, miss and eviction counters of the POI tile cache."""
+        return poi_tile_cache.stats()
+
+    @staticmethod
+    def _poi_dumper() -> Dumper:
+        return get_dumper(PointSchema, exclude=("next", "nearby", "images"))
+
+    @staticmethod
+    def _load_poi_tiles(tiles: List[str], point_type: Optional[PointType]) -> Dict[str, list]:
+        """Load the points of several tiles in one query, grouped by tile, with their trip and visibility."""
+        query = (
+            PointService._poi_query(point_type)
+            .add_columns(Itinerary.trip_id, Itinerary.is_public)
+            .filter(or_(*[Point.geocell.startswith(tile, autoescape=True) for tile in tiles]))
+        )
+
+        dump = PointService._poi_dumper()
+        loaded: Dict[str, list] = {tile: [] for tile in tiles}
+        for point, trip_id, is_public in query.all():
+            tile = point.geocell[:POI_TILE_PRECISION]
+            if tile in loaded:
+                loaded[tile].append((float(point.latitude), float(point.longitude), trip_id, bool(is_public), dump(point)))
+        return loaded
+
+    @staticmethod
+    def _poi_query(point_type: Optional[PointType]):
+        """Points of itinerary days, of one type or of every type but track positions."""
+        query = (
+            db.session.query(Point)
+            .options(lazyload(Point.images))
+            .join(Day, Point.day_id == Day.id)
+            .join(Itinerary, Day.itinerary_id == Itinerary.id)
+        )
+        if point_type is not None:
+            return query.filter(Point.type == point_type)
+        return query.filter(Point.type != PointType.POSITION)
+
+    @staticmethod
+    def delete_points_of_days(day_ids: Iterable[UUID]) -> List[Optional[str]]:
+        """
+        Delete the points of days about to be deleted, without committing.
+
+        Day.points doesn't cascade, so the points would otherwise be left behind with
+        no day and keep showing up in POI searches. Links to them from other points
+        are cleared first.
+
+        Args:
+            day_ids: IDs of the days
+
+        Returns:
+            Geohash cells of the deleted points, to invalidate once committed
+        """
+        day_ids = list(day_ids)
+        points = db.session.query(Point).filter(Point.day_id.in_(day_ids)).all()
+        point_ids = [point.id for point in points]
+        if point_ids:
+            db.session.execute(update(Point).where(Point.next_id.in_(point_ids)).values(next_id=None))
+            for point in points:
+                db.session.delete(point)
+        return [point.geocell for point in points]
+
+    @staticmethod
+    def invalidate_poi_tiles(cells: Iterable[Optional[str]]) -> None:
+        """Drop the cached POI lists of the tiles containing the given geohash cells."""
+        tiles: Set[str] = {cell[:POI_TILE_PRECISION] for cell in cells if cell}
+        type_keys = [None] + [point_type.value for point_type in PointType]
+        poi_tile_cache.invalidate_many((tile, type_key) for tile in tiles for type_key in type_keys)
+
+
+def _batches(items: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,202 @@
+"""
+Route Service - Distances sailed along the points of each day.
+
+The legs of a day are found by walking its Point.next_id chains from their first
+point, and measured with a vectorised haversine in nautical miles. Each day's legs
+are cached by starting point, so moving a point only re-measures the two legs
+touching it; changes to the chains themselves drop the day from the cache. The cache
+is per process, so other workers may serve legs measured before a change for up to
+ROUTE_CACHE_TTL. Itinerary.total_miles is the sum of the legs of its days, always
+measured from the stored points so a stale leg never becomes the stored total.
+"""
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from Api.database import db
+from Models.day import Day
+from Models.itinerary import Itinerary
+from Models.point import Point
+from Services.Utils.cache import LRUCache
+from Services.Utils.geo import haversine_nm
+from Services.Utils.point_chain import walk_chains
+
+logger = logging.getLogger(__name__)
+
+# Keyed by day ID, holds {from point ID: (to point ID, nautical miles)}; NaN for legs missing a coordinate
+route_cache = LRUCache(maxsize=4096, ttl=300)
+
+Legs = Dict[UUID, Tuple[UUID, float]]
+
+
+class RouteService:
+    """Service class computing the distances of days and itineraries."""
+
+    @staticmethod
+    def get_day_legs(day_ids: Iterable[UUID]) -> Dict[UUID, Legs]:
+        """
+        Legs of several days, loading the days missing from the cache in one query.
+
+        Args:
+            day_ids: IDs of the days
+
+        Returns:
+            Legs of each day keyed by their starting point
+        """
+        legs = {day_id: route_cache.get(day_id) for day_id in dict.fromkeys(day_ids)}
+        missing = [day_id for day_id, day_legs in legs.items() if day_legs is None]
+        if missing:
+            rows = (
+                db.session.query(Point.id, Point.day_id, Point.next_id, Point.latitude, Point.longitude)
+                .filter(Point.day_id.in_(missing))
+                .all()
+            )
+            for day_id, day_legs in RouteService._measure_days(missing, rows).items():
+                legs[day_id] = day_legs
+                route_cache.put(day_id, day_legs)
+        return legs
+
+    @staticmethod
+    def get_day_miles(day_id: str) -> float:
+        """
+        Nautical miles covered by the point chains of a day.
+
+        Args:
+            day_id: The ID of the day
+
+        Returns:
+            Sum of the legs with known coordinates
+        """
+        day_uuid = UUID(str(day_id))
+        return RouteService._total(RouteService.get_day_legs([day_uuid])[day_uuid])
+
+    @staticmethod
+    def update_point_legs(point: Point) -> None:
+        """
+        Re-measure the cached legs starting or ending at a point whose coordinates changed.
+
+        Args:
+            point: The moved point, with its chain unchanged
+        """
+        legs = route_cache.get(point.day_id)
+        if legs is None:
+            return
+
+        touched = [from_id for from_id, (to_id, _) in legs.items() if point.id in (from_id, to_id)]
+        if not touched:
+            return
+        ids = {point.id, *touched, *(legs[from_id][0] for from_id in touched)}
+        coordinates = {
+            row.id: (row.latitude, row.longitude)
+            for row in db.session.query(Point.id, Point.latitude, Point.longitude).filter(Point.id.in_(ids))
+        }
+
+        pairs = [(from_id, legs[from_id][0]) for from_id in touched]
+        miles = RouteService._leg_miles(pairs, coordinates)
+        updated = dict(legs)
+        for (from_id, to_id), distance in zip(pairs, miles):
+            updated[from_id] = (to_id, distance)
+        route_cache.put(point.day_id, updated)
+
+    @staticmethod
+    def invalidate_days(day_ids: Iterable[Optional[UUID]]) -> None:
+        """Drop the cached legs of days whose point chains changed."""
+        route_cache.invalidate_many(day_id for day_id in set(day_ids) if day_id is not None)
+
+    @staticmethod
+    def refresh_total_miles(day_ids: Iterable[Optional[UUID]]) -> None:
+        """
+        Recompute the total_miles of the itineraries holding some days, without committing.
+
+        Called with the change flushed, before the caller commits it.
+
+        Args:
+            day_ids: IDs of the days whose distances changed
+        """
+        day_ids = [day_id for day_id in set(day_ids) if day_id is not None]
+        if not day_ids:
+            return
+        itinerary_ids = [
+            row.itinerary_id
+            for row in db.session.query(Day.itinerary_id).filter(Day.id.in_(day_ids), Day.itinerary_id.isnot(None)).distinct()
+        ]
+        RouteService.refresh_itinerary_miles(itinerary_ids)
+
+    @staticmethod
+    def refresh_itinerary_miles(itinerary_ids: Iterable[Optional[UUID]]) -> None:
+        """
+        Recompute the total_miles of some itineraries, without committing.
+
+        Args:
+            itinerary_ids: IDs of the itineraries
+        """
+        itinerary_ids = [itinerary_id for itinerary_id in set(itinerary_ids) if itinerary_id is not None]
+        if not itinerary_ids:
+            return
+        for itinerary in db.session.query(Itinerary).filter(Itinerary.id.in_(itinerary_ids)):
+            RouteService.update_itinerary_miles(itinerary)
+
+    @staticmethod
+    def update_itinerary_miles(itinerary: Itinerary) -> float:
+        """
+        Set the total_miles of an itinerary to the sum of the legs of its days, without committing.
+
+        The legs are measured from the stored points in one query rather than taken from
+        route_cache, which may hold legs another worker has since changed.
+
+        Args:
+            itinerary: The itinerary to update
+
+        Returns:
+            The total in nautical miles
+        """
+        day_ids = [row.id for row in db.session.query(Day.id).filter(Day.itinerary_id == itinerary.id)]
+        rows = (
+            db.session.query(Point.id, Point.day_id, Point.next_id, Point.latitude, Point.longitude)
+            .filter(Point.day_id.in_(day_ids))
+            .all()
+        )
+        legs = RouteService._measure_days(day_ids, rows)
+        total = round(sum(RouteService._total(day_legs) for day_legs in legs.values()), 2)
+        itinerary.total_miles = total
+        logger.info(f"Itinerary {itinerary.id} covers {total} nautical miles over {len(day_ids)} days")
+        return total
+
+    @staticmethod
+    def _measure_days(day_ids: List[UUID], rows: List) -> Dict[UUID, Legs]:
+        """Group point rows by day and measure the legs of each day, days without points included."""
+        by_day: Dict[UUID, list] = {day_id: [] for day_id in day_ids}
+        for row in rows:
+            by_day[row.day_id].append(row)
+        return {day_id: RouteService._measure(day_rows) for day_id, day_rows in by_day.items()}
+
+    @staticmethod
+    def _measure(rows: List) -> Legs:
+        """Walk the chains of a day's points from each first point and measure every leg."""
+        chains = walk_chains({row.id: row.next_id for row in rows})
+        pairs = [pair for chain in chains.chains for pair in zip(chain, chain[1:])]
+
+        coordinates = {row.id: (row.latitude, row.longitude) for row in rows}
+        miles = RouteService._leg_miles(pairs, coordinates)
+        return {from_id: (to_id, distance) for (from_id, to_id), distance in zip(pairs, miles)}
+
+    @staticmethod
+    def _leg_miles(pairs: List[Tuple[UUID, UUID]], coordinates: Dict[UUID, tuple]) -> List[float]:
+        """Nautical miles of each (from, to) leg, NaN where a coordinate is missing."""
+        if not pairs:
+            return []
+        ends = np.array(
+            [[_degrees(value) for value in (*coordinates[from_id], *coordinates[to_id])] for from_id, to_id in pairs],
+            dtype=float,
+        )
+        return haversine_nm(ends[:, 0], ends[:, 1], ends[:, 2], ends[:, 3]).tolist()
+
+    @staticmethod
+    def _total(legs: Legs) -> float:
+        return float(np.nansum([distance for _, distance in legs.values()])) if legs else 0.0
+
+
+def _degrees(value) -> float:
+    return np.nan if value is None else float(value)
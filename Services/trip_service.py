@@ -4,7 +4,7 @@ Trip Service - Business logic for trip operations.
 
 import logging
 from datetime import date
-from typing import List, Optional, cast
+from typing import FrozenSet, Iterable, List, Optional, cast
 from flask import g
 from sqlalchemy.exc import NoResultFound
 from uuid import UUID
@@ -14,22 +14,33 @@ from Models.trip import Trip
 from Models.user import User
 from Models.user_has_invitation import user_has_invitation
 from Schemas.trip_schema import TripSchema
+from Schemas.registry import get_schema
 from Api.database import db
-from sqlalchemy.orm import selectinload, contains_eager
+from sqlalchemy.orm import contains_eager
+from Services.route_service import RouteService
 from Services.user_service import UserService
+from Services.Utils.cache import LRUCache
+from Services.Utils.loader_profiles import loader_options
+from Services.Utils.pagination import Page, paginate
 logger = logging.getLogger(__name__)
 
+# Trip ids each user travels on, shared across requests by the access checks. Per
+# process: invalidations reach the worker making the change only, the other workers
+# keep their entries until ACCESS_CACHE_TTL expires them
+trip_access_cache = LRUCache(maxsize=4096, ttl=30)
+
 
 class TripService:
     """Service class for Trip-related business logic."""
 
     @staticmethod
-    def get_trip_by_id(id: str) -> Optional[Trip]:
+    def get_trip_by_id(id: str, profile: Optional[str] = None) -> Optional[Trip]:
         """
         Retrieve a trip by its id (UUID).
 
         Args:
             id: The id of the trip to retrieve
+            profile: Optional loader profile eager loading the trip's relationships
 
         Returns:
             Trip object if found
@@ -37,37 +48,47 @@ class TripService:
         Raises:
             NoResultFound: If trip doesn't exist
         """
-        trip = db.session.query(Trip).filter_by(id=UUID(id)).first()
+        query = db.session.query(Trip)
+        if profile:
+            query = query.options(*loader_options(profile))
+        trip = query.filter_by(id=UUID(id)).first()
         if not trip:
             logger.warning(f"Trip with id {id} not found")
             raise NoResultFound(f"Trip {id} not found in database")
         return trip
 
     @staticmethod
-    def get_trips_by_user(user_id: str) -> List[Trip]:
+    def get_trips_by_user(
+        user_id: str, profile: Optional[str] = None, limit: Optional[int] = 50, after: Optional[str] = None
+    ) -> Page:
         """
-        Retrieve all trips from the database.
+        Retrieve one page of a user's trips, oldest first.
+
+        Args:
+            user_id: The ID of the user
+            profile: Optional loader profile eager loading the trips' relationships
+            limit: Largest number of trips returned, None to stream them all
+            after: Cursor of the page, as returned with the previous one
 
         Returns:
-            List of all Trip objects
+            The page of Trip objects and the cursor of the next page
 
         Raises:
-            NoResultFound: If no trips exist
+            NoResultFound: If the user doesn't exist
         """
-        user = (
-            db.session.query(User)
-            .options(selectinload(User.trips))
-            .filter_by(id=UUID(user_id))
-            .first()
-        )
-
-        if not user:
+        if db.session.get(User, UUID(user_id)) is None:
             raise NoResultFound(f"User with id {user_id} not found")
-        
-        trips = user.trips
-        logger.info(f"Found {len(trips)} trips for user {user_id}")
 
-        return trips
+        query = db.session.query(Trip).select_from(User).join(User.trips).filter(User.id == UUID(user_id))
+        if profile:
+            query = query.options(*loader_options(profile))
+        page = paginate(query, Trip.id, limit, after)
+        if isinstance(page.items, list):
+            logger.info(f"Found {len(page.items)} trips for user {user_id}")
+        else:
+            logger.info(f"Streaming the trips of user {user_id}")
+
+        return page
 
     @staticmethod
     def create_trip(trip_data: dict) -> Trip:
@@ -108,7 +129,7 @@ class TripService:
         
 
 
-        trip: Trip = TripSchema().load(trip_data)  # type: ignore
+        trip: Trip = get_schema(TripSchema).load(trip_data)  # type: ignore
         
         # Add the creator as a traveller
         if current_user:
@@ -119,6 +140,7 @@ class TripService:
 
         # Refresh to get relationships
         db.session.refresh(trip)
+        TripService.invalidate_trip_access([traveller.id for traveller in trip.travellers])
         logger.info(f"Trip {trip.id} created successfully")
         return trip
 
@@ -141,8 +163,9 @@ class TripService:
         existing_trip = TripService.get_trip_by_id(trip_id)
         if not existing_trip:
             raise NoResultFound(f"Trip {id} not found")
+        previous_travellers = [traveller.id for traveller in existing_trip.travellers]
         
-        trip: Trip = TripSchema().load(trip_data)  # type: ignore
+        trip: Trip = get_schema(TripSchema).load(trip_data)  # type: ignore
         logger.info(f"Updating trip {trip.id}")
         db.session.merge(trip)
         db.session.commit()
@@ -150,6 +173,7 @@ class TripService:
         updated_trip = TripService.get_trip_by_id(str(trip.id))
         if not updated_trip:
             raise NoResultFound(f"Trip {trip.id} not found after update")
+        TripService.invalidate_trip_access(previous_travellers + [traveller.id for traveller in updated_trip.travellers])
         logger.info(f"Trip {trip.id} updated successfully")
         return updated_trip
 
@@ -170,11 +194,13 @@ class TripService:
         if not trip:
             raise NoResultFound(f"Trip with id {trip_id} not found")
 
+        # Every traveller may lose access to the trip
+        travellers = [traveller.id for traveller in trip.travellers]
+
         if for_everyone:
             # Delete the entire trip and all associations (cascade should handle user_has_trip)
             logger.info(f"Deleting trip {trip_id} for everyone")
-            db.session.delete(trip)
-            db.session.commit()
+            TripService._delete_with_points(trip)
             logger.info(f"Trip {trip_id} deleted successfully")
         else:
             # Only remove the current user's association with the trip
@@ -204,10 +230,35 @@ class TripService:
             # Refresh trip to get updated travellers count
             db.session.refresh(trip)
             if not trip.travellers:
-                db.session.delete(trip)
-                db.session.commit()
+                TripService._delete_with_points(trip)
                 logger.info(f"Trip {trip_id} had no remaining users and was deleted")
 
+        TripService.invalidate_trip_access(travellers)
+
+    @staticmethod
+    def _delete_with_points(trip: Trip) -> None:
+        """
+        Delete a trip along with the points of its itinerary days.
+
+        The delete cascades to the itinerary and its days, but not to their points,
+        which are removed first the way ItineraryService.delete_itinerary does; the
+        POI tiles and route legs of those days are invalidated once committed.
+
+        Args:
+            trip: The trip to delete
+        """
+        # PointService imports this module
+        from Services.point_service import PointService
+
+        day_ids = [day.id for day in trip.itinerary.days] if trip.itinerary else []
+        cells = PointService.delete_points_of_days(day_ids)
+
+        db.session.delete(trip)
+        db.session.commit()
+
+        PointService.invalidate_poi_tiles(cells)
+        RouteService.invalidate_days(day_ids)
+
     @staticmethod
     def get_invitations_by_user(
         user_id: str, include_expired: bool = False
@@ -303,4 +354,53 @@ class TripService:
             user.invitations.remove(trip)
             logger.info(f"User {user_id} rejected invitation to trip {trip_id}")
         
-        db.session.commit()
\ No newline at end of file
+        db.session.commit()
+        TripService.invalidate_trip_access([user_id])
+
+    @staticmethod
+    def get_accessible_trip_ids(user_id: str) -> FrozenSet[UUID]:
+        """
+        Retrieve the ids of the trips the user travels on.
+
+        Results are cached for a short time across requests; membership changes
+        made through this service invalidate them in the current process only.
+
+        Args:
+            user_id: The ID of the user
+
+        Returns:
+            Set of trip ids
+        """
+        trip_ids = trip_access_cache.get(str(user_id))
+        if trip_ids is None:
+            rows = (
+                db.session.query(user_has_trip.c.trip_id)
+                .filter(user_has_trip.c.user_id == UUID(str(user_id)))
+                .all()
+            )
+            trip_ids = frozenset(row.trip_id for row in rows)
+            trip_access_cache.put(str(user_id), trip_ids)
+        return trip_ids
+
+    @staticmethod
+    def get_cached_trip_ids(user_id: str) -> Optional[FrozenSet[UUID]]:
+        """
+        Retrieve the ids of the trips the user travels on if they are cached.
+
+        Args:
+            user_id: The ID of the user
+
+        Returns:
+            Set of trip ids, None if the user's trips aren't cached
+        """
+        return trip_access_cache.get(str(user_id))
+
+    @staticmethod
+    def invalidate_trip_access(user_ids: Iterable) -> None:
+        """
+        Drop the cached accessible trips of the given users.
+
+        Args:
+            user_ids: IDs of the users whose trip membership changed
+        """
+        trip_access_cache.invalidate_many({str(user_id) for user_id in user_ids})
\ No newline at end of file
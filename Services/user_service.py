@@ -10,9 +10,17 @@ from flask_bcrypt import generate_password_hash
 import logging
 
 from Schemas.image_schema import ImageSchema
+from Schemas.registry import get_schema
+from Services.Utils.cache import LRUCache
 
 logger = logging.getLogger(__name__)
 
+# Current mail of each authenticated user id, None for users that no longer exist
+user_status_cache = LRUCache(maxsize=4096, ttl=60)
+
+_UNKNOWN = object()
+
+
 class UserService:
 
     @staticmethod
@@ -21,6 +29,33 @@ class UserService:
         if not user:
             raise NoResultFound(f"User with id {id} not found in db")
         return user
+
+    @staticmethod
+    def get_active_user_mail(id: str) -> Optional[str]:
+        """
+        Retrieve the mail of an active user, used to validate authenticated requests.
+
+        Lookups are cached for a short time, including misses, so that verifying a
+        token doesn't hit the database on every request. update_user and delete_user
+        invalidate the cached entry.
+
+        Args:
+            id: The ID of the user
+
+        Returns:
+            The user's mail, or None if the user doesn't exist or isn't active
+        """
+        mail = user_status_cache.get(str(id), _UNKNOWN)
+        if mail is _UNKNOWN:
+            row = db.session.query(User.mail, User.active).filter_by(id=UUID(id)).first()
+            mail = row.mail if row and row.active else None
+            user_status_cache.put(str(id), mail)
+        return mail
+
+    @staticmethod
+    def invalidate_user_status(id: str) -> None:
+        """Drop the cached authentication status of a user."""
+        user_status_cache.invalidate(str(id))
     
     @staticmethod
     def update_user(id: str, user_data: Dict[str, Any]) -> User:
@@ -60,15 +95,14 @@ class UserService:
                 saved_user.username = user_data['username']
             if 'pwd' in user_data:
                 saved_user.pwd = generate_password_hash(user_data['pwd']).decode("UTF-8")
-            if 'admin' in user_data:
-                saved_user.admin = user_data['admin']
             if 'image' in user_data:
                 if image:= user_data.get("image", None) is None:
                     saved_user.image = None
                 else:
-                    image = cast(Image, ImageSchema().load(user_data['image']))
+                    image = cast(Image, get_schema(ImageSchema).load(user_data['image']))
                     saved_user.image = image
             db.session.commit()
+            UserService.invalidate_user_status(id)
             
             # Refresh to get latest state from database
             db.session.refresh(saved_user)
@@ -97,6 +131,7 @@ class UserService:
         try:
             db.session.delete(saved_user)
             db.session.commit()
+            UserService.invalidate_user_status(id)
             logger.info(f"User with id {id} deleted successfully")
             
         except IntegrityError as e:
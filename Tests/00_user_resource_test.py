@@ -1,4 +1,8 @@
+from Api.database import db
+from Models.user import User
 from Resources.user_resource import USER_ENDPOINT
+from Services.Middleware.auth_middleware import JWTService
+from Services.user_service import UserService
 import json, uuid
 
 def test_user_missing_arguments(client):
@@ -53,3 +57,33 @@ def test_delete_user(client, auth_headers, id_2):
     assert response.status_code == 200
 
 
+
+def test_deleted_user_token_rejected(client, auth_headers, user_2, id_2):
+    token = JWTService.generate_access_token(id_2, user_2.mail, user_2.admin)
+    response = client.get(
+        f"{USER_ENDPOINT}/{id_2}",
+        headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
+
+
+def test_inactive_user_token_rejected(client):
+    inactive_user = {
+        "mail": "inactive.user@gmail.com",
+        "pwd": "testPassword6$",
+        "phone": "+390123456783",
+        "name": "Inactive User",
+        "username": "inactiveuser",
+    }
+    response = client.post("/api/auth/register", json=inactive_user)
+    assert response.status_code == 201
+    headers = {"Authorization": f"Bearer {response.json['access_token']}"}
+    user = User.query.filter_by(mail=inactive_user["mail"]).one()
+    user_id = str(user.id)
+
+    # Registered users are active
+    assert client.get(f"{USER_ENDPOINT}/{user_id}", headers=headers).status_code == 200
+
+    user.active = False
+    db.session.commit()
+    UserService.invalidate_user_status(user_id)
+    assert client.get(f"{USER_ENDPOINT}/{user_id}", headers=headers).status_code == 401
@@ -1,4 +1,22 @@
+import pytest
+from datetime import date, timedelta
+from uuid import UUID
+from flask import g
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+
+from Api.database import db
+from Api.query_instrumentation import QueryStats
+from Models.point import Point
+from Models.user import User
+from Models.user_has_invitation import user_has_invitation
+from Resources.itinerary_resource import ITINERARY_ENDPOINT
+from Resources.point_resource import POINT_ENDPOINT
 from Resources.trip_resource import TRIP_ENDPOINT
+from Services.Middleware.privileges_middleware import check_resource_ownership
+from Services.trip_service import TripService
+from Services.Utils import pagination
+from Services.Utils.pagination import Page, page_response
 import json
 
 def test_insert_trip_w_itinerary_and_inventory(client, auth_headers):
@@ -31,6 +49,76 @@ def test_get_all_trips(client, auth_headers, id):
     # Number of trips depends on what was created in previous tests
     assert isinstance(json.loads(response.data), list)
 
+def test_stream_all_trips(client, auth_headers, id):
+    for _ in range(3):
+        response = client.post(f"{TRIP_ENDPOINT}/create", json={"itinerary": {"days": []}, "inventory": {}}, headers=auth_headers)
+        assert response.status_code == 201
+
+    paged = []
+    cursor = None
+    while True:
+        query = f"?limit=2&after={cursor}" if cursor else "?limit=2"
+        response = client.get(f"{TRIP_ENDPOINT}/{id}/all{query}", headers=auth_headers)
+        assert response.status_code == 200
+        paged.extend(json.loads(response.data))
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    response = client.get(f"{TRIP_ENDPOINT}/{id}/all?stream=true", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert "X-Next-Cursor" not in response.headers
+    assert json.loads(response.get_data()) == paged
+
+    # Streaming resumes from a cursor too
+    response = client.get(f"{TRIP_ENDPOINT}/{id}/all?stream=true&after={paged[0]['id']}", headers=auth_headers)
+    assert json.loads(response.get_data()) == paged[1:]
+
+
+@pytest.mark.parametrize("chunk_size", [pagination.STREAM_CHUNK_SIZE, 1])
+def test_stream_error_ends_the_array(app, monkeypatch, chunk_size):
+    monkeypatch.setattr(pagination, "STREAM_CHUNK_SIZE", chunk_size)
+
+    def dump(row):
+        if row == 3:
+            raise ValueError("row 3 can't be dumped")
+        return {"row": row}
+
+    with app.test_request_context(f"{TRIP_ENDPOINT}/all?stream=true"):
+        response = page_response(Page(iter(range(1, 6)), None), dump)
+        assert response.status_code == 200
+        body = json.loads(response.get_data())
+    assert body == [{"row": 1}, {"row": 2}, {"streamError": "row 3 can't be dumped"}]
+
+
+def test_streamed_listing_query_stats(app, client, auth_headers, id, caplog):
+    threshold = app.config["QUERY_COUNT_WARNING_THRESHOLD"]
+    app.config["QUERY_COUNT_WARNING_THRESHOLD"] = 0
+    try:
+        response = client.get(f"{TRIP_ENDPOINT}/{id}/all?stream=true", headers=auth_headers)
+        assert "X-DB-Query-Count" not in response.headers
+        response.get_data()
+        response.close()
+    finally:
+        app.config["QUERY_COUNT_WARNING_THRESHOLD"] = threshold
+
+    # Counted while the body was generated, reported once the response closed
+    warnings = [record.getMessage() for record in caplog.records if "SQL statements" in record.getMessage()]
+    assert any(f"GET {TRIP_ENDPOINT}/{id}/all issued" in message for message in warnings)
+
+def test_failed_statement_leaves_no_start_time(app):
+    with app.test_request_context():
+        g.query_stats = QueryStats()
+        with pytest.raises(ProgrammingError):
+            db.session.execute(text("SELECT * FROM no_such_table"))
+        db.session.rollback()
+
+        db.session.execute(text("SELECT 1"))
+        assert g.query_stats.count == 1
+        assert "query_start_time" not in db.session.connection().info
+        db.session.commit()
+
 def test_get_trip_by_id(client, auth_headers):
     # First create a trip to get its ID
     trip_data = {
@@ -43,3 +131,108 @@ def test_get_trip_by_id(client, auth_headers):
     trip_id = json.loads(create_response.data)['id']
     response = client.get(f"{TRIP_ENDPOINT}/{trip_id}", headers=auth_headers)
     assert response.status_code == 200
+
+def test_get_trip_query_count_is_fixed(client, auth_headers, itinerary):
+    def count_queries():
+        response = client.get(f"{TRIP_ENDPOINT}/{itinerary['tripId']}", headers=auth_headers)
+        assert response.status_code == 200
+        return int(response.headers["X-DB-Query-Count"])
+
+    def add_point(day_id, point_type):
+        response = client.post("/api/point/create", headers=auth_headers, json={"dayId": day_id, "type": point_type})
+        assert response.status_code == 201
+
+    add_point(itinerary["days"][0]["id"], "stop")
+    before = count_queries()
+
+    for day in itinerary["days"]:
+        for point_type in ["stop", "interest", "position"]:
+            add_point(day["id"], point_type)
+
+    assert count_queries() == before
+
+
+def test_access_checks_issue_one_query(app, itinerary, id):
+    day_id = itinerary["days"][0]["id"]
+    with app.test_request_context():
+        g.current_user_id = id
+        g.query_stats = QueryStats()
+
+        # Membership not cached: resolved in the resource's query
+        TripService.invalidate_trip_access([id])
+        assert check_resource_ownership("day", day_id) is True
+        assert g.query_stats.count == 1
+
+        # Memoised for the rest of the request
+        assert check_resource_ownership("day", day_id) is True
+        assert g.query_stats.count == 1
+
+        # Membership cached: the resource's query only, none for a trip the user travels on
+        g.access_decisions = {}
+        TripService.get_accessible_trip_ids(id)
+        before = g.query_stats.count
+        assert check_resource_ownership("day", day_id) is True
+        assert check_resource_ownership("trip", itinerary["tripId"]) is True
+        assert g.query_stats.count == before + 1
+
+
+def test_delete_trip_removes_its_points(client, auth_headers):
+    response = client.post(f"{TRIP_ENDPOINT}/create", headers=auth_headers, json={"destination": "Ponza"})
+    assert response.status_code == 201
+    trip_id = response.json["id"]
+    itinerary = {"tripId": trip_id, "days": [{"dayNumber": 1, "date": "2021-06-01", "points": []}]}
+    response = client.post(f"{ITINERARY_ENDPOINT}/create", headers=auth_headers, json=itinerary)
+    assert response.status_code == 201
+    day_id = response.json["days"][0]["id"]
+
+    point = {"dayId": day_id, "type": "stop", "latitude": 41.7, "longitude": 12.3}
+    response = client.post(f"{POINT_ENDPOINT}/create", headers=auth_headers, json=point)
+    assert response.status_code == 201
+    point_id = response.json["id"]
+
+    query = f"{POINT_ENDPOINT}/pois?range=2&lat=41.7&long=12.3"
+    assert [poi["id"] for poi in client.get(query, headers=auth_headers).json] == [point_id]
+
+    response = client.delete(f"{TRIP_ENDPOINT}/{trip_id}?for_everyone=true", headers=auth_headers)
+    assert response.status_code == 200
+
+    # Neither served from the cached tile nor left behind without a day
+    assert client.get(query, headers=auth_headers).json == []
+    assert db.session.get(Point, UUID(point_id)) is None
+
+def test_trip_access_follows_invitations_and_deletion(app, client, auth_headers):
+    guest = {
+        "mail": "trip.guest@gmail.com",
+        "pwd": "testPassword6$",
+        "phone": "+390123456782",
+        "name": "Trip Guest",
+        "username": "tripguest",
+    }
+    response = client.post("/api/auth/register", json=guest)
+    assert response.status_code == 201
+    guest_headers = {"Authorization": f"Bearer {response.json['access_token']}"}
+    guest_id = str(User.query.filter_by(mail=guest["mail"]).one().id)
+    response = client.post(f"{TRIP_ENDPOINT}/create", headers=auth_headers, json={"destination": "Elba"})
+    assert response.status_code == 201
+    trip_id = response.json["id"]
+
+    with app.test_request_context():
+        assert TripService.get_accessible_trip_ids(guest_id) == frozenset()
+    assert client.get(f"{TRIP_ENDPOINT}/{trip_id}", headers=guest_headers).status_code == 403
+
+    # Accepting the invitation drops the cached membership
+    db.session.execute(user_has_invitation.insert().values(
+        user_id=UUID(guest_id), trip_id=UUID(trip_id), expiration_date=date.today() + timedelta(days=1)
+    ))
+    db.session.commit()
+    with app.test_request_context():
+        g.current_user_id = guest_id
+        TripService.handle_invitation(trip_id, True)
+        assert TripService.get_cached_trip_ids(guest_id) is None
+        assert UUID(trip_id) in TripService.get_accessible_trip_ids(guest_id)
+    assert client.get(f"{TRIP_ENDPOINT}/{trip_id}", headers=guest_headers).status_code == 200
+
+    # Deleting the trip drops it for every traveller
+    response = client.delete(f"{TRIP_ENDPOINT}/{trip_id}?for_everyone=true", headers=auth_headers)
+    assert response.status_code == 200
+    assert TripService.get_cached_trip_ids(guest_id) is None
@@ -1,12 +1,17 @@
 from http import HTTPStatus
 from Resources.day_resource import DAY_ENDPOINT
 from Resources.itinerary_resource import ITINERARY_ENDPOINT
+from Resources.point_resource import POINT_ENDPOINT
 from Resources.trip_resource import TRIP_ENDPOINT
 from datetime import date, datetime
 from Schemas.day_schema import DaySchema
+from uuid import UUID
 import json
 import pytest
 
+from Api.database import db
+from Models.point import Point
+
 @pytest.fixture
 def test_trip(client, auth_headers):
     """Create a test trip and return its ID."""
@@ -121,6 +126,19 @@ def test_get_all_days(client, auth_headers, test_itinerary_with_day):
     assert response.status_code == HTTPStatus.OK
     assert len(json.loads(response.data)) == 1
 
+def test_get_days_by_ids(client, auth_headers, test_itinerary_with_day):
+    day_id = test_itinerary_with_day["days"][0]['id']
+    response = client.post(
+        f"{DAY_ENDPOINT}/by-ids", json={"ids": [day_id]}, headers=auth_headers)
+    assert response.status_code == HTTPStatus.OK
+    assert [day['id'] for day in json.loads(response.data)] == [day_id]
+
+    response = client.post(f"{DAY_ENDPOINT}/by-ids", json={"ids": []}, headers=auth_headers)
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    response = client.post(f"{DAY_ENDPOINT}/by-ids", json={"ids": ["not-a-uuid"]}, headers=auth_headers)
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
 def test_update_day(client, auth_headers, test_itinerary_with_day):
     day_id = test_itinerary_with_day["days"][0]['id']
     itinerary_id = test_itinerary_with_day['id']
@@ -138,3 +156,22 @@ def test_delete_day_by_id(client, auth_headers, test_itinerary_with_day):
     response = client.delete(
         f"{DAY_ENDPOINT}/{day_id}", headers=auth_headers)
     assert response.status_code == HTTPStatus.OK
+
+
+def test_delete_day_removes_its_points(app, client, auth_headers, test_itinerary_with_day):
+    day_id = test_itinerary_with_day["days"][0]['id']
+    point = {"dayId": day_id, "type": "stop", "latitude": 40.5, "longitude": 9.1}
+    response = client.post(f"{POINT_ENDPOINT}/create", headers=auth_headers, json=point)
+    assert response.status_code == HTTPStatus.CREATED
+    point_id = response.json["id"]
+
+    query = f"{POINT_ENDPOINT}/pois?range=2&lat=40.5&long=9.1"
+    assert [poi["id"] for poi in client.get(query, headers=auth_headers).json] == [point_id]
+
+    response = client.delete(f"{DAY_ENDPOINT}/{day_id}", headers=auth_headers)
+    assert response.status_code == HTTPStatus.OK
+
+    # Neither served from the cached tile nor left behind without a day
+    assert client.get(query, headers=auth_headers).json == []
+    with app.app_context():
+        assert db.session.get(Point, UUID(point_id)) is None
@@ -45,6 +45,40 @@ def test_get_all_logs(client, auth_headers, test_log):
     assert len(data) >= 1  # At least the test_log fixture
 
 
+def test_get_logs_paginated(client, auth_headers):
+    """Test paging through the logs with the next cursor"""
+    created = []
+    for hours in range(5):
+        response = client.post(f"{LOG_ENDPOINT}/create", headers=auth_headers, json={"hours": hours, "avgSea": 1})
+        assert response.status_code == 201
+        created.append(json.loads(response.data)["id"])
+
+    seen = []
+    cursor = None
+    while True:
+        query = f"?limit=2&after={cursor}" if cursor else "?limit=2"
+        response = client.get(f"{LOG_ENDPOINT}/all{query}", headers=auth_headers)
+        assert response.status_code == 200
+        page = json.loads(response.data)
+        assert len(page) <= 2
+        seen.extend(log["id"] for log in page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    # Every log once, oldest first
+    assert seen == sorted(seen)
+    assert seen[-5:] == created
+
+    response = client.get(f"{LOG_ENDPOINT}/all?limit=0", headers=auth_headers)
+    assert response.status_code == 400
+    response = client.get(f"{LOG_ENDPOINT}/all?after=not-a-cursor", headers=auth_headers)
+    assert response.status_code == 400
+
+    for log_id in created:
+        client.delete(f"{LOG_ENDPOINT}/{log_id}", headers=auth_headers)
+
+
 def test_get_endorsed_logs(client, auth_headers):
     """Test retrieving endorsed logs"""
     response = client.get(f"{LOG_ENDPOINT}/endorsed", headers=auth_headers)
@@ -1,7 +1,16 @@
+import numpy as np
 import pytest
 from Resources.point_resource import POINT_ENDPOINT
+from Resources.day_resource import DAY_ENDPOINT
+from Resources.itinerary_resource import ITINERARY_ENDPOINT
+from Services.point_service import PointService
+from Services.route_service import RouteService, route_cache
+from Services.Utils.simplify import simplify_track
+from uuid_extension import uuid7
+import io
 import json
 from datetime import date, datetime
+from uuid import UUID
 
 
 @pytest.fixture(scope="function")
@@ -95,9 +104,366 @@ def test_link_points(client, points, auth_headers):
     assert json.loads(response.data)["next"]["id"] == point_2["id"]
 
 
+def test_itinerary_miles_follow_point_chains(client, auth_headers, itinerary):
+    day_id = itinerary["days"][0]["id"]
+    created = []
+    for latitude in (43.0, 43.5, 44.0):
+        point = {"dayId": day_id, "type": "stop", "latitude": latitude, "longitude": 10.0}
+        response = client.post(f"{POINT_ENDPOINT}/create", headers=auth_headers, json=point)
+        assert response.status_code == 201
+        created.append(response.json)
+
+    # Unlinked points cover no distance
+    assert RouteService.get_day_miles(day_id) == 0
+
+    for point, next_point in zip(created, created[1:]):
+        response = client.post(
+            f"{POINT_ENDPOINT}/{point['id']}/update", headers=auth_headers, json={"next": {"id": next_point["id"]}}
+        )
+        assert response.status_code == 200
+
+    # Half a degree of latitude is about 30 nautical miles
+    assert RouteService.get_day_miles(day_id) == pytest.approx(60.04, abs=0.02)
+    response = client.get(f"{ITINERARY_ENDPOINT}/{itinerary['id']}", headers=auth_headers)
+    assert response.json["totalMiles"] == pytest.approx(60.04, abs=0.02)
+
+    # Moving the last point re-measures its leg only
+    response = client.post(
+        f"{POINT_ENDPOINT}/{created[2]['id']}/update", headers=auth_headers, json={"latitude": 45.0}
+    )
+    assert response.status_code == 200
+    assert RouteService.get_day_miles(day_id) == pytest.approx(120.08, abs=0.02)
+    response = client.get(f"{ITINERARY_ENDPOINT}/{itinerary['id']}", headers=auth_headers)
+    assert response.json["totalMiles"] == pytest.approx(120.08, abs=0.02)
+
+    # Legs another worker cached before the move never become the stored total
+    first_id, second_id, last_id = (UUID(point["id"]) for point in created)
+    route_cache.put(UUID(day_id), {first_id: (second_id, 999.0)})
+    response = client.post(
+        f"{POINT_ENDPOINT}/{last_id}/update", headers=auth_headers, json={"latitude": 44.0}
+    )
+    assert response.status_code == 200
+    response = client.get(f"{ITINERARY_ENDPOINT}/{itinerary['id']}", headers=auth_headers)
+    assert response.json["totalMiles"] == pytest.approx(60.04, abs=0.02)
+
+
+def test_points_by_day_in_route_order(client, auth_headers, itinerary, points):
+    day_id = itinerary["days"][0]["id"]
+    [first, second, third, fourth] = [point["id"] for point in points]
+
+    # Route: fourth -> first -> third -> second
+    for point_id, next_id in ((fourth, first), (first, third), (third, second)):
+        response = client.post(
+            f"{POINT_ENDPOINT}/{point_id}/update", headers=auth_headers, json={"next": {"id": next_id}}
+        )
+        assert response.status_code == 200
+
+    response = client.get(f"{POINT_ENDPOINT}/day/{day_id}", headers=auth_headers)
+    assert response.status_code == 200
+    assert [point["id"] for point in response.json] == [fourth, first, third, second]
+
+    response = client.get(f"{DAY_ENDPOINT}/{day_id}", headers=auth_headers)
+    assert [point["id"] for point in response.json["points"]] == [fourth, first, third, second]
+
+    # A loop back to the start keeps every point once
+    response = client.post(
+        f"{POINT_ENDPOINT}/{second}/update", headers=auth_headers, json={"next": {"id": fourth}}
+    )
+    assert response.status_code == 200
+    response = client.get(f"{POINT_ENDPOINT}/day/{day_id}", headers=auth_headers)
+    assert sorted(point["id"] for point in response.json) == sorted([first, second, third, fourth])
+
+
+def test_import_gpx_track(client, auth_headers, itinerary):
+    day_id = itinerary["days"][1]["id"]
+    track_points = "".join(
+        f'<trkpt lat="{43 + index * 0.0001:.4f}" lon="10.0"><time>2020-01-01T10:{index // 60 % 60:02d}:{index % 60:02d}Z</time></trkpt>'
+        for index in range(2500)
+    )
+    gpx = f'<?xml version="1.0"?><gpx xmlns="http://www.topografix.com/GPX/1/1"><trk><trkseg>{track_points}</trkseg></trk></gpx>'
+
+    response = client.post(
+        f"{POINT_ENDPOINT}/day/{day_id}/import?tolerance=0",
+        headers=auth_headers,
+        data={"file": (io.BytesIO(gpx.encode()), "morning.gpx")},
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 201
+    assert response.json["imported"] == 2500
+
+    # Linked across the insert batches, in recording order
+    response = client.get(f"{POINT_ENDPOINT}/day/{day_id}", headers=auth_headers)
+    points = response.json
+    assert len(points) == 2500
+    assert [point["latitude"] for point in points[998:1002]] == [43.0998, 43.0999, 43.1, 43.1001]
+    assert all(point["next"]["id"] == following["id"] for point, following in zip(points, points[1:]))
+    assert points[-1]["next"] is None
+    assert points[0]["type"] == "position"
+    assert RouteService.get_day_miles(day_id) == pytest.approx(15.0, abs=0.05)
+
+    # Downsampled for a map, the straight track keeps its ends
+    response = client.get(f"{POINT_ENDPOINT}/day/{day_id}?tolerance=10", headers=auth_headers)
+    assert [point["id"] for point in response.json] == [points[0]["id"], points[-1]["id"]]
+    # and links them to each other rather than to dropped points
+    assert response.json[0]["next"]["id"] == points[-1]["id"]
+    assert response.json[1]["next"] is None
+
+
+def test_import_simplifies_tracks(client, auth_headers, itinerary):
+    day_id = itinerary["days"][1]["id"]
+    # North for 1000 fixes, then east for 1000, with sub-metre jitter
+    jitter = np.random.default_rng(7).normal(0, 2e-6, (2000, 2))
+    positions = [(43 + min(index, 999) * 1e-4, 10 + max(index - 999, 0) * 1e-4) for index in range(2000)]
+    geojson = {
+        "type": "LineString",
+        "coordinates": [[longitude + dlon, latitude + dlat] for (latitude, longitude), (dlat, dlon) in zip(positions, jitter)],
+    }
+
+    response = client.post(
+        f"{POINT_ENDPOINT}/day/{day_id}/import?format=geojson", headers=auth_headers, data=json.dumps(geojson)
+    )
+    assert response.status_code == 201
+    assert response.json["received"] == 2000
+    # Both ends and the turn, whatever the insert batches
+    imported = response.json["imported"]
+    assert imported == 3
+
+    response = client.get(f"{POINT_ENDPOINT}/day/{day_id}", headers=auth_headers)
+    assert len(response.json) == imported
+    assert any(point["latitude"] == pytest.approx(43.0999, abs=1e-4) and point["longitude"] == pytest.approx(10.0, abs=1e-4)
+               for point in response.json)
+
+
+def test_track_import_day_limit(app, client, auth_headers, itinerary):
+    day_id = itinerary["days"][0]["id"]
+    geojson = {"type": "LineString", "coordinates": [[10.0, 43 + index * 1e-4] for index in range(150)]}
+    response = client.post(
+        f"{POINT_ENDPOINT}/day/{day_id}/import?format=geojson&tolerance=0", headers=auth_headers, data=json.dumps(geojson)
+    )
+    assert response.status_code == 201
+
+    # Imports have their own limit, days sent by clients keep the schema's
+    stored = client.get(f"{ITINERARY_ENDPOINT}/{itinerary['id']}", headers=auth_headers).json
+    response = client.post(f"{ITINERARY_ENDPOINT}/{itinerary['id']}/update", headers=auth_headers, json=stored)
+    assert response.status_code >= 400
+
+    max_points = app.config["TRACK_IMPORT_DAY_MAX_POINTS"]
+    app.config["TRACK_IMPORT_DAY_MAX_POINTS"] = 200
+    try:
+        response = client.post(
+            f"{POINT_ENDPOINT}/day/{day_id}/import?format=geojson&tolerance=0", headers=auth_headers, data=json.dumps(geojson)
+        )
+        assert response.status_code == 400
+    finally:
+        app.config["TRACK_IMPORT_DAY_MAX_POINTS"] = max_points
+    assert len(client.get(f"{POINT_ENDPOINT}/day/{day_id}", headers=auth_headers).json) == 150
+
+
+def test_import_appends_to_the_route(client, auth_headers, itinerary, caplog):
+    day_id = itinerary["days"][0]["id"]
+    launch = client.post(
+        f"{POINT_ENDPOINT}/create", headers=auth_headers, json={"dayId": day_id, "type": "stop", "latitude": 42.9, "longitude": 10.0}
+    ).json
+    geojson = {"type": "LineString", "coordinates": [[10.0, 43.0], [10.1, 43.1], [10.2, 43.2]]}
+    response = client.post(
+        f"{POINT_ENDPOINT}/day/{day_id}/import?format=geojson&tolerance=0", headers=auth_headers, data=json.dumps(geojson)
+    )
+    assert response.status_code == 201
+
+    response = client.get(f"{POINT_ENDPOINT}/day/{day_id}", headers=auth_headers)
+    points = response.json
+    assert [point["latitude"] for point in points] == [42.9, 43.0, 43.1, 43.2]
+    assert points[0]["id"] == launch["id"]
+    assert points[0]["next"]["id"] == points[1]["id"]
+    assert "chains" not in caplog.text
+
+
+def test_simplify_keeps_turnarounds():
+    # Out to 0.01°E and back to 0.0002°E at 45°N, ~1.5 km of paddling
+    longitudes = np.concatenate([np.linspace(0, 0.01, 50), np.linspace(0.01, 0.0002, 50)])
+    latitudes = np.full(100, 45.0)
+
+    keep = simplify_track(latitudes, longitudes, 5)
+    assert keep.sum() == 3
+    assert longitudes[keep].tolist() == [0.0, 0.01, 0.0002]
+
+
+def test_import_geojson_track(client, auth_headers, itinerary):
+    day_id = itinerary["days"][1]["id"]
+    geojson = {
+        "type": "Feature",
+        "properties": {"name": "Crossing"},
+        "geometry": {"type": "LineString", "coordinates": [[10.0, 43.0], [10.1, 43.1], [10.2, 43.2]]},
+    }
+
+    response = client.post(
+        f"{POINT_ENDPOINT}/day/{day_id}/import?format=geojson&tolerance=0", headers=auth_headers, data=json.dumps(geojson)
+    )
+    assert response.status_code == 201
+    assert response.json["imported"] == 3
+
+    response = client.get(f"{POINT_ENDPOINT}/day/{day_id}", headers=auth_headers)
+    assert [(point["latitude"], point["longitude"]) for point in response.json] == [(43.0, 10.0), (43.1, 10.1), (43.2, 10.2)]
+    assert response.json[0]["notes"] == "Crossing"
+
+    # Invalid tracks are rejected without importing anything
+    geojson["geometry"]["coordinates"].append([10.3, 95.0])
+    response = client.post(
+        f"{POINT_ENDPOINT}/day/{day_id}/import?format=geojson&tolerance=0", headers=auth_headers, data=json.dumps(geojson)
+    )
+    assert response.status_code == 400
+    response = client.get(f"{POINT_ENDPOINT}/day/{day_id}", headers=auth_headers)
+    assert len(response.json) == 3
+
+
 def test_delete_point(client, auth_headers, points):
     point = points[3]
     response = client.delete(f"{POINT_ENDPOINT}/{point["id"]}", headers=auth_headers)
     assert response.status_code == 200
     response = client.get(f"{POINT_ENDPOINT}/{point["id"]}", headers=auth_headers)
     assert response.status_code == 404
+
+
+def test_get_pois_in_range(client, auth_headers, itinerary):
+    day_id = itinerary["days"][1]["id"]
+    near = {"dayId": day_id, "type": "interest", "latitude": 43.7167, "longitude": 10.4000}
+    close = {"dayId": day_id, "type": "stop", "latitude": 43.7300, "longitude": 10.4100}
+    far = {"dayId": day_id, "type": "interest", "latitude": 44.4056, "longitude": 8.9463}
+
+    created = []
+    for point in [near, close, far]:
+        response = client.post(f"{POINT_ENDPOINT}/create", headers=auth_headers, json=point)
+        assert response.status_code == 201
+        created.append(response.json["id"])
+
+    response = client.get(
+        f"{POINT_ENDPOINT}/pois?range=5&lat=43.7167&long=10.4", headers=auth_headers
+    )
+    assert response.status_code == 200
+    ids = [point["id"] for point in response.json]
+    assert ids[:2] == created[:2]
+    assert created[2] not in ids
+
+    response = client.get(
+        f"{POINT_ENDPOINT}/pois?range=0&lat=43.7167&long=10.4", headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert response.json == []
+
+
+def test_pois_cache_invalidation(client, auth_headers, itinerary):
+    day_id = itinerary["days"][1]["id"]
+    query = f"{POINT_ENDPOINT}/pois?range=3&lat=42.8&long=10.3&type=interest"
+
+    response = client.get(query, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json == []
+
+    point = {"dayId": day_id, "type": "interest", "latitude": 42.8010, "longitude": 10.3010}
+    response = client.post(f"{POINT_ENDPOINT}/create", headers=auth_headers, json=point)
+    assert response.status_code == 201
+    point_id = response.json["id"]
+
+    response = client.get(query, headers=auth_headers)
+    assert [poi["id"] for poi in response.json] == [point_id]
+
+    response = client.post(
+        f"{POINT_ENDPOINT}/{point_id}/update",
+        headers=auth_headers,
+        json={"latitude": 44.4056, "longitude": 8.9463},
+    )
+    assert response.status_code == 200
+
+    response = client.get(query, headers=auth_headers)
+    assert response.json == []
+
+    response = client.get(f"{POINT_ENDPOINT}/pois?range=3&lat=44.4056&long=8.9463", headers=auth_headers)
+    assert point_id in [poi["id"] for poi in response.json]
+
+    response = client.delete(f"{POINT_ENDPOINT}/{point_id}", headers=auth_headers)
+    assert response.status_code == 200
+
+    response = client.get(f"{POINT_ENDPOINT}/pois?range=3&lat=44.4056&long=8.9463", headers=auth_headers)
+    assert point_id not in [poi["id"] for poi in response.json]
+
+    stats = PointService.get_poi_cache_stats()
+    assert stats["hits"] > 0
+    assert stats["misses"] > 0
+
+    response = client.get(f"{POINT_ENDPOINT}/pois?range=3&lat=42.8&long=10.3&type=bogus", headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_pois_visibility(client, auth_headers, itinerary):
+    other_user = {
+        "mail": "poi.stranger@gmail.com",
+        "pwd": "testPassword6$",
+        "phone": "+390123456781",
+        "name": "Poi Stranger",
+        "username": "poistranger",
+    }
+    response = client.post("/api/auth/register", json=other_user)
+    assert response.status_code == 201
+    other_headers = {"Authorization": f"Bearer {response.json['access_token']}"}
+
+    day_id = itinerary["days"][0]["id"]
+    created = {}
+    for point_type in ("stop", "position"):
+        point = {"dayId": day_id, "type": point_type, "latitude": 41.2, "longitude": 9.4}
+        response = client.post(f"{POINT_ENDPOINT}/create", headers=auth_headers, json=point)
+        assert response.status_code == 201
+        created[point_type] = response.json["id"]
+
+    query = f"{POINT_ENDPOINT}/pois?range=2&lat=41.2&long=9.4"
+    assert [poi["id"] for poi in client.get(query, headers=auth_headers).json] == [created["stop"]]
+    assert client.get(query, headers=other_headers).json == []
+    assert client.get(f"{query}&type=stop", headers=other_headers).json == []
+    positions = client.get(f"{query}&type=position", headers=auth_headers).json
+    assert [poi["id"] for poi in positions] == [created["position"]]
+    assert client.get(f"{query}&type=position", headers=other_headers).json == []
+
+    # Wider than the tile cache covers, answered from the database
+    wide = f"{POINT_ENDPOINT}/pois?range=400&lat=41.2&long=9.4"
+    assert created["stop"] in [poi["id"] for poi in client.get(wide, headers=auth_headers).json]
+    assert created["stop"] not in [poi["id"] for poi in client.get(wide, headers=other_headers).json]
+    assert created["position"] not in [poi["id"] for poi in client.get(wide, headers=auth_headers).json]
+
+    stored = client.get(f"{ITINERARY_ENDPOINT}/{itinerary['id']}", headers=auth_headers).json
+    response = client.post(
+        f"{ITINERARY_ENDPOINT}/{itinerary['id']}/update",
+        headers=auth_headers,
+        json={**stored, "isPublic": True},
+    )
+    assert response.status_code == 200
+    assert [poi["id"] for poi in client.get(query, headers=other_headers).json] == [created["stop"]]
+    assert client.get(query, headers=other_headers).json[0]["type"] == "stop"
+
+
+def test_point_ownership(client, auth_headers, points):
+    other_user = {
+        "mail": "point.stranger@gmail.com",
+        "pwd": "testPassword6$",
+        "phone": "+390123456780",
+        "name": "Point Stranger",
+        "username": "pointstranger",
+    }
+    response = client.post("/api/auth/register", json=other_user)
+    assert response.status_code == 201
+    other_headers = {"Authorization": f"Bearer {response.json['access_token']}"}
+
+    response = client.get(f"{POINT_ENDPOINT}/{points[0]['id']}", headers=other_headers)
+    assert response.status_code == 403
+
+    response = client.get(f"{POINT_ENDPOINT}/{points[0]['id']}", headers=auth_headers)
+    assert response.status_code == 200
+
+    response = client.get(f"{POINT_ENDPOINT}/{uuid7()}", headers=auth_headers)
+    assert response.status_code == 404
+
+    ids = [point["id"] for point in points]
+    response = client.post(f"{POINT_ENDPOINT}/by-ids", headers=other_headers, json={"ids": ids})
+    assert response.status_code == 403
+
+    response = client.post(f"{POINT_ENDPOINT}/by-ids", headers=auth_headers, json={"ids": ids + [str(uuid7())]})
+    assert response.status_code == 200
+    assert sorted(point["id"] for point in response.json) == sorted(ids)
@@ -1,6 +1,10 @@
 from Resources.itinerary_resource import ITINERARY_ENDPOINT
+from Resources.point_resource import POINT_ENDPOINT
+from Api.database import db
+from Models.point import Point
 import json
 from datetime import date
+from uuid import UUID
 
 
 def test_update_itinerary(client, auth_headers, itinerary):
@@ -27,6 +31,39 @@ def test_update_itinerary(client, auth_headers, itinerary):
     assert updated_itinerary['days'][0]['date'] == "2026-12-31"
     assert updated_itinerary['tripId'] == itinerary['tripId']
 
+def test_update_itinerary_keeps_unchanged_days(client, auth_headers, itinerary):
+    first, second = itinerary["days"]
+    days = [
+        {"id": first["id"], "dayNumber": 1, "date": first["date"], "points": [
+            {"type": "stop", "latitude": 43.7, "longitude": 10.4},
+        ]},
+        {"id": second["id"], "dayNumber": 2, "date": "2020-01-02", "points": []},
+        {"dayNumber": 3, "date": "2020-01-03", "points": []},
+    ]
+
+    response = client.post(
+        f"{ITINERARY_ENDPOINT}/{itinerary['id']}/update",
+        headers=auth_headers,
+        json={**itinerary, "days": days},
+    )
+    assert response.status_code == 200
+    updated_days = {day["dayNumber"]: day for day in json.loads(response.data)["days"]}
+    assert updated_days[1]["id"] == first["id"]
+    assert len(updated_days[1]["points"]) == 1
+    assert updated_days[2]["id"] == second["id"]
+    assert updated_days[2]["date"] == "2020-01-02"
+    assert updated_days[3]["id"] not in (first["id"], second["id"])
+
+    response = client.post(
+        f"{ITINERARY_ENDPOINT}/{itinerary['id']}/update",
+        headers=auth_headers,
+        json={**itinerary, "days": [updated_days[1]]},
+    )
+    assert response.status_code == 200
+    remaining = json.loads(response.data)["days"]
+    assert [day["id"] for day in remaining] == [first["id"]]
+    assert remaining[0]["points"][0]["id"] == updated_days[1]["points"][0]["id"]
+
 def test_get_itinerary_by_id(client, auth_headers, itinerary):
     response = client.get(f"{ITINERARY_ENDPOINT}/{itinerary['id']}", headers=auth_headers)
     retrieved_itinerary = json.loads(response.data)
@@ -45,6 +82,28 @@ def test_remove_days_from_itinerary(client, auth_headers, itinerary):
     assert updated_itinerary['tripId'] == itinerary['tripId']
     assert response.status_code == 200
 
+def test_removed_days_take_their_points(app, client, auth_headers, itinerary):
+    first, second = itinerary["days"]
+    point = {"dayId": first["id"], "type": "stop", "latitude": 39.2, "longitude": 8.3}
+    response = client.post(f"{POINT_ENDPOINT}/create", headers=auth_headers, json=point)
+    assert response.status_code == 201
+    point_id = response.json["id"]
+
+    query = f"{POINT_ENDPOINT}/pois?range=2&lat=39.2&long=8.3"
+    assert [poi["id"] for poi in client.get(query, headers=auth_headers).json] == [point_id]
+
+    days = [{"id": second["id"], "dayNumber": second["dayNumber"], "date": second["date"], "points": []}]
+    response = client.post(
+        f"{ITINERARY_ENDPOINT}/{itinerary['id']}/update", headers=auth_headers, json={**itinerary, "days": days}
+    )
+    assert response.status_code == 200
+    assert [day["id"] for day in response.json["days"]] == [second["id"]]
+
+    # Neither served from the cached tile nor left behind without a day
+    assert client.get(query, headers=auth_headers).json == []
+    with app.app_context():
+        assert db.session.get(Point, UUID(point_id)) is None
+
 def test_delete_itinerary(client, auth_headers, itinerary):
     response = client.delete(f"{ITINERARY_ENDPOINT}/{itinerary['id']}", headers=auth_headers)
     assert response.status_code == 200
@@ -113,6 +113,19 @@ class TestJWTService:
         payload = JWTService.verify_token("invalid.token", 'access')
         assert payload is None
 
+    def test_verify_token_cached(self, app):
+        """Test repeated verifications of a token are served from the cache"""
+        token = JWTService.generate_access_token("cached-user", "cached@test.com", False)
+
+        first = JWTService.verify_token(token, 'access')
+        hits = JWTService.get_token_cache_stats()['hits']
+        second = JWTService.verify_token(token, 'access')
+
+        assert second == first
+        assert JWTService.get_token_cache_stats()['hits'] == hits + 1
+        # The cached payload still honours the expected type
+        assert JWTService.verify_token(token, 'refresh') is None
+
 
 class TestAuthenticationEndpoints:
     """Test authentication endpoints"""
@@ -142,6 +155,31 @@ class TestAuthenticationEndpoints:
         assert user.username == new_user_data['username']
         assert user.id is not None
     
+    def test_register_ignores_admin(self, client):
+        """Test registering can't grant admin rights"""
+        suffix = uuid.uuid4().hex[:8]
+        user_data = {
+            "username": f"admin_{suffix}",
+            "mail": f"admin_{suffix}@example.com",
+            "pwd": "SecurePass123!",
+            "phone": f"+123457{random.randint(1000, 9999)}",
+            "name": "Admin",
+            "admin": True
+        }
+
+        response = client.post('/api/auth/register', json=user_data)
+        assert response.status_code == 201
+        headers = {"Authorization": f"Bearer {response.get_json()['access_token']}"}
+
+        user = User.query.filter_by(mail=user_data['mail']).first()
+        assert user.active is True
+        assert user.admin is False
+        assert client.get('/api/auth/token-cache', headers=headers).status_code == 401
+
+        response = client.post(f"/api/user/{user.id}/update", json={"admin": True}, headers=headers)
+        db.session.refresh(user)
+        assert user.admin is False
+
     def test_register_duplicate_username(self, client):
         """Test registering with existing username fails"""
         # Create first user
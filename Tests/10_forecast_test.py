@@ -0,0 +1,300 @@
+import asyncio
+import json
+from datetime import date, time, timedelta
+from uuid import UUID
+
+import numpy as np
+
+from Api.database import db
+from Models.day import Day
+from Models.sea import Sea
+from Models.sea_state import SeaState
+from Models.weather_state import WeatherState
+from Resources.day_resource import DAY_ENDPOINT
+from Resources.itinerary_resource import ITINERARY_ENDPOINT
+from Resources.point_resource import POINT_ENDPOINT
+from Services.OpenMeteoApi.async_client import AsyncForecastFetcher
+from Services.OpenMeteoApi.forecast_cache import get_forecast_cache_stats, grid_cell
+from Services.OpenMeteoApi.forecast_scheduler import ForecastScheduler, TokenBucket
+from Services.OpenMeteoApi.sea_service import SeaService
+from Services.OpenMeteoApi.weather_service import WeatherService
+from Services.forecast_series_service import ForecastSeriesService
+
+
+def _add_points(client, auth_headers, day_id, coordinates):
+    for latitude, longitude in coordinates:
+        point = {"dayId": day_id, "type": "stop", "latitude": latitude, "longitude": longitude}
+        response = client.post(f"{POINT_ENDPOINT}/create", headers=auth_headers, json=point)
+        assert response.status_code == 201
+
+
+def test_refresh_day_weather(client, auth_headers, itinerary, open_meteo_stub):
+    day = itinerary["days"][0]
+    _add_points(client, auth_headers, day["id"], [(43.70, 10.40), (43.75, 10.30)])
+
+    open_meteo_stub.series = {
+        "temperature_2m": lambda location, hours: np.arange(hours) + 10 * location,
+        "precipitation": lambda location, hours: np.full(hours, float(location)),
+        "wind_speed_10m": lambda location, hours: np.full(hours, 12.0 + location),
+        "wind_direction_10m": lambda location, hours: np.full(hours, 350.0 if location == 0 else 10.0),
+        "cloud_cover": lambda location, hours: np.full(hours, np.nan if location == 0 else 40.0),
+    }
+
+    WeatherService.refresh_day(day["id"])
+
+    # Both points in a single request for the day's date
+    assert len(open_meteo_stub.requests) == 1
+    request = open_meteo_stub.requests[0]
+    assert request["path"] == ["/v1/forecast"]
+    assert len(request["latitude"]) == 2
+    assert request["start_date"] == [day["date"]]
+
+    response = client.get(f"{DAY_ENDPOINT}/{day['id']}", headers=auth_headers)
+    assert response.status_code == 200
+    states = sorted(json.loads(response.data)["weather"]["weather_states"], key=lambda state: state["time"])
+    assert len(states) == 24
+    assert states[0]["time"] == "00:00:00"
+    assert states[3]["temperature"] == 8
+    assert states[3]["precipitation"] == 1
+    assert states[3]["wind_force"] == 13
+    assert states[3]["wind_direction"] in (0, 360)
+    assert states[3]["cloud"] == "40%"
+
+    # Refreshing replaces the previous states, the forecast comes from the cache
+    WeatherService.refresh_day(day["id"])
+    assert WeatherState.query.filter_by(day_id=day["id"]).count() == 24
+    assert len(open_meteo_stub.requests) == 1
+
+
+def test_refresh_itinerary_sea(client, auth_headers, itinerary, open_meteo_stub):
+    first_day, second_day = itinerary["days"]
+    _add_points(client, auth_headers, first_day["id"], [(43.70, 10.40), (43.80, 10.20)])
+    _add_points(client, auth_headers, second_day["id"], [(44.10, 9.80)])
+
+    # Hourly values encode the location and the absolute hour of the requested range
+    open_meteo_stub.series = {
+        "wave_height": lambda location, hours: 1000 * location + np.arange(hours),
+        "wave_direction": lambda location, hours: np.full(hours, np.nan if location == 1 else 90.0),
+        "swell_wave_direction": lambda location, hours: np.full(hours, 180.0),
+        "swell_wave_period": lambda location, hours: np.full(hours, 8.5),
+    }
+
+    refreshed = SeaService.refresh_itinerary(itinerary["id"])
+    assert sorted(str(day_id) for day_id in refreshed) == sorted([first_day["id"], second_day["id"]])
+
+    # One request per date, each covering that single day
+    assert len(open_meteo_stub.requests) == 2
+    assert all(request["path"] == ["/v1/marine"] for request in open_meteo_stub.requests)
+    assert sorted(request["start_date"][0] for request in open_meteo_stub.requests) == sorted([first_day["date"], second_day["date"]])
+    assert all(request["start_date"] == request["end_date"] for request in open_meteo_stub.requests)
+
+    assert Sea.query.filter(Sea.day_id.in_(refreshed)).count() == 2
+    assert SeaState.query.filter(SeaState.day_id.in_(refreshed)).count() == 48
+
+    state = SeaState.query.filter_by(day_id=first_day["id"], time=time(5)).one()
+    assert float(state.wave_height) == 5
+    assert float(state.swell_period) == 8.5
+    assert float(state.wave_direction) == 90
+
+    # Refreshing replaces the previous states, the forecast comes from the cache
+    SeaService.refresh_days([first_day["id"]])
+    assert SeaState.query.filter_by(day_id=first_day["id"]).count() == 24
+    assert len(open_meteo_stub.requests) == 2
+
+
+def test_refresh_days_skips_days_past_the_marine_horizon(app, client, auth_headers, itinerary, open_meteo_stub):
+    first_day, second_day = itinerary["days"]
+    _add_points(client, auth_headers, first_day["id"], [(43.70, 10.40)])
+    _add_points(client, auth_headers, second_day["id"], [(44.10, 9.80)])
+    late = db.session.get(Day, UUID(second_day["id"]))
+    late.date = date.today() + timedelta(days=app.config["OPEN_METEO_MARINE_FORECAST_DAYS"])
+    db.session.commit()
+
+    refreshed = SeaService.refresh_days([first_day["id"], second_day["id"]])
+
+    # The late day doesn't make the request of the other one fail
+    assert [str(day_id) for day_id in refreshed] == [first_day["id"]]
+    assert [request["start_date"] for request in open_meteo_stub.requests] == [[first_day["date"]]]
+    assert SeaState.query.filter_by(day_id=first_day["id"]).count() == 24
+    assert SeaState.query.filter_by(day_id=second_day["id"]).count() == 0
+
+
+def test_refreshes_take_a_token_per_request(client, auth_headers, itinerary, open_meteo_stub):
+    class CountingLimiter:
+        acquired = 0
+
+        def acquire(self):
+            self.acquired += 1
+
+    first_day, second_day = itinerary["days"]
+    _add_points(client, auth_headers, first_day["id"], [(43.70, 10.40)])
+    _add_points(client, auth_headers, second_day["id"], [(44.10, 9.80)])
+    limiter = CountingLimiter()
+
+    # One marine request per date, then none once cached
+    SeaService.refresh_days([first_day["id"], second_day["id"]], limiter=limiter)
+    assert limiter.acquired == len(open_meteo_stub.requests) == 2
+    SeaService.refresh_days([first_day["id"], second_day["id"]], limiter=limiter)
+    assert limiter.acquired == 2
+
+    WeatherService.refresh_day(first_day["id"], limiter=limiter)
+    assert limiter.acquired == len(open_meteo_stub.requests) == 3
+
+
+def test_forecast_series_storage(app, client, auth_headers, itinerary, open_meteo_stub):
+    day = itinerary["days"][0]
+    _add_points(client, auth_headers, day["id"], [(43.70, 10.40)])
+    open_meteo_stub.series = {
+        "temperature_2m": lambda location, hours: np.arange(hours, dtype=float),
+        "cloud_cover": lambda location, hours: np.full(hours, 40.0),
+        "wave_height": lambda location, hours: np.full(hours, 1.25),
+    }
+
+    # Stored as rows, then moved into series
+    WeatherService.refresh_day(day["id"])
+    SeaService.refresh_days([day["id"]])
+    app.config["FORECAST_STORAGE"] = "series"
+    try:
+        assert ForecastSeriesService.migrate_states("weather") >= 1
+        assert ForecastSeriesService.migrate_states("marine") >= 1
+        assert WeatherState.query.filter_by(day_id=day["id"]).count() == 0
+        assert SeaState.query.filter_by(day_id=day["id"]).count() == 0
+
+        weather = ForecastSeriesService.get_series(day["id"], "weather")
+        assert weather["temperature"].dtype == np.float32
+        assert weather["temperature"].tolist() == list(range(24))
+
+        # Refreshing writes series only, and dumps look the same as with rows
+        WeatherService.refresh_day(day["id"])
+        assert WeatherState.query.filter_by(day_id=day["id"]).count() == 0
+        response = client.get(f"{DAY_ENDPOINT}/{day['id']}", headers=auth_headers)
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        weather_states = data["weather"]["weather_states"]
+        assert [state["time"] for state in weather_states][:2] == ["00:00:00", "01:00:00"]
+        assert weather_states[3]["temperature"] == 3
+        assert weather_states[3]["cloud"] == "40%"
+        assert len(data["sea"]["sea_states"]) == 24
+        assert data["sea"]["sea_states"][0]["wave_height"] == 1.25
+    finally:
+        app.config["FORECAST_STORAGE"] = "rows"
+
+
+def test_forecast_cache_shares_grid_cells(client, auth_headers, itinerary, open_meteo_stub):
+    first_day, second_day = itinerary["days"]
+    # About 100 m apart, same grid cell
+    _add_points(client, auth_headers, first_day["id"], [(43.7101, 10.4012), (43.7109, 10.4021)])
+    _add_points(client, auth_headers, second_day["id"], [(43.7105, 10.4018)])
+    assert grid_cell(43.7101, 10.4012) == grid_cell(43.7109, 10.4021)
+
+    before = get_forecast_cache_stats()
+    WeatherService.refresh_day(first_day["id"])
+
+    # The cell centre is requested once for both points
+    assert len(open_meteo_stub.requests) == 1
+    cell_latitude, cell_longitude = grid_cell(43.7101, 10.4012)
+    assert [float(value) for value in open_meteo_stub.requests[0]["latitude"]] == [cell_latitude]
+    assert [float(value) for value in open_meteo_stub.requests[0]["longitude"]] == [cell_longitude]
+
+    # Same cell and date is served from the cache until the next model run
+    WeatherService.refresh_day(first_day["id"])
+    assert len(open_meteo_stub.requests) == 1
+
+    # Marine forecasts and other dates are separate entries
+    SeaService.refresh_days([first_day["id"]])
+    assert len(open_meteo_stub.requests) == 2
+    WeatherService.refresh_day(second_day["id"])
+    assert len(open_meteo_stub.requests) == 3
+
+    after = get_forecast_cache_stats()
+    assert after["hits"] - before["hits"] == 1
+
+
+def test_scheduler_refreshes_upcoming_days(app, client, auth_headers, trip_w_o_itinerary, itinerary, open_meteo_stub):
+    tomorrow = date.today() + timedelta(days=1)
+    days = [
+        {"dayNumber": 1, "date": tomorrow.isoformat(), "points": []},
+        {"dayNumber": 2, "date": (tomorrow + timedelta(days=1)).isoformat(), "points": []},
+        {"dayNumber": 3, "date": (tomorrow + timedelta(days=30)).isoformat(), "points": []},
+    ]
+    response = client.post(
+        f"{ITINERARY_ENDPOINT}/create", headers=auth_headers, json={"days": days, "tripId": trip_w_o_itinerary["id"]}
+    )
+    assert response.status_code == 201
+    upcoming = sorted(json.loads(response.data)["days"], key=lambda day: day["dayNumber"])
+    for day in upcoming:
+        _add_points(client, auth_headers, day["id"], [(43.7101, 10.4012)])
+    # Past days are left alone
+    _add_points(client, auth_headers, itinerary["days"][0]["id"], [(43.7101, 10.4012)])
+
+    scheduler = ForecastScheduler(app, interval=3600, days_ahead=7, workers=2, requests_per_minute=6000)
+    groups = scheduler.due_days()
+    assert sorted(day_id for day_ids in groups.values() for day_id in day_ids) == sorted(day["id"] for day in upcoming[:2])
+
+    summary = scheduler.run_once()
+    assert summary == {"days": 2, "cells": 1, "failed": 0}
+
+    # Prefetched in one weather and one marine request per date, the refreshes read the cache
+    paths = sorted(request["path"][0] for request in open_meteo_stub.requests)
+    assert paths == ["/v1/forecast", "/v1/forecast", "/v1/marine", "/v1/marine"]
+    for day in upcoming[:2]:
+        assert WeatherState.query.filter_by(day_id=day["id"]).count() == 24
+        assert SeaState.query.filter_by(day_id=day["id"]).count() == 24
+    assert SeaState.query.filter_by(day_id=upcoming[2]["id"]).count() == 0
+    assert SeaState.query.filter_by(day_id=itinerary["days"][0]["id"]).count() == 0
+
+
+def test_token_bucket_waits_for_tokens():
+    now = [0.0]
+    waits = []
+
+    def sleep(seconds):
+        waits.append(seconds)
+        now[0] += seconds
+
+    bucket = TokenBucket(rate_per_minute=60, burst=2, clock=lambda: now[0], sleep=sleep)
+    for _ in range(4):
+        bucket.acquire()
+
+    # Two tokens from the burst, then one per second
+    assert waits == [1.0, 1.0]
+
+
+def test_async_fetcher_batches_and_coalesces(open_meteo_stub):
+    open_meteo_stub.series = {"temperature_2m": lambda location, hours: np.full(hours, 20.0 + location)}
+    first, second = date(2024, 6, 1), date(2024, 6, 2)
+    locations = [(43.1, 10.1, first), (43.2, 10.2, first), (43.3, 10.3, first), (43.1, 10.1, second)]
+    fetcher = AsyncForecastFetcher(
+        forecast_url=f"{open_meteo_stub.url}/v1/forecast", marine_url=f"{open_meteo_stub.url}/v1/marine", batch_size=2
+    )
+
+    async def fetch_twice():
+        async with fetcher:
+            return await asyncio.gather(
+                fetcher.fetch("weather", locations, ["temperature_2m"], "best_match"),
+                fetcher.fetch("weather", locations, ["temperature_2m"], "best_match"),
+            )
+
+    first_result, second_result = asyncio.run(fetch_twice())
+
+    # Two batches for the first date, one for the second, shared by both calls
+    assert len(open_meteo_stub.requests) == 3
+    assert sorted(len(request["latitude"]) for request in open_meteo_stub.requests) == [1, 1, 2]
+    assert [forecast["temperature_2m"][0] for forecast in first_result] == [20.0, 21.0, 20.0, 20.0]
+    assert all(a is b for a, b in zip(first_result, second_result))
+
+
+def test_async_fetcher_retries_server_errors(open_meteo_stub):
+    open_meteo_stub.failures = 2
+    fetcher = AsyncForecastFetcher(
+        forecast_url=f"{open_meteo_stub.url}/v1/forecast",
+        marine_url=f"{open_meteo_stub.url}/v1/marine",
+        retries=2,
+        backoff_factor=0,
+    )
+
+    cells = fetcher.prefetch(marine_locations=[(43.1, 10.1, date(2024, 6, 1))])
+
+    assert cells == 1
+    assert fetcher.requests_sent == 3
+    assert get_forecast_cache_stats()["size"] == 1
@@ -0,0 +1,48 @@
+import json
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from uuid import UUID
+
+import pytest
+
+from Models.point import PointType
+from Services.Utils.json_encoder import CustomJSONProvider, OrjsonProvider, json_provider_class
+
+
+def test_app_uses_the_configured_provider(app):
+    assert app.config["JSON_PROVIDER"] == "orjson"
+    assert isinstance(app.json, OrjsonProvider)
+    assert json_provider_class("stdlib") is CustomJSONProvider
+    with pytest.raises(ValueError):
+        json_provider_class("simplejson")
+
+
+def test_providers_encode_alike(app):
+    payload = {
+        "id": UUID("01890a5d-ac96-774b-bcce-b302099a8057"),
+        "created": datetime(2026, 7, 1, 8, 30, tzinfo=timezone.utc),
+        "date": date(2026, 7, 1),
+        "time": time(6, 15),
+        "miles": Decimal("12.50"),
+        "type": PointType.STOP,
+        "points": [{"latitude": 43.7, "longitude": 10.4, "notes": "Caffè"}],
+        "empty": None,
+    }
+    expected = {
+        "id": "01890a5d-ac96-774b-bcce-b302099a8057",
+        "created": "2026-07-01T08:30:00+00:00",
+        "date": "2026-07-01",
+        "time": "06:15:00",
+        "miles": "12.50",
+        "type": "stop",
+        "points": [{"latitude": 43.7, "longitude": 10.4, "notes": "Caffè"}],
+        "empty": None,
+    }
+
+    with app.app_context():
+        for provider in (CustomJSONProvider(app), OrjsonProvider(app)):
+            assert json.loads(provider.dumps(payload)) == expected
+            response = provider.response(payload)
+            assert response.mimetype == "application/json"
+            assert json.loads(response.get_data()) == expected
+            assert provider.loads(provider.dumps(payload)) == expected
@@ -0,0 +1,30 @@
+from Models.item import Item, ItemCategoryType
+from Models.trip import Trip
+from Schemas.item_schema import ItemSchema
+from Schemas.registry import get_schema
+from Schemas.trip_schema import TripSchema
+from Schemas.user_schema import UserSchema
+
+
+def test_get_schema_reuses_variants():
+    assert get_schema(TripSchema) is get_schema(TripSchema)
+    assert get_schema(TripSchema, many=True) is not get_schema(TripSchema)
+    assert get_schema(UserSchema, exclude=["pwd", "trips"]) is get_schema(UserSchema, exclude=("trips", "pwd"))
+    assert get_schema(UserSchema, only=["id"]) is not get_schema(UserSchema)
+
+    schema = get_schema(UserSchema, exclude=["pwd"])
+    assert schema.exclude == {"pwd"}
+    assert "pwd" not in schema.dump_fields
+
+
+def test_shared_schemas_dump_like_fresh_ones():
+    trips = [
+        Trip(destination=f"Destination {index}", description="Coastal trip", is_draft=index == 0)
+        for index in range(3)
+    ]
+    items = [Item(name="Paddle", category=ItemCategoryType.TRAVEL), Item(name="Pump")]
+
+    assert get_schema(TripSchema, many=True).dump(trips) == [TripSchema().dump(trip) for trip in trips]
+    assert get_schema(TripSchema).dump(trips[0]) == TripSchema().dump(trips[0])
+    assert get_schema(ItemSchema, many=True).dump(items) == ItemSchema(many=True).dump(items)
+    assert get_schema(TripSchema).dump(trips[1])["isDraft"] is False
@@ -0,0 +1,99 @@
+from decimal import Decimal
+from uuid import UUID
+
+import pytest
+from marshmallow import Schema, fields, post_dump
+from sqlalchemy import select
+
+from Api.database import db
+from Models.day import Day
+from Models.image import Image
+from Models.inventory import Inventory
+from Models.item import Item, ItemCategoryType
+from Models.log import Log
+from Models.point import Point, PointType
+from Resources.log_resource import LOG_ENDPOINT
+from Resources.point_resource import POINT_ENDPOINT
+from Schemas.day_schema import DaySchema
+from Schemas.fast_dump import get_dumper
+from Schemas.inventory_schema import InventorySchema
+from Schemas.item_schema import ItemSchema
+from Schemas.log_schema import LogSchema
+from Schemas.point_schema import PointSchema
+
+
+def test_dumpers_match_schemas_in_memory():
+    image = Image(name="cove.jpg", location="/images/cove.jpg", size=1.5)
+    last = Point(type=PointType.STOP, latitude=Decimal("43.71"), longitude=Decimal("10.41"), images=[])
+    first = Point(type=PointType.INTEREST, latitude=Decimal("43.7"), longitude=None, notes="Caffè", next=last, images=[image])
+    points = [first, last, Point(type=None, images=[])]
+    items = [Item(name="Paddle", category=ItemCategoryType.TRAVEL, checked=True), Item(name="Pump")]
+
+    for point in points:
+        assert get_dumper(PointSchema)(point) == PointSchema().dump(point)
+    for item in items:
+        assert get_dumper(ItemSchema)(item) == ItemSchema().dump(item)
+    inventory = Inventory(items=items)
+    assert get_dumper(InventorySchema)(inventory) == InventorySchema().dump(inventory)
+
+    poi = get_dumper(PointSchema, exclude=("next", "nearby", "images"))(first)
+    assert poi == PointSchema(exclude=("next", "nearby", "images")).dump(first)
+    assert "images" not in poi and poi["type"] == "interest"
+
+
+def test_dumpers_match_schemas_on_stored_rows(app, client, auth_headers, itinerary, inventory_with_items):
+    log = client.post(f"{LOG_ENDPOINT}/create", headers=auth_headers, json={"hours": 6.5, "avgSea": 2}).json
+    day_id = itinerary["days"][0]["id"]
+    stop = client.post(f"{POINT_ENDPOINT}/create", headers=auth_headers, json={"dayId": day_id, "type": "stop", "latitude": 43.7, "longitude": 10.4}).json
+    start = client.post(f"{POINT_ENDPOINT}/create", headers=auth_headers, json={"dayId": day_id, "type": "position", "notes": "Launch"}).json
+    response = client.post(f"{POINT_ENDPOINT}/{start['id']}/update", headers=auth_headers, json={"next": {"id": stop["id"]}})
+    assert response.status_code == 200
+
+    with app.app_context():
+        for point in db.session.query(Point).filter(Point.day_id == day_id):
+            assert get_dumper(PointSchema)(point) == PointSchema().dump(point)
+        for stored_log in db.session.query(Log).all():
+            assert get_dumper(LogSchema)(stored_log) == LogSchema().dump(stored_log)
+        inventory = db.session.get(Inventory, inventory_with_items["id"])
+        assert get_dumper(InventorySchema)(inventory) == InventorySchema().dump(inventory)
+
+        rows = db.session.execute(select(Log.id, Log.hours, Log.user_id)).all()
+        assert [get_dumper(LogSchema)(row) for row in rows] == LogSchema(many=True).dump(rows)
+        assert "avgSea" not in get_dumper(LogSchema)(rows[0])
+        rows = db.session.execute(select(Point.id, Point.type, Point.latitude).where(Point.day_id == day_id)).all()
+        assert [get_dumper(PointSchema)(row) for row in rows] == PointSchema(many=True).dump(rows)
+
+    response = client.get(f"{POINT_ENDPOINT}/day/{day_id}", headers=auth_headers)
+    assert [point["id"] for point in response.json] == [start["id"], stop["id"]]
+    assert response.json[0]["next"]["id"] == stop["id"]
+
+    client.delete(f"{LOG_ENDPOINT}/{log['id']}", headers=auth_headers)
+
+
+def test_day_dumper_matches_schema(app, client, auth_headers, itinerary):
+    day_id = itinerary["days"][0]["id"]
+    stop = client.post(f"{POINT_ENDPOINT}/create", headers=auth_headers, json={"dayId": day_id, "type": "stop"}).json
+    start = client.post(f"{POINT_ENDPOINT}/create", headers=auth_headers, json={"dayId": day_id, "type": "position"}).json
+    response = client.post(f"{POINT_ENDPOINT}/{start['id']}/update", headers=auth_headers, json={"next": {"id": stop["id"]}})
+    assert response.status_code == 200
+
+    with app.app_context():
+        day = db.session.get(Day, UUID(day_id))
+        dumped = get_dumper(DaySchema)(day)
+        assert dumped == DaySchema().dump(day)
+        # Points in route order, not in insertion order
+        assert [point["id"] for point in dumped["points"]] == [start["id"], stop["id"]]
+
+
+def test_dumpers_are_cached_and_refuse_dump_hooks():
+    class HookedSchema(Schema):
+        name = fields.String()
+
+        @post_dump
+        def upper(self, data, **kwargs):
+            return {key: value.upper() for key, value in data.items()}
+
+    assert get_dumper(LogSchema) is get_dumper(LogSchema)
+    assert get_dumper(PointSchema, exclude=["images", "next"]) is get_dumper(PointSchema, exclude=("next", "images"))
+    with pytest.raises(ValueError):
+        get_dumper(HookedSchema)
@@ -1,6 +1,7 @@
 from datetime import date
 import json
 import pytest
+import requests
 from sqlalchemy.exc import NoResultFound
 
 from Models.user import User
@@ -8,6 +9,9 @@ from Resources.inventory_resource import INVENTORY_ENDPOINT
 from Resources.itinerary_resource import ITINERARY_ENDPOINT
 from Resources.trip_resource import TRIP_ENDPOINT
 from Services.Middleware.auth_middleware import JWTService
+from Services.OpenMeteoApi.client import OpenMeteoClient, set_client
+from Services.OpenMeteoApi.forecast_cache import forecast_cache
+from Tests.open_meteo_stub import OpenMeteoStub
 from Api.app import createApp
 from Api.database import db as _db
 
@@ -184,3 +188,20 @@ def itinerary(client, auth_headers, trip_w_o_itinerary):
     except:
         pass
 
+
+@pytest.fixture(scope="function")
+def open_meteo_stub(app):
+    """Local Open-Meteo server used as the forecast services' transport."""
+    stub = OpenMeteoStub().start()
+    forecast_cache.clear()
+    set_client(OpenMeteoClient(
+        session=requests.Session(),
+        forecast_url=f"{stub.url}/v1/forecast",
+        marine_url=f"{stub.url}/v1/marine",
+        retries=0,
+    ))
+
+    yield stub
+
+    set_client(None)
+    stub.stop()
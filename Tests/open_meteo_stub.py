@@ -0,0 +1,120 @@
+"""
+Local stand-in for the Open-Meteo endpoints.
+
+Serves FlatBuffers responses in the format decoded by openmeteo_requests: one
+length-prefixed WeatherApiResponse per requested location, with the requested
+hourly variables over the requested dates (UTC, no offset).
+"""
+from datetime import date, datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+import time
+from typing import Callable, Dict, List
+from urllib.parse import parse_qs, urlparse
+
+import flatbuffers
+import numpy as np
+
+
+def encode_response(latitude: float, longitude: float, start: int, interval: int, hourly: List[np.ndarray]) -> bytes:
+    """Encode one location as a size-prefixed WeatherApiResponse with hourly series."""
+    builder = flatbuffers.Builder(1024)
+
+    variables = []
+    for values in hourly:
+        vector = builder.CreateNumpyVector(np.asarray(values, dtype=np.float32))
+        builder.StartObject(4)
+        builder.PrependUOffsetTRelativeSlot(3, vector, 0)
+        variables.append(builder.EndObject())
+
+    builder.StartVector(4, len(variables), 4)
+    for variable in reversed(variables):
+        builder.PrependUOffsetTRelative(variable)
+    variables_vector = builder.EndVector()
+
+    length = len(hourly[0]) if hourly else 0
+    builder.StartObject(4)
+    builder.PrependInt64Slot(0, start, 0)
+    builder.PrependInt64Slot(1, start + length * interval, 0)
+    builder.PrependInt32Slot(2, interval, 0)
+    builder.PrependUOffsetTRelativeSlot(3, variables_vector, 0)
+    series = builder.EndObject()
+
+    builder.StartObject(12)
+    builder.PrependFloat32Slot(0, latitude, 0.0)
+    builder.PrependFloat32Slot(1, longitude, 0.0)
+    builder.PrependUOffsetTRelativeSlot(11, series, 0)
+    builder.Finish(builder.EndObject())
+
+    message = bytes(builder.Output())
+    return len(message).to_bytes(4, byteorder="little") + message
+
+
+class OpenMeteoStub:
+    """
+    HTTP server answering forecast and marine requests with generated series.
+
+    series maps a variable name to a function of (location index, hours) returning
+    the values of that location; unknown variables are filled with zeros. latency
+    delays every response and the next `failures` requests are answered with 502.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.series: Dict[str, Callable[[int, int], np.ndarray]] = {}
+        self.requests: List[Dict[str, List[str]]] = []
+        self.latency = latency
+        self.failures = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = parse_qs(url.query)
+                stub.requests.append({"path": [url.path], **params})
+                time.sleep(stub.latency)
+                if stub.failures > 0:
+                    stub.failures -= 1
+                    self.send_error(502)
+                    return
+                body = stub.respond(params)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = Thread(target=self._server.serve_forever, daemon=True)
+
+    def start(self) -> "OpenMeteoStub":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def respond(self, params: Dict[str, List[str]]) -> bytes:
+        latitudes = [float(value) for value in params["latitude"]]
+        longitudes = [float(value) for value in params["longitude"]]
+        variables = params.get("hourly", [])
+        first = date.fromisoformat(params["start_date"][0])
+        last = date.fromisoformat(params["end_date"][0])
+        start = int(datetime(first.year, first.month, first.day, tzinfo=timezone.utc).timestamp())
+        hours = 24 * ((last - first).days + 1)
+
+        zeros = lambda location, count: np.zeros(count)
+        return b"".join(
+            encode_response(
+                latitude,
+                longitude,
+                start,
+                3600,
+                [self.series.get(name, zeros)(location, hours) for name in variables],
+            )
+            for location, (latitude, longitude) in enumerate(zip(latitudes, longitudes))
+        )
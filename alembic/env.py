@@ -4,6 +4,7 @@ from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
 from Models.day import Day
+from Models.forecast_series import ForecastSeries
 from Models.image import Image
 from Models.inventory import Inventory
 from Models.item import Item
@@ -0,0 +1,41 @@
+"""Add geohash cell column and index to point
+
+Revision ID: 3f2c9d1e7a40
+Revises: a19441b232c7
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from Services.Utils.geo import GEOHASH_PRECISION, encode_geohash
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2c9d1e7a40'
+down_revision = 'a19441b232c7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('point', sa.Column('geocell', sa.String(length=GEOHASH_PRECISION), nullable=True))
+    op.create_index('ix_point_geocell', 'point', ['geocell'], postgresql_ops={'geocell': 'varchar_pattern_ops'})
+
+    # Backfill the cell of the points that already have coordinates
+    connection = op.get_bind()
+    point = sa.table('point', sa.column('id'), sa.column('latitude'), sa.column('longitude'), sa.column('geocell'))
+    rows = connection.execute(
+        sa.select(point.c.id, point.c.latitude, point.c.longitude)
+        .where(point.c.latitude.isnot(None), point.c.longitude.isnot(None))
+    ).all()
+    if rows:
+        connection.execute(
+            point.update().where(point.c.id == sa.bindparam('point_id')).values(geocell=sa.bindparam('cell')),
+            [{'point_id': row.id, 'cell': encode_geohash(float(row.latitude), float(row.longitude))} for row in rows],
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_point_geocell', table_name='point')
+    op.drop_column('point', 'geocell')
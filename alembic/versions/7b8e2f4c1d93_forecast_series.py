@@ -0,0 +1,34 @@
+"""Add forecast_series table
+
+Revision ID: 7b8e2f4c1d93
+Revises: 3f2c9d1e7a40
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b8e2f4c1d93'
+down_revision = '3f2c9d1e7a40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('forecast_series',
+    sa.Column('day_id', sa.UUID(), nullable=False),
+    sa.Column('source', sa.String(length=16), nullable=False),
+    sa.Column('variable', sa.String(length=64), nullable=False),
+    sa.Column('start', sa.Time(), nullable=False),
+    sa.Column('interval_seconds', sa.Integer(), nullable=False),
+    sa.Column('values', sa.LargeBinary(), nullable=False),
+    sa.Column('recorded_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['day_id'], ['day.id'], name='day_foreign_key_in_forecast_series', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('day_id', 'source', 'variable')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('forecast_series')
@@ -0,0 +1,40 @@
+"""Activate existing users
+
+Authenticated requests now require active users, which registration didn't set, so
+every user stored so far has active unset or false by default. They are activated
+once; the users changed and their previous value are kept in
+users_activated_c4d1a7e9b205 so the downgrade restores exactly those.
+
+Revision ID: c4d1a7e9b205
+Revises: 7b8e2f4c1d93
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d1a7e9b205'
+down_revision = '7b8e2f4c1d93'
+branch_labels = None
+depends_on = None
+
+BACKFILL_TABLE = 'users_activated_c4d1a7e9b205'
+
+
+def upgrade() -> None:
+    op.create_table(BACKFILL_TABLE,
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('active', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.execute(f"INSERT INTO {BACKFILL_TABLE} (user_id, active) SELECT id, active FROM users WHERE active IS NOT TRUE")
+    op.execute(f"UPDATE users SET active = TRUE WHERE id IN (SELECT user_id FROM {BACKFILL_TABLE})")
+
+
+def downgrade() -> None:
+    op.execute(
+        f"UPDATE users SET active = backfill.active FROM {BACKFILL_TABLE} AS backfill WHERE users.id = backfill.user_id"
+    )
+    op.drop_table(BACKFILL_TABLE)